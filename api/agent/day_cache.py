@@ -0,0 +1,212 @@
+"""
+Cache of generated meal plan weeks shared between users with similar targets.
+
+Keys combine bucketed macro targets with a hash of the normalized food
+preferences, so 2000 kcal/150P/200C/67F and 2010 kcal/148P/203C/66F hit the
+same entry. Only plans generated without favorite foods are cached; a hit is
+re-dated for the requested week and then rescaled to the user's exact
+targets by the portion solver, so no LLM call is needed.
+
+Each key keeps up to a few different weeks (variants), and the cache
+remembers which ones it served to each user: a user is only given a week
+they haven't received yet, so asking again or planning the following week
+generates (and caches) a new variant once they've seen them all.
+
+Entries live in an in-memory TTL/LRU cache and, optionally, in the
+meal_plan_day_cache Supabase table so they survive restarts and are shared
+between workers.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from agent.settings import settings
+from database.queries import fetch_cached_meal_plan_week, store_cached_meal_plan_week
+from database.supabase import get_supabase_client
+from models.meal_plan import DayName, MealPlanDay
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Target bucket widths; the portion solver absorbs differences within a bucket
+CALORIE_BUCKET = 100
+MACRO_BUCKET_G = 10
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+_WEEKDAYS = list(DayName)
+
+
+def normalize_preferences(food_preferences: str) -> str:
+    """Normalize free-text preferences so trivial differences share a key."""
+    return " ".join(_NON_WORD.sub(" ", (food_preferences or "").lower()).split())
+
+
+def _bucket(value: float, width: float) -> int:
+    return int(round(value / width) * width)
+
+
+@dataclass(frozen=True)
+class _Week:
+    variant: str  # Content hash, stable across workers and restarts
+    days: List[MealPlanDay]
+
+
+def _variant_id(days: List[dict]) -> str:
+    return hashlib.sha256(json.dumps(days, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class DayCache:
+    """
+    Generic generated weeks keyed by bucketed targets and preferences.
+
+    Args:
+        maxsize: Maximum number of cache keys kept in memory
+        ttl_seconds: Lifetime of a cached week
+        persist: Also read/write the meal_plan_day_cache Supabase table
+        variants: Different weeks kept per key (the oldest is replaced)
+        served_size: Maximum (user, key) pairs whose served weeks are remembered
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        persist: bool = False,
+        variants: int = 3,
+        served_size: int = 10000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self.variants = variants
+        self._weeks: TTLCache[str, List[_Week]] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._served: TTLCache[str, Set[str]] = TTLCache(maxsize=served_size, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def key(user_targets: dict, food_preferences: str = "") -> str:
+        """
+        Build the cache key for a set of targets and preferences.
+
+        Args:
+            user_targets: Daily macro targets (calories, protein, carbs, fat)
+            food_preferences: User's free-text food preferences
+
+        Returns:
+            Key like "2000-150-200-70:<preferences hash>"
+        """
+        buckets = [
+            _bucket(user_targets['calories'], CALORIE_BUCKET),
+            _bucket(user_targets['protein'], MACRO_BUCKET_G),
+            _bucket(user_targets['carbs'], MACRO_BUCKET_G),
+            _bucket(user_targets['fat'], MACRO_BUCKET_G)
+        ]
+        preferences = hashlib.sha256(normalize_preferences(food_preferences).encode()).hexdigest()[:16]
+        return f"{'-'.join(map(str, buckets))}:{preferences}"
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        self._weeks.clear()
+        self._served.clear()
+
+    async def get_week(self, key: str, week_start: str, user_id: Optional[str] = None) -> Optional[List[MealPlanDay]]:
+        """
+        Get a cached week the user hasn't received yet, re-dated to start on week_start.
+
+        Args:
+            key: Cache key from DayCache.key
+            week_start: Week start date (YYYY-MM-DD)
+            user_id: Requesting user; weeks already served to them are skipped
+
+        Returns:
+            7 MealPlanDay copies in weekday order, or None on a miss
+        """
+        weeks = self._weeks.get(key)
+
+        if weeks is None and self.persist:
+            try:
+                rows = await fetch_cached_meal_plan_week(
+                    await get_supabase_client(), key, self.ttl_seconds, self.variants
+                )
+            except Exception as e:
+                logger.error(f"Day cache lookup failed for {key}: {e}")
+                rows = None
+            if rows:
+                # Rows come newest first; memory keeps the newest last
+                weeks = [
+                    _Week(row['variant'], [MealPlanDay.model_validate(day) for day in row['days']])
+                    for row in reversed(rows)
+                ]
+                self._weeks.set(key, weeks)
+
+        served = self._served.get(f"{user_id}:{key}") if user_id else None
+        week = next(
+            (
+                week for week in weeks or []
+                if len(week.days) == len(_WEEKDAYS) and not (served and week.variant in served)
+            ),
+            None
+        )
+        if week is None:
+            return None
+
+        logger.info(f"Meal plan day cache hit for {key} (variant {week.variant})")
+        self._mark_served(user_id, key, week.variant)
+        base_date = datetime.strptime(week_start, '%Y-%m-%d')
+        return [
+            self._redate(day, base_date + timedelta(days=idx), _WEEKDAYS[idx])
+            for idx, day in enumerate(week.days)
+        ]
+
+    async def put_week(self, key: str, days: List[MealPlanDay], user_id: Optional[str] = None) -> None:
+        """
+        Cache a validated generic week (must not contain user favorites).
+
+        Args:
+            key: Cache key from DayCache.key
+            days: 7 validated days in weekday order
+            user_id: User the week was generated for (it won't be served to them again)
+        """
+        if len(days) != len(_WEEKDAYS):
+            return
+
+        serialized = [day.model_dump(mode='json') for day in days]
+        variant = _variant_id(serialized)
+        weeks = [week for week in self._weeks.get(key) or [] if week.variant != variant]
+        weeks.append(_Week(variant, [day.model_copy(deep=True) for day in days]))
+        self._weeks.set(key, weeks[-self.variants:])
+        self._mark_served(user_id, key, variant)
+
+        if self.persist:
+            try:
+                await store_cached_meal_plan_week(await get_supabase_client(), key, variant, serialized)
+            except Exception as e:
+                logger.error(f"Day cache store failed for {key}: {e}")
+
+    def _mark_served(self, user_id: Optional[str], key: str, variant: str) -> None:
+        if user_id:
+            served_key = f"{user_id}:{key}"
+            self._served.set(served_key, (self._served.get(served_key) or set()) | {variant})
+
+    @staticmethod
+    def _redate(day: MealPlanDay, date: datetime, day_name: DayName) -> MealPlanDay:
+        """Copy a cached day onto a new date, keeping meal ids consistent with the day name."""
+        copy = day.model_copy(deep=True)
+        old_name, new_name = day.day_name.value.lower(), day_name.value.lower()
+        for meal in copy.meals:
+            meal.id = meal.id.replace(old_name, new_name)
+        copy.date = date.strftime('%Y-%m-%d')
+        copy.day_name = day_name
+        return copy
+
+
+# Global day cache instance
+day_cache = DayCache(
+    maxsize=settings.meal_plan_day_cache_size,
+    ttl_seconds=settings.meal_plan_day_cache_ttl_seconds,
+    persist=settings.meal_plan_day_cache_persist,
+    variants=settings.meal_plan_day_cache_variants
+)
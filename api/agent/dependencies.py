@@ -16,4 +16,6 @@ class CoachAgentDependencies:
     """
     supabase: AsyncClient  # Async Supabase client for database queries
     user_id: str  # Authenticated user ID (validated by Next.js layer)
-    generated_meal_plan: Optional[dict] = field(default=None)  # Optional meal plan data for response passthrough
\ No newline at end of file
+    generated_meal_plan: Optional[dict] = field(default=None)  # Optional meal plan data for response passthrough
+    meal_plan_generation_id: Optional[str] = field(default=None)  # Progress channel id for meal plan generation
+    meal_plan_job_id: Optional[str] = field(default=None)  # Background meal plan job queued during this turn
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+LLM-free meal planner built from the user's foods and a curated staple table.
+
+Used for generate_meal_plan_structured(mode="fast") and as the fallback when
+the model API is overloaded. Foods are assigned to meal slots greedily
+(protein, carb, vegetable/fruit and fat sources per meal, rotated across the
+week, the user's own foods first) with starting portions from the meal's
+calorie share; the portion solver then fits the day to the macro targets.
+The whole week is built in tens of milliseconds without any network calls.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional
+from agent.portion_solver import scale_day_to_target
+from models.meal_plan import MACROS, DayName, Food, Meal, MealPlanDay, MacroTotals, MealType
+
+ALL_MEALS = frozenset(MealType)
+MAIN_MEALS = frozenset({MealType.LUNCH, MealType.DINNER})
+BREAKFAST_SNACK = frozenset({MealType.BREAKFAST, MealType.SNACK})
+
+# Share of daily calories per meal
+MEAL_CALORIE_SHARE = {
+    MealType.BREAKFAST: 0.25,
+    MealType.LUNCH: 0.30,
+    MealType.DINNER: 0.35,
+    MealType.SNACK: 0.10
+}
+
+# Food roles filled per meal
+MEAL_SLOTS = {
+    MealType.BREAKFAST: ('protein', 'carb', 'fruit'),
+    MealType.LUNCH: ('protein', 'carb', 'vegetable', 'fat'),
+    MealType.DINNER: ('protein', 'carb', 'vegetable', 'fat'),
+    MealType.SNACK: ('protein', 'fruit')
+}
+
+# Fixed calorie weight of produce slots; fruit also counts toward the carb share
+VEGETABLE_WEIGHT = 0.05
+FRUIT_CARB_FRACTION = 0.4
+
+# Starting portion limits before the portion solver rescales
+MIN_PORTION_G = 20
+MAX_PORTION_G = 350
+
+# How many of the user's foods are considered
+MAX_USER_FOODS = 15
+
+# Rotated candidates compared per slot: more fits macros better, fewer varies the week more
+CANDIDATE_WINDOW = 3
+
+# Alternative rotations built per day; the one the portion solver fits best is kept
+DAY_VARIANTS = 4
+
+
+@dataclass(frozen=True)
+class PlannerFood:
+    """A food the planner can place in a meal slot (macros per 100g)."""
+    name: str
+    role: str  # 'protein', 'carb', 'fat', 'vegetable' or 'fruit'
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+    meals: FrozenSet[MealType] = ALL_MEALS
+
+
+def _staple(name: str, role: str, calories: float, protein: float, carbs: float, fat: float,
+            meals: FrozenSet[MealType] = ALL_MEALS) -> PlannerFood:
+    return PlannerFood(name, role, calories, protein, carbs, fat, meals)
+
+
+# Curated staples (per 100g, USDA reference values) that fill slots the user's foods can't
+STAPLE_FOODS: List[PlannerFood] = [
+    _staple("Chicken Breast (Grilled)", "protein", 165, 31, 0, 3.6, MAIN_MEALS),
+    _staple("Salmon Fillet (Baked)", "protein", 208, 20, 0, 13, MAIN_MEALS),
+    _staple("Lean Ground Turkey", "protein", 170, 22, 0, 9, MAIN_MEALS),
+    _staple("Lean Beef Sirloin", "protein", 183, 27, 0, 8, MAIN_MEALS),
+    _staple("Firm Tofu", "protein", 144, 17, 3, 9, MAIN_MEALS),
+    _staple("Cod Fillet (Baked)", "protein", 105, 23, 0, 0.9, MAIN_MEALS),
+    _staple("Eggs (Whole)", "protein", 143, 12.6, 0.7, 9.5, BREAKFAST_SNACK),
+    _staple("Greek Yogurt 0% Fat", "protein", 59, 10, 3.6, 0.4, BREAKFAST_SNACK),
+    _staple("Cottage Cheese Low Fat", "protein", 72, 12.4, 2.7, 1, BREAKFAST_SNACK),
+    _staple("Brown Rice (Cooked)", "carb", 123, 2.7, 25.6, 1, MAIN_MEALS),
+    _staple("Quinoa (Cooked)", "carb", 120, 4.4, 21.3, 1.9, MAIN_MEALS),
+    _staple("Sweet Potato (Baked)", "carb", 90, 2, 20.7, 0.2, MAIN_MEALS),
+    _staple("Whole Wheat Pasta (Cooked)", "carb", 149, 5.8, 30, 1.7, MAIN_MEALS),
+    _staple("Rolled Oats", "carb", 379, 13.2, 67.7, 6.5, frozenset({MealType.BREAKFAST})),
+    _staple("Whole Grain Bread", "carb", 247, 13, 41, 3.4, frozenset({MealType.BREAKFAST})),
+    _staple("Broccoli (Steamed)", "vegetable", 35, 2.4, 7.2, 0.4, MAIN_MEALS),
+    _staple("Mixed Salad Greens", "vegetable", 17, 1.4, 3.3, 0.2, MAIN_MEALS),
+    _staple("Green Beans (Steamed)", "vegetable", 35, 1.9, 7.9, 0.3, MAIN_MEALS),
+    _staple("Bell Pepper", "vegetable", 31, 1, 6, 0.3, MAIN_MEALS),
+    _staple("Banana", "fruit", 89, 1.1, 22.8, 0.3, BREAKFAST_SNACK),
+    _staple("Blueberries", "fruit", 57, 0.7, 14.5, 0.3, BREAKFAST_SNACK),
+    _staple("Apple", "fruit", 52, 0.3, 13.8, 0.2, BREAKFAST_SNACK),
+    _staple("Olive Oil", "fat", 884, 0, 0, 100, MAIN_MEALS),
+    _staple("Avocado", "fat", 160, 2, 8.5, 14.7, MAIN_MEALS),
+    _staple("Almonds", "fat", 579, 21, 22, 50, MAIN_MEALS),
+]
+
+
+def classify_food(calories: float, protein: float, carbs: float, fat: float) -> str:
+    """Assign a role from where a food's calories come from."""
+    if calories <= 0:
+        return 'vegetable'
+    protein_share = protein * 4 / calories
+    carbs_share = carbs * 4 / calories
+    fat_share = fat * 9 / calories
+    if protein_share >= 0.4:
+        return 'protein'
+    if fat_share >= 0.6:
+        return 'fat'
+    if carbs_share >= 0.5:
+        return 'vegetable' if calories < 50 else 'carb'
+    return 'protein' if protein_share >= 0.25 else 'carb'
+
+
+def user_planner_foods(favorite_foods: Optional[List[Dict]]) -> List[PlannerFood]:
+    """Convert favorite or frequently logged food rows into planner foods."""
+    foods = []
+    for row in (favorite_foods or [])[:MAX_USER_FOODS]:
+        calories = float(row.get('calories_per_100g') or 0)
+        protein = float(row.get('protein_per_100g') or 0)
+        carbs = float(row.get('carbs_per_100g') or 0)
+        fat = float(row.get('fat_per_100g') or 0)
+        foods.append(PlannerFood(
+            name=row['name'],
+            role=classify_food(calories, protein, carbs, fat),
+            calories=calories,
+            protein=protein,
+            carbs=carbs,
+            fat=fat
+        ))
+    return foods
+
+
+def _portion(food: PlannerFood, calories: float) -> Food:
+    """Food row for roughly `calories` worth of a planner food."""
+    grams = calories / food.calories * 100 if food.calories > 0 else 100
+    grams = round(min(max(grams, MIN_PORTION_G), MAX_PORTION_G))
+    factor = grams / 100
+    return Food(
+        name=food.name,
+        quantity_g=grams,
+        calories=round(food.calories * factor, 1),
+        protein=round(food.protein * factor, 1),
+        carbs=round(food.carbs * factor, 1),
+        fat=round(food.fat * factor, 1)
+    )
+
+
+def _meal_name(foods: List[Food]) -> str:
+    """Name like "Chicken Breast with Brown Rice and Broccoli"."""
+    names = [food.name for food in foods]
+    if len(names) == 1:
+        return names[0]
+    return f"{names[0]} with {', '.join(names[1:-1])}{' and ' if len(names) > 2 else ''}{names[-1]}"
+
+
+def _gap(running: Dict[str, float], food: Food, user_targets: Dict, planned: float) -> float:
+    """Squared relative distance of the day so far (plus food) from the planned share of the targets."""
+    return sum(
+        ((running[macro] + getattr(food, macro)) / (user_targets[macro] * planned) - 1) ** 2
+        for macro in MACROS
+        if user_targets[macro] > 0
+    )
+
+
+def role_weights(user_targets: Dict) -> Dict[str, float]:
+    """Calorie weight of each role, following the targets' protein/carb/fat split."""
+    calories = {
+        'protein': user_targets['protein'] * 4,
+        'carb': user_targets['carbs'] * 4,
+        'fat': user_targets['fat'] * 9
+    }
+    total = sum(calories.values()) or 1
+    weights = {role: value / total for role, value in calories.items()}
+    weights['vegetable'] = VEGETABLE_WEIGHT
+    weights['fruit'] = weights['carb'] * FRUIT_CARB_FRACTION
+    return weights
+
+
+def plan_day(
+    user_targets: Dict,
+    day_index: int,
+    date: str,
+    user_foods: List[PlannerFood],
+    variant: int = 0
+) -> MealPlanDay:
+    """
+    Build one day by filling each meal's slots from the user's foods and staples.
+
+    Candidates for a slot are the user's foods matching its role and meal
+    type, or staples when none match, rotated by day so the week varies.
+    Each slot's share of the meal's calories follows the targets' macro
+    split. Of the first CANDIDATE_WINDOW candidates, the greedy pick is the
+    one keeping the day's running macros closest to the targets; foods
+    already used that day are skipped.
+
+    Args:
+        user_targets: Daily macro targets (for starting portions)
+        day_index: 0-6 (Monday-Sunday)
+        date: Date of the day (YYYY-MM-DD)
+        user_foods: Planner foods from the user's favorites
+        variant: Shifts the rotation to build an alternative day
+
+    Returns:
+        MealPlanDay with unscaled starting portions
+    """
+    day_name = list(DayName)[day_index]
+    used = set()
+    meals = []
+    running = {macro: 0.0 for macro in MACROS}
+    planned = 0.0  # Fraction of the daily calories assigned so far
+    weights = role_weights(user_targets)
+
+    for meal_idx, (meal_type, slots) in enumerate(MEAL_SLOTS.items()):
+        meal_calories = user_targets['calories'] * MEAL_CALORIE_SHARE[meal_type]
+        meal_weight = sum(weights[role] for role in slots)
+        foods = []
+        for slot_idx, role in enumerate(slots):
+            share = weights[role] / meal_weight
+            def fits(food: PlannerFood) -> bool:
+                return food.role == role and meal_type in food.meals and food.name not in used
+
+            # The user's own foods when any fit, staples otherwise
+            candidates = [food for food in user_foods if fits(food)] or [food for food in STAPLE_FOODS if fits(food)]
+            if not candidates:
+                continue
+            # Rotate through candidates by day; offset by meal so lunch and dinner differ
+            offset = (day_index + variant * 2 + meal_idx * 3 + slot_idx) % len(candidates)
+            window = (candidates[offset:] + candidates[:offset])[:CANDIDATE_WINDOW]
+
+            planned += MEAL_CALORIE_SHARE[meal_type] * share
+            portions = {food.name: _portion(food, meal_calories * share) for food in window}
+            name = min(portions, key=lambda name: _gap(running, portions[name], user_targets, planned))
+
+            used.add(name)
+            foods.append(portions[name])
+            for macro in MACROS:
+                running[macro] += getattr(portions[name], macro)
+
+        meals.append(Meal(
+            id=f"meal_{day_name.value.lower()}_{meal_idx + 1:03d}_{meal_type.value}",
+            name=_meal_name(foods),
+            meal_type=meal_type,
+            foods=foods,
+            totals=MacroTotals.sum_of(foods)
+        ))
+
+    return MealPlanDay(
+        date=date,
+        day_name=day_name,
+        meals=meals,
+        daily_totals=MacroTotals.sum_of([meal.totals for meal in meals])
+    )
+
+
+def _fit(day: MealPlanDay, target: MacroTotals) -> float:
+    """Lowest target fraction any macro reaches once the portion solver has scaled the day."""
+    totals = scale_day_to_target(day, target).daily_totals
+    return min(getattr(totals, macro) / getattr(target, macro) for macro in MACROS if getattr(target, macro) > 0)
+
+
+def plan_week(user_targets: Dict, favorite_foods: Optional[List[Dict]], week_start: str) -> List[MealPlanDay]:
+    """
+    Build 7 days without calling the model.
+
+    Each day is built in DAY_VARIANTS rotations and the one whose foods let
+    the portion solver get closest to every target is kept.
+
+    Args:
+        user_targets: Daily macro targets (calories, protein, carbs, fat)
+        favorite_foods: Favorite or frequently logged foods (may be empty)
+        week_start: Week start date (YYYY-MM-DD, a Monday)
+
+    Returns:
+        7 MealPlanDay objects with starting portions (rescale with the portion solver)
+    """
+    base_date = datetime.strptime(week_start, '%Y-%m-%d')
+    user_foods = user_planner_foods(favorite_foods)
+    target = MacroTotals(**{macro: user_targets[macro] for macro in MACROS})
+
+    days = []
+    for idx in range(7):
+        date = (base_date + timedelta(days=idx)).strftime('%Y-%m-%d')
+        variants = [plan_day(user_targets, idx, date, user_foods, variant) for variant in range(DAY_VARIANTS)]
+        # max keeps the first (default rotation) on ties
+        days.append(max(variants, key=lambda day: _fit(day, target)))
+    return days
@@ -0,0 +1,185 @@
+"""
+Hedged requests and retry budgets for meal plan model calls.
+
+A hedged call fires a duplicate request when the first one hasn't returned
+within the learned p90 latency and keeps whichever finishes first. A global
+hedge budget caps duplicates to a fraction of all calls, so hedging can't
+double load while the API is already overloaded.
+
+A RetryBudget is shared by every retry layer of one meal plan generation
+(overload backoff, day retries, chunk splits), so nested retries add up to
+one fixed cap instead of multiplying.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Iterator, Optional, TypeVar
+from agent.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Recent successful call latencies used for the p90
+LATENCY_WINDOW = 200
+# Below this many samples the configured default delay is used instead of the p90
+MIN_LATENCY_SAMPLES = 20
+# Hedges that can be spent at once before the budget has to refill
+HEDGE_BURST = 3.0
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies.
+
+    Args:
+        default_seconds: Value returned by p90 until enough samples are recorded
+        window: Number of recent latencies kept
+        min_samples: Samples needed before the measured p90 is used
+    """
+
+    def __init__(self, default_seconds: float, window: int = LATENCY_WINDOW, min_samples: int = MIN_LATENCY_SAMPLES):
+        self.default_seconds = default_seconds
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Add a successful call's latency."""
+        self._samples.append(seconds)
+
+    def p90(self) -> float:
+        """90th percentile latency (default_seconds while warming up)."""
+        if len(self._samples) < self.min_samples:
+            return self.default_seconds
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a fraction of calls.
+
+    Every call adds `ratio` tokens (up to `burst`); a hedge spends one.
+
+    Args:
+        ratio: Maximum long-run hedges per call (e.g. 0.1 = 10%)
+        burst: Maximum tokens saved up
+    """
+
+    def __init__(self, ratio: float, burst: float = HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+
+    def record_call(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one hedge token if available."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RetryBudget:
+    """
+    Number of retries left for one meal plan generation.
+
+    Args:
+        retries: Total retries allowed across all retry layers
+    """
+
+    def __init__(self, retries: int):
+        self.remaining = retries
+
+    def try_spend(self, reason: str) -> bool:
+        """Use one retry, or return False (and log) if the budget is exhausted."""
+        if self.remaining <= 0:
+            logger.warning(f"Retry budget exhausted, not retrying: {reason}")
+            return False
+        self.remaining -= 1
+        return True
+
+
+# Budget of the generation running in the current task (inherited by gathered subtasks)
+_current_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("meal_plan_retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget_scope() -> Iterator[RetryBudget]:
+    """Give the generation running inside the block (and its subtasks) one shared retry budget."""
+    budget = RetryBudget(settings.meal_plan_retry_budget)
+    token = _current_retry_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_retry_budget.reset(token)
+
+
+def current_retry_budget() -> RetryBudget:
+    """The current generation's retry budget (a fresh one outside a generation)."""
+    budget = _current_retry_budget.get()
+    return budget if budget is not None else RetryBudget(settings.meal_plan_retry_budget)
+
+
+async def run_hedged(
+    call: Callable[[], Awaitable[T]],
+    latency: LatencyTracker,
+    budget: HedgeBudget,
+    label: str
+) -> T:
+    """
+    Run a call, firing one duplicate if it is slower than the p90 latency.
+
+    The first successful result wins and the other request is cancelled. If
+    one copy fails, the other is still awaited; the first error is raised
+    only if both fail.
+
+    Args:
+        call: Factory starting a new request each time it is called
+        latency: Latency history for this kind of call (updated on success)
+        budget: Global hedge budget
+        label: Description for log messages
+
+    Returns:
+        Result of whichever request succeeded first
+    """
+    budget.record_call()
+    started = {}
+
+    def launch() -> asyncio.Task:
+        task = asyncio.ensure_future(call())
+        started[task] = time.monotonic()
+        return task
+
+    primary = launch()
+    pending = {primary}
+    error: Optional[BaseException] = None
+
+    try:
+        delay = latency.p90()
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done and budget.try_spend():
+            logger.info(f"{label} slower than p90 ({delay:.1f}s), sending hedged request")
+            pending.add(launch())
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    latency.record(time.monotonic() - started[task])
+                    if task is not primary:
+                        logger.info(f"Hedged request won for {label}")
+                    return task.result()
+                error = error or task.exception()
+
+        raise error
+
+    finally:
+        for task in pending:
+            task.cancel()
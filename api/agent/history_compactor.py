@@ -0,0 +1,212 @@
+"""
+Token-budgeted conversation history compaction for the coach agent.
+
+Keeps the most recent turns verbatim and folds older turns into a rolling
+summary. Summaries are cached per conversation and updated incrementally:
+each call only summarizes turns that fell out of the verbatim window since
+the last call, so long chats don't re-summarize their whole past. A cached
+summary is only extended when the history still has the last message it
+folded at the same position; otherwise (e.g. two client-held chats that both
+open with "hi") the prefix is summarized from scratch. Checking one message
+keeps the check O(1) instead of re-rendering the whole folded prefix.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart
+)
+from agent.providers import get_llm_model
+from agent.prompts import HISTORY_SUMMARY_PROMPT
+from agent.settings import settings
+from utils.tokens import estimate_tokens
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Tool results are folded into the summary transcript, truncated to this length
+TOOL_RESULT_TRANSCRIPT_CHARS = 400
+
+SUMMARY_PREFIX = "Summary of the earlier conversation with this user:\n"
+
+history_summarizer = Agent(
+    get_llm_model(),
+    output_type=str,
+    system_prompt=HISTORY_SUMMARY_PROMPT
+)
+
+
+@dataclass
+class RollingSummary:
+    """Cached summary of the first `folded_count` messages of a conversation."""
+    folded_count: int
+    summary: str
+    last_folded_hash: str  # _message_hash of messages[folded_count - 1]
+
+
+@dataclass
+class CompactionResult:
+    """Outcome of compacting a message history."""
+    messages: List[ModelMessage]
+    tokens_saved: int = 0
+
+
+def estimate_message_tokens(messages: List[ModelMessage]) -> int:
+    """Estimate the prompt tokens a message history will cost."""
+    total = 0
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, ToolCallPart):
+                total += estimate_tokens(part.tool_name) + estimate_tokens(part.args_as_json_str())
+            else:
+                content = getattr(part, 'content', '')
+                total += estimate_tokens(content if isinstance(content, str) else str(content))
+    return total
+
+
+def _is_turn_start(message: ModelMessage) -> bool:
+    """A turn starts at each request carrying a user prompt."""
+    return isinstance(message, ModelRequest) and any(
+        isinstance(part, UserPromptPart) for part in message.parts
+    )
+
+
+def _render_transcript(messages: List[ModelMessage]) -> str:
+    """Render messages as a plain-text transcript for the summarizer."""
+    lines = []
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, UserPromptPart):
+                lines.append(f"User: {part.content}")
+            elif isinstance(part, TextPart) and part.content.strip():
+                lines.append(f"Coach: {part.content}")
+            elif isinstance(part, ToolReturnPart):
+                lines.append(f"[{part.tool_name} result]: {part.model_response_str()[:TOOL_RESULT_TRANSCRIPT_CHARS]}")
+    return "\n".join(lines)
+
+
+def _message_hash(message: ModelMessage) -> str:
+    """Hash one message's transcript to check a cached summary still applies."""
+    return hashlib.sha256(_render_transcript([message]).encode()).hexdigest()
+
+
+class HistoryCompactor:
+    """
+    Folds older turns into a cached rolling summary under a token budget.
+
+    Args:
+        keep_turns: Number of most recent turns kept verbatim
+        token_budget: Estimated history tokens allowed before compacting
+        cache_size: Max number of conversations with cached summaries
+    """
+
+    def __init__(self, keep_turns: int, token_budget: int, cache_size: int):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self._summaries: TTLCache[str, RollingSummary] = TTLCache(maxsize=cache_size, ttl_seconds=None)
+
+    @staticmethod
+    def conversation_key(user_id: str, messages: List[ModelMessage], conversation_id: Optional[str] = None) -> str:
+        """
+        Build the summary cache key for a conversation.
+
+        Uses the server-side conversation_id when available; otherwise the
+        first message identifies a client-held history (it never changes as
+        the conversation grows). Histories sharing a key are told apart by
+        the last folded message's hash stored with each summary.
+        """
+        if conversation_id:
+            return f"{user_id}:{conversation_id}"
+        first = _render_transcript(messages[:1])
+        return f"{user_id}:{hashlib.sha256(first.encode()).hexdigest()[:16]}"
+
+    async def _summarize(self, previous_summary: Optional[str], messages: List[ModelMessage]) -> str:
+        prompt = ""
+        if previous_summary:
+            prompt += f"Previous summary:\n{previous_summary}\n\n"
+        prompt += f"New exchanges to merge:\n{_render_transcript(messages)}"
+
+        result = await history_summarizer.run(prompt)
+        return result.output.strip()
+
+    async def compact(self, messages: Optional[List[ModelMessage]], key: str) -> CompactionResult:
+        """
+        Compact a message history if it exceeds the token budget.
+
+        Args:
+            messages: Full message history (None or empty is returned as-is)
+            key: Conversation cache key (see conversation_key)
+
+        Returns:
+            CompactionResult with the history to send and estimated tokens saved.
+            On summarizer failure the original history is returned.
+        """
+        if not messages:
+            return CompactionResult(messages=messages or [])
+
+        original_tokens = estimate_message_tokens(messages)
+        if original_tokens <= self.token_budget:
+            return CompactionResult(messages=messages)
+
+        turn_starts = [i for i, message in enumerate(messages) if _is_turn_start(message)]
+        if len(turn_starts) <= self.keep_turns:
+            return CompactionResult(messages=messages)
+
+        # Cut on a turn boundary so tool call/return pairs are never split
+        cut = turn_starts[-self.keep_turns]
+
+        cached = self._summaries.get(key)
+        if (
+            cached is not None
+            and cached.folded_count <= cut
+            and cached.last_folded_hash == _message_hash(messages[cached.folded_count - 1])
+        ):
+            previous_summary, to_fold = cached.summary, messages[cached.folded_count:cut]
+        else:
+            previous_summary, to_fold = None, messages[:cut]
+
+        if to_fold:
+            try:
+                summary = await self._summarize(previous_summary, to_fold)
+            except Exception as e:
+                logger.error(f"History summarization failed, sending full history: {e}")
+                return CompactionResult(messages=messages)
+            self._summaries.set(
+                key,
+                RollingSummary(folded_count=cut, summary=summary, last_folded_hash=_message_hash(messages[cut - 1]))
+            )
+            logger.debug(f"Folded {len(to_fold)} messages into rolling summary for {key}")
+        else:
+            summary = previous_summary
+
+        # System prompt only lives in the first request of a history, so carry it over
+        system_parts = [part for part in messages[0].parts if isinstance(part, SystemPromptPart)]
+        first_kept = messages[cut]
+        merged_first = ModelRequest(
+            parts=[
+                *system_parts,
+                SystemPromptPart(content=SUMMARY_PREFIX + summary),
+                *[part for part in first_kept.parts if not isinstance(part, SystemPromptPart)]
+            ]
+        )
+        compacted = [merged_first, *messages[cut + 1:]]
+
+        tokens_saved = max(0, original_tokens - estimate_message_tokens(compacted))
+        return CompactionResult(messages=compacted, tokens_saved=tokens_saved)
+
+
+# Global compactor instance for the coach agent
+history_compactor = HistoryCompactor(
+    keep_turns=settings.history_keep_turns,
+    token_budget=settings.history_token_budget,
+    cache_size=settings.history_summary_cache_size
+)
@@ -1,24 +1,71 @@
 """
 Claude-powered meal plan generator using chunked structured outputs.
 
-This module creates personalized 7-day meal plans by generating 3-4 days at a time
+This module creates personalized 7-day meal plans by generating 1-2 days at a time
 using Claude 4.5 Haiku with Pydantic AI's structured output capabilities.
 Claude 4.5 Haiku provides faster and more reliable structured output generation.
-This optimized chunking approach reduces API calls from 4 to 2 for faster generation.
+Chunks are generated concurrently (each with pre-assigned daily themes to keep
+variety across chunks), so wall-clock time approaches a single chunk.
+
+An optional "outline" mode first generates a compact week outline (meal names
+only) and then expands each day in parallel, so a failed day can be retried
+without regenerating its neighbours.
+
+Single days or meals of a saved plan can be regenerated on their own
+(regenerate_day / regenerate_meal), with the rest of the week as context.
+
+The model only chooses foods; macros of foods found in the food database are
+recomputed from per-100g values (database/food_index.py), and portions are
+rescaled to the macro targets by the deterministic portion solver
+(agent/portion_solver.py).
 """
 
 import logging
 import os
 import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from pydantic_ai import Agent
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from anthropic import APIConnectionError, AsyncAnthropic
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.exceptions import ModelHTTPError, UnexpectedModelBehavior
 from pydantic_ai.models.anthropic import AnthropicModel
+from pydantic_ai.providers.anthropic import AnthropicProvider
 from pydantic_ai.settings import ModelSettings
-from models.meal_plan import DayChunk, MealPlan, MacroTotals, DayName
+from models.meal_plan import (
+    MACROS,
+    DayChunk,
+    DayOutline,
+    Meal,
+    MealPlan,
+    MealPlanDay,
+    MacroTotals,
+    DayName,
+    WeekOutline
+)
 from agent.settings import load_settings
+from agent.portion_solver import scale_day_to_target
+from agent.day_cache import day_cache
+from agent.fallback_planner import plan_week
+from agent.prompt_builder import (
+    build_chunk_prompt,
+    estimate_request_tokens,
+    format_favorites,
+    format_preferences,
+    format_targets
+)
+from agent.output_validation import output_metrics, validate_chunk, validate_day, validate_meal
+from agent.hedging import HedgeBudget, LatencyTracker, current_retry_budget, retry_budget_scope, run_hedged
+from database.food_index import food_index
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # Load settings and configure Anthropic API key
 settings = load_settings()
 os.environ['ANTHROPIC_API_KEY'] = settings.llm_api_key
@@ -26,90 +73,26 @@ os.environ['ANTHROPIC_API_KEY'] = settings.llm_api_key
 # System prompt for chunked meal plan generation
 DAY_CHUNK_SYSTEM_PROMPT = """You are an expert nutritionist creating personalized meal plans.
 
-CRITICAL: Generate 1-2 days of meals with COMPLETE structure for each day.
-
-REQUIRED STRUCTURE:
-{
-  "daily_target": {
-    "calories": 2000,
-    "protein": 150,
-    "carbs": 200,
-    "fat": 67
-  },
-  "days": [
-    {
-      "date": "2025-01-13",
-      "day_name": "Monday",
-      "meals": [
-        {
-          "id": "meal_monday_001_breakfast",
-          "name": "Protein Breakfast Bowl",
-          "meal_type": "breakfast",
-          "foods": [
-            {
-              "name": "Greek Yogurt 0% Fat",
-              "quantity_g": 200,
-              "calories": 118,
-              "protein": 20.4,
-              "carbs": 7.2,
-              "fat": 0.8
-            }
-          ],
-          "totals": {
-            "calories": 118,
-            "protein": 20.4,
-            "carbs": 7.2,
-            "fat": 0.8
-          }
-        }
-      ],
-      "daily_totals": {
-        "calories": 2000,
-        "protein": 150,
-        "carbs": 200,
-        "fat": 67
-      }
-    }
-  ]
-}
+Generate exactly the requested days (1-2), each with its date, day_name and complete meals.
+The output schema gives the structure; set daily_target to the user's daily targets.
+Meal ids look like "meal_monday_001_breakfast".
 
 ALLOWED VALUES (case-sensitive):
 - meal_type: "breakfast", "lunch", "dinner", "snack" (lowercase)
-- day_name: "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday" (exact capitalization)
+- day_name: "Monday" ... "Sunday" (exact capitalization)
 - date format: "YYYY-MM-DD"
 
 REQUIREMENTS:
 1. Each day must have 3-4 meals
 2. Each meal must have at least 1 food item
-3. **CRITICAL: Daily totals MUST equal the sum of all meal totals for that day**
-4. **CRITICAL: Daily totals MUST NEVER EXCEED user's macro targets**
-5. **CRITICAL: Daily totals should be as close as possible to targets WITHOUT going over**
-6. **YOU MUST adjust portion sizes (quantity_g) to stay UNDER or AT the targets**
-7. All numbers >= 0 (quantity_g must be > 0)
-8. Ensure variety - don't repeat the same meals
-
-**MANDATORY CALCULATION PROCESS:**
-1. First, plan the meals and their base foods
-2. Calculate the initial totals for all meals combined
-3. Compare to the user's daily targets
-4. **IF TOTAL EXCEEDS TARGET**: DECREASE portion sizes until UNDER the target
-5. **IF TOTAL IS UNDER TARGET**: INCREASE portion sizes to get closer (but NEVER exceed)
-6. Fine-tune each macro by adjusting specific foods
-7. **VERIFY: daily_totals MUST BE ≤ targets (never over, get as close as possible)**
-8. Final check: Ensure NO macro exceeds its target
-
-**CALCULATION RULES:**
-- meal.totals = sum of all foods in that meal
-- day.daily_totals = sum of all meal.totals for that day
-- **CRITICAL**: daily_totals.calories ≤ target.calories (NEVER exceed)
-- **CRITICAL**: daily_totals.protein ≤ target.protein (NEVER exceed)
-- **CRITICAL**: daily_totals.carbs ≤ target.carbs (NEVER exceed)
-- **CRITICAL**: daily_totals.fat ≤ target.fat (NEVER exceed)
-- Aim to get within 1-2% UNDER the target, but NEVER go over
-
-**DO NOT** generate meals that exceed the target. ALWAYS stay under and get as close as possible!
-
-Generate complete, realistic meals with accurate macro calculations that HIT THE TARGET.
+3. Each food's calories, protein, carbs and fat must be accurate for its quantity_g
+4. Choose foods whose combined macro profile can match the user's targets
+5. All numbers >= 0 (quantity_g must be > 0)
+6. Ensure variety - don't repeat the same meals; follow each day's theme
+7. Use the user's favorite foods when given, otherwise common healthy whole foods
+
+Portion sizes are rescaled afterwards to hit the targets and totals are recomputed,
+so focus on realistic foods with accurate per-food macros rather than arithmetic.
 """
 
 # Model settings with increased max_tokens for structured output generation
@@ -118,17 +101,146 @@ model_settings = ModelSettings(
     temperature=0.7   # Slight creativity for meal variety
 )
 
+# Claude 4.5 Haiku for structured output, while chat uses 3.5 Haiku
+# SDK retries are off: _run_with_overload_retry is the only retry layer, bounded by the retry budget
+meal_plan_model = AnthropicModel(
+    "claude-haiku-4-5-20251001",  # More powerful for meal generation
+    provider=AnthropicProvider(anthropic_client=AsyncAnthropic(api_key=settings.llm_api_key, max_retries=0))
+)
+
+
+@dataclass(frozen=True)
+class ChunkRequest:
+    """Days a chunk run must return, passed as deps so the output validator can check them."""
+    days: list[tuple[str, str]]  # (day name, YYYY-MM-DD date)
+
+
 # Create chunk generator agent with Claude 4.5 Haiku for faster, more powerful generation
-# Note: Uses Claude 4.5 Haiku for structured output, while chat uses 3.5 Haiku
 day_chunk_generator = Agent(
-    AnthropicModel("claude-haiku-4-5-20251001"),  # More powerful for meal generation
+    meal_plan_model,
+    deps_type=ChunkRequest,
     output_type=DayChunk,  # Generate 1-2 days at a time
     system_prompt=DAY_CHUNK_SYSTEM_PROMPT,
     retries=5,  # Increased retries for handling temporary API overloads
-    output_retries=3,  # Additional retries specifically for output validation
+    # One round trip for the validator's structural feedback (wrong days, missing meals); a chunk
+    # still invalid after that, e.g. truncated at max_tokens again, is split in two instead
+    output_retries=1,
     model_settings=model_settings  # Apply max_tokens and temperature settings
 )
 
+# Output size model for planning chunks (approximate JSON tokens of a DayChunk)
+TOKENS_PER_FOOD = 60
+TOKENS_PER_MEAL = 60
+TOKENS_PER_DAY = 80
+MEALS_PER_DAY = 4
+# Share of max_tokens a chunk is planned to use, leaving headroom for verbose answers
+CHUNK_TOKEN_BUDGET = 0.5
+MAX_DAYS_PER_CHUNK = 2  # DayChunk holds at most 2 days
+
+# System prompt for the cheap outline pass of the two-phase pipeline
+OUTLINE_SYSTEM_PROMPT = """You are an expert nutritionist planning a varied week of meals.
+
+Produce ONLY an outline: for each of the 7 days (Monday to Sunday) list 3-4 meals
+with a meal_type ("breakfast", "lunch", "dinner", "snack") and a short descriptive name.
+Do not include foods, quantities or macros - those are filled in later.
+
+Keep the week varied (no meal name repeated), follow the user's food preferences,
+and favour the user's favorite foods when they are provided.
+"""
+
+# System prompt for expanding one outlined day into full meals
+DAY_DETAIL_SYSTEM_PROMPT = """You are an expert nutritionist turning a planned day of meals into a complete, detailed day.
+
+For EACH meal in the outline, keep its name and meal_type and list realistic foods with
+quantity_g, calories, protein, carbs and fat for that quantity.
+
+REQUIREMENTS:
+1. Each food's macros must be accurate for its quantity_g
+2. Choose foods whose combined macro profile can match the user's targets
+3. All numbers >= 0 (quantity_g must be > 0)
+4. Use the exact date and day_name you are given; meal ids look like "meal_monday_001_breakfast"
+5. Use the user's favorite foods when given, otherwise common healthy whole foods
+
+Portion sizes are rescaled afterwards to hit the targets and totals are recomputed.
+"""
+
+# Outline pass: meal names only, so output is small and fast
+outline_generator = Agent(
+    meal_plan_model,
+    output_type=WeekOutline,
+    system_prompt=OUTLINE_SYSTEM_PROMPT,
+    retries=5,
+    output_retries=2,
+    model_settings=ModelSettings(max_tokens=1500, temperature=0.8)
+)
+
+# Detail pass: expands one outlined day, so days can run (and be retried) independently
+day_detail_generator = Agent(
+    meal_plan_model,
+    output_type=MealPlanDay,
+    system_prompt=DAY_DETAIL_SYSTEM_PROMPT,
+    retries=5,
+    output_retries=1,
+    model_settings=ModelSettings(max_tokens=4000, temperature=0.5)
+)
+
+# System prompt for replacing a single meal in an existing plan
+MEAL_EDIT_SYSTEM_PROMPT = """You are an expert nutritionist replacing one meal in an existing meal plan.
+
+List realistic foods with quantity_g, calories, protein, carbs and fat for that quantity.
+
+REQUIREMENTS:
+1. Follow the user's change request
+2. Use the exact id and meal_type you are given
+3. Choose foods whose combined macro profile can match the meal's targets
+4. All numbers >= 0 (quantity_g must be > 0)
+5. Use the user's favorite foods when given, otherwise common healthy whole foods
+
+Portion sizes are rescaled afterwards to hit the targets and totals are recomputed.
+"""
+
+# Single-meal edits: one small call instead of regenerating the day or week
+meal_generator = Agent(
+    meal_plan_model,
+    output_type=Meal,
+    system_prompt=MEAL_EDIT_SYSTEM_PROMPT,
+    retries=5,
+    output_retries=1,
+    model_settings=ModelSettings(max_tokens=1500, temperature=0.7)
+)
+
+# Totals are repaired in-process; only structural problems cost a model round trip
+@day_chunk_generator.output_validator
+def _validate_chunk_output(ctx: RunContext[Optional[ChunkRequest]], chunk: DayChunk) -> DayChunk:
+    requested_days = ctx.deps.days if ctx.deps is not None else None
+    return validate_chunk(chunk, requested_days, "day_chunk", output_metrics)
+
+
+@day_detail_generator.output_validator
+def _validate_day_output(day: MealPlanDay) -> MealPlanDay:
+    return validate_day(day, "day_detail", output_metrics)
+
+
+@meal_generator.output_validator
+def _validate_meal_output(meal: Meal) -> Meal:
+    return validate_meal(meal, "meal", output_metrics)
+
+
+# Supported generate_meal_plan_structured modes
+GENERATION_MODES = ("chunked", "outline", "fast")
+
+# Daily meal themes assigned up front so concurrently generated chunks
+# don't converge on the same dishes (they can't see each other's output)
+MEAL_THEMES = [
+    "Mediterranean (grilled proteins, olive oil, legumes, whole grains)",
+    "Mexican-inspired (beans, rice, peppers, lean meats, salsa)",
+    "East Asian (stir-fries, rice or noodles, tofu, fish)",
+    "Classic American (eggs, lean burgers, potatoes, sandwiches)",
+    "Middle Eastern (chickpeas, yogurt, lamb or chicken, flatbread)",
+    "Italian (pasta, tomatoes, lean poultry, cheese in moderation)",
+    "Simple comfort food (oats, roasted vegetables, salmon, baked dishes)"
+]
+
 # Day name mapping
 DAY_NAMES = [
     DayName.MONDAY,
@@ -141,12 +253,73 @@ DAY_NAMES = [
 ]
 
 
+# Day-chunk latency history and global hedge budget (used when MEAL_PLAN_HEDGING is on)
+chunk_latency = LatencyTracker(default_seconds=settings.meal_plan_hedge_default_seconds)
+hedge_budget = HedgeBudget(ratio=settings.meal_plan_hedge_ratio)
+
+# HTTP statuses worth retrying: rate limited, server errors, overloaded
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a model call failed transiently (overload, rate limit, connection)."""
+    if isinstance(error, ModelHTTPError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, APIConnectionError):
+        return True
+    error_str = str(error)
+    return "overloaded" in error_str.lower() or "529" in error_str
+
+
+async def _run_with_overload_retry(agent: Agent, prompt: str, label: str, hedge: bool = False, deps=None):
+    """
+    Run a generator agent, retrying with exponential backoff on API overload (529).
+
+    Retries are drawn from the current generation's retry budget, so they
+    can't multiply with the day retries and chunk splits around them.
+
+    Args:
+        agent: Generator agent to run
+        prompt: User prompt
+        label: Description for log messages
+        hedge: Hedge slow calls (when MEAL_PLAN_HEDGING is enabled)
+        deps: Optional run dependencies (e.g. ChunkRequest for the chunk generator)
+
+    Returns:
+        The agent run result
+    """
+    max_retries = 3
+    base_delay = 2  # seconds
+    retry_budget = current_retry_budget()
+
+    for attempt in range(max_retries):
+        try:
+            if hedge and settings.meal_plan_hedging:
+                return await run_hedged(lambda: agent.run(prompt, deps=deps), chunk_latency, hedge_budget, label)
+            return await agent.run(prompt, deps=deps)
+
+        except Exception as e:
+            if (
+                _is_retryable(e)
+                and attempt < max_retries - 1
+                and retry_budget.try_spend(f"{label} failed with {e}")
+            ):
+                delay = base_delay * (2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
+                logger.warning(f"API overloaded, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
+                await asyncio.sleep(delay)
+                continue
+
+            logger.error(f"Failed to generate {label}: {e}", exc_info=True)
+            raise
+
+
 async def generate_day_chunk(
     user_targets: dict,
     favorite_foods: list,
     start_date: str,
     day_indices: list[int],
-    food_preferences: str = ""
+    food_preferences: str = "",
+    day_themes: dict[int, str] | None = None
 ) -> DayChunk:
     """
     Generate a chunk of 1-2 days of meals using Claude 4.5 Haiku.
@@ -156,146 +329,503 @@ async def generate_day_chunk(
         favorite_foods: User's favorite foods with macro info
         start_date: Starting date for the chunk (YYYY-MM-DD)
         day_indices: Which day indices to generate (0-6 for Mon-Sun)
+        food_preferences: User's specific food preferences from conversation
+        day_themes: Optional meal theme per day index, used to keep variety
+                    across chunks that are generated concurrently
 
     Returns:
         DayChunk with 1-2 days of validated meals
 
     Note:
-        Uses Claude 4.5 Haiku with max_tokens=8000 and output_retries=3
-        for reliable structured output generation.
+        Portions are not final: generate_meal_plan_structured rescales
+        every day to the targets with the portion solver.
     """
-    # Calculate actual dates
+    # Pre-assigned themes keep this chunk distinct from the others generated in parallel
     base_date = datetime.strptime(start_date, '%Y-%m-%d')
-    dates_and_days = []
-    for idx in day_indices:
-        date = base_date + timedelta(days=idx)
-        dates_and_days.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'day_name': DAY_NAMES[idx].value
-        })
-
-    # Build prompt
-    prompt = f"""Create meals for the following day(s):
-
-**Daily Macro Targets:**
-- Calories: {user_targets['calories']}
-- Protein: {user_targets['protein']}g
-- Carbohydrates: {user_targets['carbs']}g
-- Fat: {user_targets['fat']}g
-
-**Days to generate:**
-"""
-    for info in dates_and_days:
-        prompt += f"- {info['day_name']} ({info['date']})\n"
+    days = [
+        (
+            DAY_NAMES[idx].value,
+            (base_date + timedelta(days=idx)).strftime('%Y-%m-%d'),
+            (day_themes or {}).get(idx)
+        )
+        for idx in day_indices
+    ]
+    prompt = build_chunk_prompt(user_targets, favorite_foods, days, food_preferences)
+
+    day_names = [day_name for day_name, _, _ in days]
+    prompt_tokens = estimate_request_tokens(DAY_CHUNK_SYSTEM_PROMPT, prompt)
+    logger.info(f"Generating chunk for days {day_indices}: {day_names} (~{prompt_tokens} prompt tokens)")
+
+    started = time.monotonic()
+    result = await _run_with_overload_retry(
+        day_chunk_generator,
+        prompt,
+        f"day chunk {day_names}",
+        hedge=True,
+        deps=ChunkRequest(days=[(day_name, date) for day_name, date, _ in days])
+    )
+    chunk = result.output
+
+    usage = result.usage()
+    logger.info(
+        f"Generated chunk {day_names} in {time.monotonic() - started:.1f}s "
+        f"({usage.input_tokens} input / {usage.output_tokens} output tokens, "
+        f"{usage.output_tokens / len(chunk.days):.0f} per day)"
+    )
+    return chunk
+
+
+def estimate_day_tokens(user_targets: dict, favorite_foods: list, meals_per_day: int = MEALS_PER_DAY) -> int:
+    """
+    Estimate the output tokens of one generated day.
+
+    Higher calorie targets mean more foods per meal, and favorite foods tend
+    to be mixed in alongside the usual staples.
 
+    Args:
+        user_targets: Daily macro targets
+        favorite_foods: User's favorite foods (only the 10 in the prompt count)
+        meals_per_day: Expected meals per day
+
+    Returns:
+        Estimated output tokens for the day
+    """
+    foods_per_meal = 3 + user_targets['calories'] / 1000 + min(len(favorite_foods or []), 10) / 5
+    return round(TOKENS_PER_DAY + meals_per_day * (TOKENS_PER_MEAL + foods_per_meal * TOKENS_PER_FOOD))
+
+
+def plan_chunks(user_targets: dict, favorite_foods: list, days: int = 7) -> list[list[int]]:
+    """
+    Split the week into contiguous chunks sized to fit the output token budget.
+
+    Args:
+        user_targets: Daily macro targets
+        favorite_foods: User's favorite foods
+        days: Number of days to plan
+
+    Returns:
+        Day index lists, e.g. [[0, 1], [2, 3], [4, 5], [6]]
+    """
+    budget = model_settings['max_tokens'] * CHUNK_TOKEN_BUDGET
+    days_per_chunk = max(1, min(MAX_DAYS_PER_CHUNK, int(budget // estimate_day_tokens(user_targets, favorite_foods))))
+    return [list(range(start, min(start + days_per_chunk, days))) for start in range(0, days, days_per_chunk)]
+
+
+def assign_day_themes(week_start: str) -> dict[int, str]:
+    """
+    Assign a distinct meal theme to each day of the week.
+
+    The rotation is offset by ISO week number so consecutive weeks don't
+    start with the same themes.
+
+    Args:
+        week_start: Week start date (YYYY-MM-DD)
+
+    Returns:
+        Mapping of day index (0-6) to theme description
+    """
+    offset = datetime.strptime(week_start, '%Y-%m-%d').isocalendar()[1]
+    return {
+        idx: MEAL_THEMES[(idx + offset) % len(MEAL_THEMES)]
+        for idx in range(len(DAY_NAMES))
+    }
+
+
+async def generate_week_outline(
+    user_targets: dict,
+    favorite_foods: list,
+    week_start: str,
+    food_preferences: str = ""
+) -> WeekOutline:
+    """
+    Generate a compact 7-day outline (meal names and types only).
+
+    Args:
+        user_targets: Daily macro targets
+        favorite_foods: User's favorite foods with macro info
+        week_start: Week start date (YYYY-MM-DD)
+        food_preferences: User's specific food preferences from conversation
+
+    Returns:
+        WeekOutline with 7 days of 3-4 named meals
+    """
+    prompt = f"Outline a week of meals starting {week_start}.\n\n"
+    prompt += format_targets(user_targets)
+
+    day_themes = assign_day_themes(week_start)
+    prompt += "**Daily meal themes:**\n"
+    for idx, day in enumerate(DAY_NAMES):
+        prompt += f"- {day.value}: {day_themes[idx]}\n"
     prompt += "\n"
 
-    # Add user's specific food preferences (HIGHEST PRIORITY)
-    if food_preferences:
-        prompt += f"""**🔴 CRITICAL USER FOOD PREFERENCES (MUST FOLLOW):**
-{food_preferences}
+    prompt += format_preferences(food_preferences)
 
-**YOU MUST incorporate these preferences into the meal plan. This is a strict requirement!**
+    prompt += format_favorites(favorite_foods)
 
-"""
+    logger.info(f"Generating week outline for {week_start}")
+    result = await _run_with_overload_retry(outline_generator, prompt, "week outline")
+    outline = result.output
 
-    # Add favorite foods if available
-    if favorite_foods and len(favorite_foods) > 0:
-        prompt += "**User's Favorite Foods (use these when possible):**\n"
-        for food in favorite_foods[:10]:  # Limit to top 10
-            prompt += f"- {food['name']}: "
-            prompt += f"{food['calories_per_100g']} cal/100g, "
-            prompt += f"P: {food['protein_per_100g']}g, "
-            prompt += f"C: {food['carbs_per_100g']}g, "
-            prompt += f"F: {food['fat_per_100g']}g\n"
-        prompt += "\n"
-    else:
-        prompt += "**Note:** No favorite foods provided. Use common healthy whole foods.\n\n"
-
-    prompt += f"""**🔴 CRITICAL INSTRUCTIONS - STRICT UPPER LIMITS:**
-
-YOUR PRIMARY GOAL: Generate meals where daily_totals are AS CLOSE AS POSSIBLE to targets WITHOUT EXCEEDING:
-
-**ABSOLUTE MAXIMUM LIMITS (NEVER EXCEED):**
-- Calories: ≤ {user_targets['calories']} cal (aim for {int(user_targets['calories'] * 0.98)}-{user_targets['calories']} cal)
-- Protein: ≤ {user_targets['protein']}g (aim for {user_targets['protein'] * 0.98:.1f}-{user_targets['protein']}g)
-- Carbs: ≤ {user_targets['carbs']}g (aim for {user_targets['carbs'] * 0.98:.1f}-{user_targets['carbs']}g)
-- Fat: ≤ {user_targets['fat']}g (aim for {user_targets['fat'] * 0.98:.1f}-{user_targets['fat']}g)
-
-**MANDATORY PROCESS:**
-1. Plan the meals with initial portion sizes
-2. Calculate total calories from all meals
-3. **IF ANY TOTAL EXCEEDS TARGET**: IMMEDIATELY REDUCE portion sizes until ALL are under
-4. **IF TOTALS ARE UNDER**: Carefully INCREASE portions to get closer (but NEVER exceed)
-5. Fine-tune each macro by adjusting specific foods
-6. **FINAL VERIFICATION**: Ensure ALL daily_totals ≤ targets (no exceptions!)
-
-**PORTION SIZE STRATEGY:**
-- Start with portions slightly BELOW what you think is needed
-- Gradually increase until you're 1-2% under the target
-- NEVER let any macro exceed its target
-- For 3,100 calorie target: Use LARGE portions, but cap at 3,100 max
-- For 2,000 calorie target: Use MODERATE portions, but cap at 2,000 max
-
-**CALCULATION REQUIREMENTS:**
-- daily_totals = sum of all meal.totals for that day
-- meal.totals = sum of all foods in that meal
-- **VERIFY**: daily_totals.calories ≤ {user_targets['calories']} (MANDATORY)
-- **VERIFY**: daily_totals.protein ≤ {user_targets['protein']} (MANDATORY)
-- **VERIFY**: daily_totals.carbs ≤ {user_targets['carbs']} (MANDATORY)
-- **VERIFY**: daily_totals.fat ≤ {user_targets['fat']} (MANDATORY)
-
-**OTHER REQUIREMENTS:**
-- Include realistic portion sizes (scaled to target, but NEVER exceeding)
-- Prioritize user's favorite foods when available
-- Use a variety of foods (don't repeat the same meal)
-- Ensure all calculations are accurate
-
-🚨 CRITICAL: If ANY macro exceeds its target, you MUST reduce portions immediately!
-✅ GOAL: Get as close as possible to targets while staying UNDER or AT the limit!
-
-Please generate the meals now following the exact structure and hitting the EXACT targets.
-"""
+    # Order by weekday regardless of how the model listed them
+    outline.days.sort(key=lambda day: DAY_NAMES.index(day.day_name))
+    if [day.day_name for day in outline.days] != DAY_NAMES:
+        raise ValueError("Week outline must contain each day Monday-Sunday exactly once")
 
-    logger.info(f"Generating chunk for days {day_indices}: {[d['day_name'] for d in dates_and_days]}")
+    return outline
 
-    # Retry with exponential backoff for API overload errors (529)
-    max_retries = 3
-    base_delay = 2  # seconds
 
-    for attempt in range(max_retries):
-        try:
-            result = await day_chunk_generator.run(prompt)
-            chunk = result.output
+async def generate_day_from_outline(
+    user_targets: dict,
+    favorite_foods: list,
+    date: str,
+    day_outline: DayOutline,
+    food_preferences: str = ""
+) -> MealPlanDay:
+    """
+    Expand one outlined day into full meals with foods and macros.
 
-            logger.info(f"Successfully generated chunk with {len(chunk.days)} day(s)")
-            return chunk
+    Args:
+        user_targets: Daily macro targets
+        favorite_foods: User's favorite foods with macro info
+        date: Date of the day (YYYY-MM-DD)
+        day_outline: Outlined meals for the day
+        food_preferences: User's specific food preferences from conversation
 
-        except Exception as e:
-            error_str = str(e)
-            is_overload = "overloaded" in error_str.lower() or "529" in error_str
+    Returns:
+        MealPlanDay with the outlined meals filled in
+    """
+    prompt = f"Create the full meals for {day_outline.day_name.value} ({date}).\n\n"
+    prompt += format_targets(user_targets)
 
-            if is_overload and attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
-                logger.warning(f"API overloaded, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(delay)
-                continue
+    prompt += "**Planned meals (keep these names and types):**\n"
+    for meal in day_outline.meals:
+        prompt += f"- {meal.meal_type}: {meal.name}\n"
+    prompt += "\n"
+
+    prompt += format_preferences(food_preferences)
+
+    prompt += format_favorites(favorite_foods)
+
+    result = await _run_with_overload_retry(
+        day_detail_generator, prompt, f"{day_outline.day_name.value} details"
+    )
+    day = result.output
+
+    # The outline is authoritative for the calendar; don't trust the model's copy
+    day.date = date
+    day.day_name = day_outline.day_name
+    return day
+
+
+def _format_other_days(meal_plan: MealPlan, day_index: int) -> str:
+    """List the rest of the week's meals so an edited day doesn't repeat them."""
+    section = "**Other days this week (avoid repeating these dishes):**\n"
+    for idx, day in enumerate(meal_plan.days):
+        if idx != day_index:
+            section += f"- {day.day_name.value}: {', '.join(meal.name for meal in day.meals)}\n"
+    return section + "\n"
+
+
+async def regenerate_day(
+    meal_plan: MealPlan,
+    day_index: int,
+    change_request: str = "",
+    favorite_foods: Optional[list] = None
+) -> MealPlanDay:
+    """
+    Regenerate one day of an existing plan with a single model call.
 
-            logger.error(f"Failed to generate day chunk: {e}", exc_info=True)
+    The other days are passed as context so the new day doesn't repeat them.
+
+    Args:
+        meal_plan: Existing meal plan
+        day_index: Index of the day to replace (0-6)
+        change_request: What the user wants changed (e.g. "no fish on Wednesday")
+        favorite_foods: User's favorite foods with macro info
+
+    Returns:
+        New MealPlanDay (same date), rescaled to the plan's daily target
+    """
+    day = meal_plan.days[day_index]
+
+    prompt = f"Create a new full day of meals for {day.day_name.value} ({day.date}) replacing the current one.\n\n"
+    prompt += format_targets(meal_plan.daily_target.model_dump())
+    prompt += "**Current meals (being replaced):**\n"
+    for meal in day.meals:
+        prompt += f"- {meal.meal_type.value}: {meal.name}\n"
+    prompt += "\n"
+    prompt += format_preferences(change_request, "USER CHANGE REQUEST")
+    prompt += _format_other_days(meal_plan, day_index)
+    prompt += format_favorites(favorite_foods)
+
+    result = await _run_with_overload_retry(
+        day_detail_generator, prompt, f"{day.day_name.value} regeneration"
+    )
+    new_day = result.output
+    new_day.date = day.date
+    new_day.day_name = day.day_name
+
+    return scale_day_to_target(food_index.correct_day(new_day), meal_plan.daily_target)
+
+
+async def regenerate_meal(
+    meal_plan: MealPlan,
+    day_index: int,
+    meal_index: int,
+    change_request: str = "",
+    favorite_foods: Optional[list] = None
+) -> MealPlanDay:
+    """
+    Replace one meal of an existing plan with a single model call.
+
+    The new meal is sized to the part of the daily target the day's other
+    meals leave free, so the rest of the day is untouched.
+
+    Args:
+        meal_plan: Existing meal plan
+        day_index: Index of the day containing the meal (0-6)
+        meal_index: Index of the meal within the day
+        change_request: What the user wants changed (e.g. "swap dinner for something vegetarian")
+        favorite_foods: User's favorite foods with macro info
+
+    Returns:
+        The day with the meal replaced and daily totals recomputed
+    """
+    day = meal_plan.days[day_index]
+    old_meal = day.meals[meal_index]
+    other_totals = MacroTotals.sum_of([meal.totals for meal in day.meals if meal is not old_meal])
+    meal_target = MacroTotals(**{
+        macro: max(getattr(meal_plan.daily_target, macro) - getattr(other_totals, macro), 0)
+        for macro in MACROS
+    })
+    if meal_target.calories <= 0:
+        # The other meals already use the whole target; keep the old meal's size
+        meal_target = old_meal.totals
+
+    prompt = f"Create a new {old_meal.meal_type.value} for {day.day_name.value} ({day.date}) "
+    prompt += f"replacing \"{old_meal.name}\". Use id \"{old_meal.id}\".\n\n"
+    prompt += format_targets(meal_target.model_dump(), "Targets for this meal")
+    prompt += "**Rest of the day:**\n"
+    for meal in day.meals:
+        if meal is not old_meal:
+            prompt += f"- {meal.meal_type.value}: {meal.name}\n"
+    prompt += "\n"
+    prompt += format_preferences(change_request, "USER CHANGE REQUEST")
+    prompt += format_favorites(favorite_foods)
+
+    result = await _run_with_overload_retry(
+        meal_generator, prompt, f"{day.day_name.value} {old_meal.meal_type.value} regeneration"
+    )
+    new_meal = result.output
+    new_meal.id = old_meal.id
+    new_meal.meal_type = old_meal.meal_type
+
+    # Scale the meal on its own against its share of the target
+    single = MealPlanDay(date=day.date, day_name=day.day_name, meals=[new_meal], daily_totals=new_meal.totals)
+    new_meal = scale_day_to_target(food_index.correct_day(single), meal_target).meals[0]
+
+    meals = [new_meal if idx == meal_index else meal for idx, meal in enumerate(day.meals)]
+    return MealPlanDay(
+        date=day.date,
+        day_name=day.day_name,
+        meals=meals,
+        daily_totals=MacroTotals.sum_of([meal.totals for meal in meals])
+    )
+
+
+async def _gather_or_cancel(*awaitables: Awaitable[T]) -> list[T]:
+    """
+    Like asyncio.gather, but the first failure cancels the remaining tasks.
+
+    Results keep argument order. The earliest failed task's exception is
+    re-raised as-is (unlike TaskGroup's ExceptionGroup), so callers can still
+    check it for overload errors.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    # Reading every exception also marks sibling failures retrieved
+    failed = [task for task in tasks if task in done and not task.cancelled() and task.exception() is not None]
+    if failed:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        raise failed[0].exception()
+    return [task.result() for task in tasks]
+
+
+async def _generate_chunked_days(
+    user_targets: dict,
+    favorite_foods: list,
+    week_start: str,
+    food_preferences: str,
+    semaphore: asyncio.Semaphore,
+    finish_day: Callable[[MealPlanDay], MealPlanDay]
+) -> list[MealPlanDay]:
+    """
+    Generate the week as concurrent 1-2 day chunks, finishing each day as its chunk arrives.
+
+    Chunk sizes come from the estimated output size (plan_chunks). A chunk
+    that comes back invalid, usually because it was truncated at max_tokens,
+    is split in two; a single day is retried up to MEAL_PLAN_DAY_ATTEMPTS times.
+    """
+    chunks_to_generate = plan_chunks(user_targets, favorite_foods)
+    retry_budget = current_retry_budget()
+    logger.info(
+        f"Planned {len(chunks_to_generate)} chunks at ~{estimate_day_tokens(user_targets, favorite_foods)} "
+        f"output tokens per day: {chunks_to_generate}"
+    )
+
+    day_themes = assign_day_themes(week_start)
+
+    async def generate_chunk(chunk_indices: list[int], attempt: int = 1) -> list[MealPlanDay]:
+        try:
+            async with semaphore:
+                chunk = await generate_day_chunk(
+                    user_targets=user_targets,
+                    favorite_foods=favorite_foods,
+                    start_date=week_start,
+                    day_indices=chunk_indices,
+                    food_preferences=food_preferences,
+                    day_themes=day_themes
+                )
+        except UnexpectedModelBehavior as e:
+            if len(chunk_indices) > 1 and retry_budget.try_spend(f"split chunk {chunk_indices}"):
+                middle = len(chunk_indices) // 2
+                logger.warning(f"Chunk {chunk_indices} invalid or truncated, splitting: {e}")
+                halves = await _gather_or_cancel(
+                    generate_chunk(chunk_indices[:middle]), generate_chunk(chunk_indices[middle:])
+                )
+                return [day for half in halves for day in half]
+            if attempt < settings.meal_plan_day_attempts and retry_budget.try_spend(f"retry day {chunk_indices}"):
+                logger.warning(f"Day {chunk_indices} invalid (attempt {attempt}), retrying: {e}")
+                return await generate_chunk(chunk_indices, attempt + 1)
             raise
 
+        return [finish_day(day) for day in chunk.days]
+
+    # Run all chunks concurrently in chunk order; one failure cancels the rest
+    chunks = await _gather_or_cancel(*(generate_chunk(indices) for indices in chunks_to_generate))
+    return [day for chunk in chunks for day in chunk]
+
+
+async def _generate_outline_days(
+    user_targets: dict,
+    favorite_foods: list,
+    week_start: str,
+    food_preferences: str,
+    semaphore: asyncio.Semaphore,
+    finish_day: Callable[[MealPlanDay], MealPlanDay]
+) -> list[MealPlanDay]:
+    """Generate a week outline, then expand and finish every day in parallel."""
+    outline = await generate_week_outline(user_targets, favorite_foods, week_start, food_preferences)
+    retry_budget = current_retry_budget()
+    base_date = datetime.strptime(week_start, '%Y-%m-%d')
+
+    async def expand_day(idx: int, day_outline: DayOutline) -> MealPlanDay:
+        date = (base_date + timedelta(days=idx)).strftime('%Y-%m-%d')
+        attempts = settings.meal_plan_day_attempts
+
+        # A failed day is retried on its own; finished neighbours are kept
+        for attempt in range(1, attempts + 1):
+            try:
+                async with semaphore:
+                    day = await generate_day_from_outline(
+                        user_targets, favorite_foods, date, day_outline, food_preferences
+                    )
+                return finish_day(day)
+            except Exception as e:
+                if attempt == attempts or not retry_budget.try_spend(f"retry {day_outline.day_name.value}"):
+                    raise
+                logger.warning(f"{day_outline.day_name.value} failed (attempt {attempt}/{attempts}), retrying: {e}")
+
+    return await _gather_or_cancel(*(expand_day(idx, day) for idx, day in enumerate(outline.days)))
+
+
+# Single-flight registry: identical concurrent requests await the same task
+_in_flight: Dict[str, "asyncio.Task[MealPlan]"] = {}
+
+# Recently finished plans, so retries just after completion don't regenerate
+_recent_plans: TTLCache[str, MealPlan] = TTLCache(
+    maxsize=settings.meal_plan_result_memo_size,
+    ttl_seconds=settings.meal_plan_result_memo_seconds
+)
+
+
+def _single_flight_key(
+    user_id: str,
+    user_targets: dict,
+    favorite_foods: list,
+    week_start: str,
+    food_preferences: str,
+    mode: str
+) -> str:
+    """Key identical generation requests by user, week and a hash of the inputs."""
+    inputs = json.dumps(
+        {
+            'targets': {macro: user_targets[macro] for macro in MACROS},
+            'favorites': favorite_foods or [],
+            'preferences': food_preferences,
+            'mode': mode
+        },
+        sort_keys=True,
+        default=str
+    )
+    return f"{user_id}:{week_start}:{hashlib.sha256(inputs.encode()).hexdigest()[:16]}"
+
+
+def _finish_flight(key: str, task: "asyncio.Task[MealPlan]") -> None:
+    """Unregister a finished generation and memoize it if it succeeded."""
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    # Reading exception() also marks it retrieved when every caller was cancelled
+    if not task.cancelled() and task.exception() is None:
+        _recent_plans.set(key, task.result())
+
 
 async def generate_meal_plan_structured(
     user_targets: dict,
     favorite_foods: list,
     week_start: str,
-    food_preferences: str = ""
+    food_preferences: str = "",
+    mode: str | None = None,
+    on_day: Optional[Callable[[MealPlanDay], None]] = None,
+    user_id: Optional[str] = None,
+    fresh: bool = False
 ) -> MealPlan:
     """
-    Generate a complete 7-day meal plan by creating chunks of 1-2 days at a time.
-
-    Uses Claude 4.5 Haiku with optimized settings (max_tokens=8000, output_retries=3)
-    for reliable structured output generation.
+    Generate a complete 7-day meal plan.
+
+    Three modes are supported (default: MEAL_PLAN_GENERATION_MODE):
+    - "chunked": chunks of 1-2 fully detailed days are generated concurrently
+      (bounded by MEAL_PLAN_MAX_CONCURRENCY) and merged back in day order. Each
+      day gets a pre-assigned theme so variety is kept even though chunks can't
+      see each other's meals.
+    - "outline": a cheap call outlines meal names for the whole week, then each
+      day is expanded in parallel. A failed day is retried alone.
+    - "fast": no model calls; the fallback planner assigns the user's foods
+      and curated staples to meals (milliseconds, less varied). The same
+      planner is used when the model API stays overloaded
+      (MEAL_PLAN_OVERLOAD_FALLBACK).
+
+    Without favorite foods, plans are served from the shared day cache when a
+    user with similar targets and preferences already generated one (rescaled
+    to the exact targets), and cached after generation otherwise. A user is
+    never served the same cached week twice.
+
+    With a user_id, concurrent identical requests (same user, week, targets,
+    favorites, preferences and mode) share a single generation, and a request
+    repeated shortly after completion gets the same plan back
+    (MEAL_PLAN_RESULT_MEMO_SECONDS) instead of paying for a new one. Pass
+    fresh=True when the user explicitly asks for a different plan.
+
+    Uses Claude 4.5 Haiku for reliable structured output generation.
 
     Args:
         user_targets: Daily macro targets (calories, protein, carbs, fat)
@@ -303,6 +833,13 @@ async def generate_meal_plan_structured(
         week_start: Week start date (YYYY-MM-DD)
         food_preferences: User's specific food preferences from conversation
                          (e.g., "include steak and eggs daily", "lots of fruit")
+        mode: "chunked", "outline" or "fast" (None uses the configured default)
+        on_day: Optional callback invoked with each validated day as soon as it
+                is ready (before the rest of the week), e.g. to stream progress.
+                Requests that join another's generation get the days at the end.
+        user_id: Owner of the plan; enables single-flight deduplication
+        fresh: Build a new plan instead of reusing the one just generated or
+               joining one in flight
 
     Returns:
         Validated MealPlan object with exactly 7 days
@@ -310,64 +847,122 @@ async def generate_meal_plan_structured(
     Raises:
         Exception: If generation fails or validation errors occur
     """
-    try:
-        logger.info(f"Generating 7-day meal plan for week {week_start} using Claude 4.5 Haiku")
-        logger.debug(f"User targets: {user_targets}")
-        logger.debug(f"Favorite foods count: {len(favorite_foods) if favorite_foods else 0}")
-
-        all_days = []
-
-        # Generate in 2-day chunks (4 API calls total for 7 days)
-        # Reduced chunk size ensures Claude 4.5 Haiku can generate complete responses
-        # Chunks: [0,1], [2,3], [4,5], [6]
-        chunks_to_generate = [
-            [0, 1],     # Monday-Tuesday (2 days)
-            [2, 3],     # Wednesday-Thursday (2 days)
-            [4, 5],     # Friday-Saturday (2 days)
-            [6]         # Sunday (1 day)
-        ]
-
-        for chunk_indices in chunks_to_generate:
-            chunk = await generate_day_chunk(
-                user_targets=user_targets,
-                favorite_foods=favorite_foods,
-                start_date=week_start,
-                day_indices=chunk_indices,
-                food_preferences=food_preferences
+    mode = mode or settings.meal_plan_generation_mode
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown meal plan generation mode: {mode}")
+
+    if user_id is None:
+        return await _generate_meal_plan(user_targets, favorite_foods, week_start, food_preferences, mode, on_day)
+
+    key = _single_flight_key(user_id, user_targets, favorite_foods, week_start, food_preferences, mode)
+
+    meal_plan = None if fresh else _recent_plans.get(key)
+    if meal_plan is not None:
+        logger.info(f"Reusing meal plan for user {user_id} week {week_start} generated moments ago")
+    else:
+        task = None if fresh else _in_flight.get(key)
+        joined = task is not None
+        if joined:
+            logger.info(f"Joining in-flight meal plan generation for user {user_id} week {week_start}")
+        else:
+            task = asyncio.create_task(
+                _generate_meal_plan(user_targets, favorite_foods, week_start, food_preferences, mode, on_day, user_id)
             )
+            _in_flight[key] = task
+            task.add_done_callback(lambda done: _finish_flight(key, done))
 
-            # Add days from this chunk
-            all_days.extend(chunk.days)
+        # Shield so a disconnecting caller doesn't cancel the generation others await
+        meal_plan = await asyncio.shield(task)
+        if not joined:
+            return meal_plan.model_copy(deep=True)
 
-            logger.debug(f"Total days generated so far: {len(all_days)}")
+    if on_day is not None:
+        for day in meal_plan.days:
+            on_day(day)
+    return meal_plan.model_copy(deep=True)
 
-        # Validate we have exactly 7 days
-        if len(all_days) != 7:
-            raise ValueError(f"Expected 7 days, got {len(all_days)}")
 
-        # Create MacroTotals object for daily_target
-        daily_target = MacroTotals(
-            calories=user_targets['calories'],
-            protein=user_targets['protein'],
-            carbs=user_targets['carbs'],
-            fat=user_targets['fat']
-        )
+async def _generate_meal_plan(
+    user_targets: dict,
+    favorite_foods: list,
+    week_start: str,
+    food_preferences: str,
+    mode: str,
+    on_day: Optional[Callable[[MealPlanDay], None]],
+    user_id: Optional[str] = None
+) -> MealPlan:
+    """Run one meal plan generation (see generate_meal_plan_structured)."""
+    # One retry budget for every retry layer of this generation
+    with retry_budget_scope():
+        try:
+            logger.info(f"Generating 7-day meal plan for week {week_start} using Claude 4.5 Haiku ({mode} mode)")
+            logger.debug(f"User targets: {user_targets}")
+            logger.debug(f"Favorite foods count: {len(favorite_foods) if favorite_foods else 0}")
+
+            # Create MacroTotals object for daily_target
+            daily_target = MacroTotals(
+                calories=user_targets['calories'],
+                protein=user_targets['protein'],
+                carbs=user_targets['carbs'],
+                fat=user_targets['fat']
+            )
 
-        # Create complete MealPlan
-        meal_plan = MealPlan(
-            week_start=week_start,
-            daily_target=daily_target,
-            days=all_days
-        )
+            def finish_day(day: MealPlanDay) -> MealPlanDay:
+                # Take macros from the food database where names match, then rescale
+                # portions deterministically instead of trusting the model's arithmetic
+                day = scale_day_to_target(food_index.correct_day(day), daily_target)
+                if on_day is not None:
+                    on_day(day)
+                return day
+
+            # Plans without favorites are generic, so similar targets can share them
+            cache_key = None if favorite_foods or mode == "fast" else day_cache.key(user_targets, food_preferences)
+            cached_days = await day_cache.get_week(cache_key, week_start, user_id) if cache_key else None
+
+            if mode == "fast":
+                all_days = [finish_day(day) for day in plan_week(user_targets, favorite_foods, week_start)]
+            elif cached_days is not None:
+                all_days = [finish_day(day) for day in cached_days]
+            else:
+                semaphore = asyncio.Semaphore(settings.meal_plan_max_concurrency)
+                generate_days = _generate_outline_days if mode == "outline" else _generate_chunked_days
+                try:
+                    all_days = await generate_days(
+                        user_targets, favorite_foods, week_start, food_preferences, semaphore, finish_day
+                    )
+                except Exception as e:
+                    if not (settings.meal_plan_overload_fallback and _is_retryable(e)):
+                        raise
+                    # Days already streamed are sent again; clients key days by date
+                    logger.warning(f"Model unavailable ({e}), building week {week_start} with the fallback planner")
+                    all_days = [finish_day(day) for day in plan_week(user_targets, favorite_foods, week_start)]
+                    cache_key = None  # Don't share fallback weeks through the day cache
+
+            all_days = sorted(all_days, key=lambda day: day.date)
+            logger.debug(f"Total days generated: {len(all_days)}")
+
+            # Validate we have exactly 7 days
+            if len(all_days) != 7:
+                raise ValueError(f"Expected 7 days, got {len(all_days)}")
+
+            if cache_key and cached_days is None:
+                await day_cache.put_week(cache_key, all_days, user_id)
+
+            # Create complete MealPlan
+            meal_plan = MealPlan(
+                week_start=week_start,
+                daily_target=daily_target,
+                days=all_days
+            )
 
-        # Validate that daily totals never exceed targets (strict upper limit)
-        if not meal_plan.validate_macro_accuracy(tolerance=0.05):
-            logger.warning(f"Generated meal plan for week {week_start} may exceed targets or be too far under (>5%)")
-            # This means either: 1) Some values exceeded targets (CRITICAL), or 2) Values are >5% under target
+            # The solver never exceeds targets; a miss here means the chosen foods
+            # can't reach some macro (e.g. almost no fat sources) within the portion limits
+            if not meal_plan.validate_macro_accuracy(tolerance=0.05):
+                logger.warning(f"Generated meal plan for week {week_start} is >5% under target for some macro")
 
-        logger.info(f"Successfully generated complete meal plan for week {week_start} with {len(meal_plan.days)} days")
-        return meal_plan
+            logger.info(f"Successfully generated complete meal plan for week {week_start} with {len(meal_plan.days)} days")
+            return meal_plan
 
-    except Exception as e:
-        logger.error(f"Failed to generate complete meal plan: {e}", exc_info=True)
-        raise
+        except Exception as e:
+            logger.error(f"Failed to generate complete meal plan: {e}", exc_info=True)
+            raise
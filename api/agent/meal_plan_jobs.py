@@ -0,0 +1,320 @@
+"""
+Background job queue for meal plan generation.
+
+The generate_meal_plan tool enqueues a job and returns right away, so chat
+turns stay fast and a generation keeps running if the client disconnects or
+a proxy times out. A bounded pool of asyncio workers (started with the app)
+runs the jobs. Job status lives in memory and is persisted to the
+meal_plan_jobs table so it can be polled from any API worker; progress
+events go through the meal plan progress broker under the job id. Jobs
+still queued or running at shutdown are marked failed, and at startup so
+are stale ones a crashed process left behind, so clients never poll forever.
+
+There is no SQLite fallback: the API cannot start without Supabase settings
+and the generated plan is saved to Supabase anyway, so local development
+runs against a (local) Supabase project like everything else.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from agent.meal_plan_progress import meal_plan_progress, ProgressReporter
+from agent.settings import settings
+from database.queries import save_meal_plan, upsert_meal_plan_job, fetch_meal_plan_job, fail_stale_meal_plan_jobs
+from database.supabase import get_supabase_client
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+INTERRUPTED_ERROR = "Meal plan generation was interrupted by a server restart. Please try again."
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+@dataclass
+class MealPlanJob:
+    """A queued meal plan generation and its current status."""
+    job_id: str
+    user_id: str
+    week_start: str
+    user_targets: Dict[str, Any]
+    favorite_foods: List[Dict[str, Any]] = field(default_factory=list)
+    food_preferences: str = ""
+    fresh: bool = False  # The user asked for a different plan than the last one
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    meal_plan: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_row(self) -> Dict[str, Any]:
+        """Serialize for the meal_plan_jobs table."""
+        return {
+            'id': self.job_id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'week_start_date': self.week_start,
+            'meal_plan': self.meal_plan,
+            'error': self.error,
+            'created_at': self.created_at
+        }
+
+    def to_status(self) -> Dict[str, Any]:
+        """Public status payload (no generation inputs)."""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'week_start': self.week_start,
+            'meal_plan': self.meal_plan,
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+
+async def generate_and_save_meal_plan(
+    supabase,
+    user_id: str,
+    user_targets: Dict[str, Any],
+    favorite_foods: List[Dict[str, Any]],
+    week_start: str,
+    food_preferences: str = "",
+    progress: Optional[ProgressReporter] = None,
+    fresh: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Generate a meal plan, save it, and report progress.
+
+    Args:
+        supabase: Async Supabase client
+        user_id: Plan owner
+        user_targets: Daily macro targets
+        favorite_foods: Favorite or frequently logged foods (may be empty)
+        week_start: Week start date (YYYY-MM-DD)
+        food_preferences: User's food preferences from the conversation
+        progress: Optional progress reporter for day/complete events
+        fresh: Build a new plan rather than reusing one just generated
+
+    Returns:
+        Saved meal plan dict, or None if saving failed
+
+    Raises:
+        Exception: If generation fails
+    """
+    from agent.meal_plan_generator import generate_meal_plan_structured
+
+    meal_plan_obj = await generate_meal_plan_structured(
+        user_targets=user_targets,
+        favorite_foods=favorite_foods,
+        week_start=week_start,
+        food_preferences=food_preferences,
+        on_day=(lambda day: progress.publish('day', day=day.model_dump(mode='json'))) if progress else None,
+        user_id=user_id,
+        fresh=fresh
+    )
+
+    # Convert Pydantic model to dict for database/API
+    meal_plan_dict = meal_plan_obj.model_dump()
+
+    if not meal_plan_obj.validate_macro_accuracy(tolerance=0.05):
+        logger.warning(f"Generated meal plan exceeds ±5% macro tolerance for user {user_id}")
+
+    saved = await save_meal_plan(supabase, user_id, week_start, meal_plan_dict)
+    if not saved:
+        if progress:
+            progress.publish('error', content='Failed to save meal plan')
+        return None
+
+    if progress:
+        progress.publish('complete', meal_plan=meal_plan_obj.model_dump(mode='json'))
+    return meal_plan_dict
+
+
+class MealPlanJobQueue:
+    """
+    In-process job queue with a bounded worker pool.
+
+    Args:
+        workers: Number of jobs generated concurrently
+        max_queued: Maximum jobs waiting for a worker
+        cache_size: Maximum jobs whose status is kept in memory
+        ttl_seconds: How long finished job status is kept in memory
+    """
+
+    def __init__(self, workers: int, max_queued: int, cache_size: int, ttl_seconds: float):
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: TTLCache[str, MealPlanJob] = TTLCache(maxsize=cache_size, ttl_seconds=ttl_seconds)
+        self._active: Dict[str, MealPlanJob] = {}  # Queued or running jobs, failed on shutdown
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)."""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        for _ in range(len(self._tasks), self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self) -> None:
+        """Cancel the workers and mark every unfinished job failed so clients stop polling."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        for job in list(self._active.values()):
+            await self._update(job, "failed", error=INTERRUPTED_ERROR)
+            ProgressReporter(meal_plan_progress, job.job_id, job.user_id).close()
+
+    async def fail_stale_jobs(self, stale_seconds: float) -> None:
+        """
+        Mark persisted jobs left queued or running by a crashed process as failed.
+
+        Jobs of live processes keep updating their row well within stale_seconds.
+
+        Args:
+            stale_seconds: Age of the last status update after which a job is abandoned
+        """
+        updated_before = (datetime.utcnow() - timedelta(seconds=stale_seconds)).isoformat()
+        failed = await fail_stale_meal_plan_jobs(await get_supabase_client(), updated_before, INTERRUPTED_ERROR)
+        if failed:
+            logger.warning(f"Marked {failed} abandoned meal plan jobs as failed")
+
+    async def submit(self, job: MealPlanJob) -> MealPlanJob:
+        """
+        Queue a job and persist its initial status.
+
+        Args:
+            job: New job (status 'queued')
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: Too many jobs are already waiting
+        """
+        if self._queue.full():
+            raise QueueFullError("Meal plan queue is full")
+
+        # Workers start with the app; also start lazily so the tool works anywhere
+        self.start()
+
+        # Persist 'queued' before a worker can pick the job up and mark it 'running'
+        self._jobs.set(job.job_id, job)
+        self._active[job.job_id] = job
+        meal_plan_progress.claim(job.job_id, job.user_id)
+        await self._update(job, "queued")
+
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await self._update(job, "failed", error="Meal plan queue is full")
+            ProgressReporter(meal_plan_progress, job.job_id, job.user_id).close()
+            raise QueueFullError("Meal plan queue is full")
+
+        logger.info(f"Queued meal plan job {job.job_id} for user {job.user_id}")
+        return job
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status for its owner.
+
+        Falls back to the meal_plan_jobs table for jobs run by another worker
+        process or evicted from memory.
+
+        Args:
+            job_id: Job UUID
+            user_id: Authenticated user ID
+
+        Returns:
+            Status payload, or None if unknown or owned by another user
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_status() if job.user_id == user_id else None
+
+        row = await fetch_meal_plan_job(await get_supabase_client(), job_id)
+        if row is None or row.get('user_id') != user_id:
+            return None
+        return {
+            'job_id': row['id'],
+            'status': row['status'],
+            'week_start': row['week_start_date'],
+            'meal_plan': row.get('meal_plan'),
+            'error': row.get('error'),
+            'created_at': row.get('created_at'),
+            'updated_at': row.get('updated_at')
+        }
+
+    async def _update(self, job: MealPlanJob, status: str, **changes: Any) -> None:
+        job.status = status
+        job.updated_at = datetime.utcnow().isoformat()
+        for name, value in changes.items():
+            setattr(job, name, value)
+        if status in TERMINAL_STATUSES:
+            self._active.pop(job.job_id, None)
+
+        ProgressReporter(meal_plan_progress, job.job_id, job.user_id).publish('status', status=status)
+
+        try:
+            await upsert_meal_plan_job(await get_supabase_client(), job.to_row())
+        except Exception as e:
+            logger.error(f"Failed to persist meal plan job {job.job_id}: {e}")
+
+    async def _run(self, job: MealPlanJob) -> None:
+        progress = ProgressReporter(meal_plan_progress, job.job_id, job.user_id)
+        try:
+            await self._update(job, "running")
+            meal_plan = await generate_and_save_meal_plan(
+                await get_supabase_client(),
+                job.user_id,
+                job.user_targets,
+                job.favorite_foods,
+                job.week_start,
+                job.food_preferences,
+                progress,
+                job.fresh
+            )
+            if meal_plan is None:
+                await self._update(job, "failed", error="Failed to save meal plan")
+            else:
+                await self._update(job, "succeeded", meal_plan=meal_plan)
+                logger.info(f"Meal plan job {job.job_id} succeeded")
+
+        except asyncio.CancelledError:
+            await self._update(job, "failed", error=INTERRUPTED_ERROR)
+            raise
+        except Exception as e:
+            logger.error(f"Meal plan job {job.job_id} failed: {e}", exc_info=True)
+            progress.publish('error', content='Meal plan generation failed')
+            await self._update(job, "failed", error="Meal plan generation failed")
+        finally:
+            progress.close()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+
+# Global job queue instance (workers started in main.lifespan)
+meal_plan_jobs = MealPlanJobQueue(
+    workers=settings.meal_plan_job_workers,
+    max_queued=settings.meal_plan_job_queue_size,
+    cache_size=settings.meal_plan_job_cache_size,
+    ttl_seconds=settings.meal_plan_job_ttl_seconds
+)
@@ -0,0 +1,160 @@
+"""
+In-process progress channels for meal plan generation.
+
+Each generation id gets a channel that buffers events (days as they are
+validated, then the saved plan) and fans them out to SSE subscribers. Late
+subscribers get the buffered events replayed, so the client can open the
+progress stream before or after generation starts.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Set
+from agent.settings import settings
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationNotFoundError(Exception):
+    """Raised when a generation id belongs to a different user."""
+
+
+@dataclass
+class ProgressChannel:
+    """Buffered events and live subscribers for one generation."""
+    user_id: str
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    closed: bool = False
+
+
+class MealPlanProgressBroker:
+    """
+    Publish/subscribe hub for meal plan generation progress.
+
+    Args:
+        maxsize: Maximum number of channels kept (oldest evicted first)
+        ttl_seconds: How long a channel (and its replay buffer) is kept
+        wait_seconds: How long a subscriber waits for a generation to finish
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, wait_seconds: float):
+        self.wait_seconds = wait_seconds
+        self._channels: TTLCache[str, ProgressChannel] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def _channel(self, generation_id: str, user_id: str) -> ProgressChannel:
+        channel = self._channels.get(generation_id)
+        if channel is None:
+            channel = ProgressChannel(user_id=user_id)
+            self._channels.set(generation_id, channel)
+        elif channel.user_id != user_id:
+            raise GenerationNotFoundError(generation_id)
+        return channel
+
+    def claim(self, generation_id: str, user_id: str) -> None:
+        """
+        Register a generation id for a user (no-op if already theirs).
+
+        Raises:
+            GenerationNotFoundError: Generation belongs to another user
+        """
+        self._channel(generation_id, user_id)
+
+    def publish(self, generation_id: str, user_id: str, event: Dict[str, Any]) -> None:
+        """
+        Buffer an event and deliver it to current subscribers.
+
+        Args:
+            generation_id: Generation the event belongs to
+            user_id: Owner of the generation
+            event: JSON-serializable event payload (must include 'type')
+        """
+        channel = self._channel(generation_id, user_id)
+        if channel.closed:
+            logger.warning(f"Dropping {event.get('type')} event for closed generation {generation_id}")
+            return
+
+        channel.events.append(event)
+        for queue in channel.subscribers:
+            queue.put_nowait(event)
+
+    def close(self, generation_id: str, user_id: str) -> None:
+        """Mark a generation finished and end all subscriptions."""
+        channel = self._channel(generation_id, user_id)
+        channel.closed = True
+        for queue in channel.subscribers:
+            queue.put_nowait(None)
+
+    async def subscribe(self, generation_id: str, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield buffered and live events until the generation is closed.
+
+        Args:
+            generation_id: Generation to follow (may not have started yet)
+            user_id: Authenticated user ID
+
+        Raises:
+            GenerationNotFoundError: Generation belongs to another user
+        """
+        channel = self._channel(generation_id, user_id)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        # Snapshot and register together so no event is missed or duplicated
+        replay = list(channel.events)
+        if not channel.closed:
+            channel.subscribers.add(queue)
+
+        try:
+            for event in replay:
+                yield event
+            if channel.closed:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_seconds
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+                if event is None:
+                    return
+                yield event
+        finally:
+            channel.subscribers.discard(queue)
+
+
+class ProgressReporter:
+    """Publishes one generation's events to the broker (bound to its id and owner)."""
+
+    def __init__(self, broker: MealPlanProgressBroker, generation_id: str, user_id: str):
+        self.broker = broker
+        self.generation_id = generation_id
+        self.user_id = user_id
+
+    def publish(self, event_type: str, **payload: Any) -> None:
+        """Publish an event, never letting progress reporting break generation."""
+        try:
+            self.broker.publish(self.generation_id, self.user_id, {'type': event_type, **payload})
+        except Exception as e:
+            logger.warning(f"Failed to publish {event_type} for generation {self.generation_id}: {e}")
+
+    def close(self) -> None:
+        """End the generation's progress stream."""
+        try:
+            self.broker.close(self.generation_id, self.user_id)
+        except Exception as e:
+            logger.warning(f"Failed to close generation {self.generation_id}: {e}")
+
+
+# Global progress broker instance
+meal_plan_progress = MealPlanProgressBroker(
+    maxsize=settings.meal_plan_progress_channels,
+    ttl_seconds=settings.meal_plan_progress_ttl_seconds,
+    wait_seconds=settings.meal_plan_progress_wait_seconds
+)
@@ -0,0 +1,219 @@
+"""
+In-process validation of generated meal plan output.
+
+Registered as pydantic-ai output validators on the meal plan generators.
+Meal and daily totals are derived data, so mismatches with the foods are
+repaired locally by re-summing; ModelRetry (a model round trip) is only
+raised for structural problems the model has to fix itself, such as missing
+meals or the wrong days. Outcomes are counted per generator so the output
+retry rate can be monitored.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pydantic_ai import ModelRetry
+from models.meal_plan import MACROS, DayChunk, Meal, MealPlanDay, MacroTotals
+
+logger = logging.getLogger(__name__)
+
+# Meals per day required by the generation prompts
+MIN_MEALS_PER_DAY = 3
+MAX_MEALS_PER_DAY = 4
+
+
+@dataclass
+class ValidationCounts:
+    """Validator outcomes for one generator."""
+    validated: int = 0
+    repaired: int = 0
+    retried: int = 0
+
+
+class OutputValidationMetrics:
+    """Counts of validated, locally repaired and retried outputs per generator."""
+
+    def __init__(self):
+        self._counts: Dict[str, ValidationCounts] = defaultdict(ValidationCounts)
+
+    def record(self, generator: str, repaired: bool = False, retried: bool = False) -> None:
+        counts = self._counts[generator]
+        counts.validated += 1
+        counts.repaired += int(repaired)
+        counts.retried += int(retried)
+
+    def reset(self) -> None:
+        self._counts.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Current counts with repair and retry rates.
+
+        Returns:
+            Dict of generator name -> counts and rates, plus a 'total' entry
+        """
+        total = ValidationCounts()
+        result = {}
+        for generator, counts in self._counts.items():
+            result[generator] = _with_rates(counts)
+            total.validated += counts.validated
+            total.repaired += counts.repaired
+            total.retried += counts.retried
+        result['total'] = _with_rates(total)
+        return result
+
+
+def _with_rates(counts: ValidationCounts) -> Dict:
+    validated = counts.validated or 1
+    return {
+        **asdict(counts),
+        'repair_rate': round(counts.repaired / validated, 4),
+        'retry_rate': round(counts.retried / validated, 4)
+    }
+
+
+def _totals_differ(a: MacroTotals, b: MacroTotals) -> bool:
+    return any(abs(getattr(a, macro) - getattr(b, macro)) > 0.05 for macro in MACROS)
+
+
+def repair_meal(meal: Meal) -> Tuple[Meal, bool]:
+    """Re-sum a meal's totals from its foods; returns (meal, whether it changed)."""
+    totals = MacroTotals.sum_of(meal.foods)
+    if not _totals_differ(totals, meal.totals):
+        return meal, False
+    return meal.model_copy(update={'totals': totals}), True
+
+
+def repair_day(day: MealPlanDay) -> Tuple[MealPlanDay, bool]:
+    """
+    Re-sum meal and daily totals and make meal ids unique within the day.
+
+    Args:
+        day: Generated day
+
+    Returns:
+        (repaired day, whether anything changed)
+    """
+    repaired = False
+    meals = []
+    seen_ids = set()
+    for idx, meal in enumerate(day.meals):
+        meal, changed = repair_meal(meal)
+        repaired |= changed
+        if meal.id in seen_ids:
+            meal = meal.model_copy(update={
+                'id': f"meal_{day.day_name.value.lower()}_{idx + 1:03d}_{meal.meal_type.value}"
+            })
+            repaired = True
+        seen_ids.add(meal.id)
+        meals.append(meal)
+
+    daily_totals = MacroTotals.sum_of([meal.totals for meal in meals])
+    repaired |= _totals_differ(daily_totals, day.daily_totals)
+    if not repaired:
+        return day, False
+    return day.model_copy(update={'meals': meals, 'daily_totals': daily_totals}), True
+
+
+def day_problems(day: MealPlanDay) -> List[str]:
+    """Structural problems that need the model to regenerate the day."""
+    problems = []
+    try:
+        datetime.strptime(day.date, '%Y-%m-%d')
+    except ValueError:
+        problems.append(f"{day.day_name.value}: date '{day.date}' is not YYYY-MM-DD")
+
+    if not MIN_MEALS_PER_DAY <= len(day.meals) <= MAX_MEALS_PER_DAY:
+        problems.append(
+            f"{day.day_name.value}: has {len(day.meals)} meals, needs {MIN_MEALS_PER_DAY}-{MAX_MEALS_PER_DAY}"
+        )
+
+    for meal in day.meals:
+        if sum(food.calories for food in meal.foods) <= 0:
+            problems.append(f"{day.day_name.value}: meal '{meal.name}' has no calories")
+    return problems
+
+
+def validate_day(day: MealPlanDay, generator: str, metrics: OutputValidationMetrics) -> MealPlanDay:
+    """
+    Repair a generated day's totals or ask the model to fix its structure.
+
+    Raises:
+        ModelRetry: The day is structurally invalid
+    """
+    problems = day_problems(day)
+    if problems:
+        metrics.record(generator, retried=True)
+        logger.warning(f"{generator} output invalid, requesting retry: {problems}")
+        raise ModelRetry("Fix these problems and return the full output again: " + "; ".join(problems))
+
+    day, repaired = repair_day(day)
+    metrics.record(generator, repaired=repaired)
+    return day
+
+
+def validate_meal(meal: Meal, generator: str, metrics: OutputValidationMetrics) -> Meal:
+    """
+    Repair a generated meal's totals or ask the model for real foods.
+
+    Raises:
+        ModelRetry: The meal has no calories
+    """
+    if sum(food.calories for food in meal.foods) <= 0:
+        metrics.record(generator, retried=True)
+        logger.warning(f"{generator} output invalid, requesting retry: meal '{meal.name}' has no calories")
+        raise ModelRetry(f"Meal '{meal.name}' has no calories; list real foods with their macros")
+
+    meal, repaired = repair_meal(meal)
+    metrics.record(generator, repaired=repaired)
+    return meal
+
+
+def validate_chunk(
+    chunk: DayChunk,
+    requested_days: Optional[List[Tuple[str, str]]],
+    generator: str,
+    metrics: OutputValidationMetrics
+) -> DayChunk:
+    """
+    Validate a generated chunk against the requested days and repair its totals.
+
+    Args:
+        chunk: Generated chunk
+        requested_days: (day name, date) pairs the prompt asked for (None skips the check)
+        generator: Generator name for metrics
+        metrics: Metrics to record the outcome in
+
+    Returns:
+        Chunk with repaired totals
+
+    Raises:
+        ModelRetry: Wrong or duplicate days, or a structurally invalid day
+    """
+    problems = []
+    returned_days = [(day.day_name.value, day.date) for day in chunk.days]
+    if requested_days and sorted(returned_days) != sorted(requested_days):
+        problems.append(f"expected days {requested_days}, got {returned_days}")
+    for day in chunk.days:
+        problems.extend(day_problems(day))
+
+    if problems:
+        metrics.record(generator, retried=True)
+        logger.warning(f"{generator} output invalid, requesting retry: {problems}")
+        raise ModelRetry("Fix these problems and return the full output again: " + "; ".join(problems))
+
+    days = []
+    repaired = False
+    for day in chunk.days:
+        day, changed = repair_day(day)
+        repaired |= changed
+        days.append(day)
+
+    metrics.record(generator, repaired=repaired)
+    return chunk.model_copy(update={'days': days}) if repaired else chunk
+
+
+# Global validation metrics (exposed at /api/metrics/meal-plan-output)
+output_metrics = OutputValidationMetrics()
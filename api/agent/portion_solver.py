@@ -0,0 +1,117 @@
+"""
+Deterministic portion scaling for generated meal plans.
+
+The model picks the foods; this module picks the amounts. Each food's
+quantity_g is rescaled (macros scale linearly with quantity) with a bounded
+least-squares fit so the day lands just under daily_target, then shrunk
+uniformly if any macro would still exceed it. Meal and daily totals are
+recomputed from the scaled foods, so they always add up.
+"""
+
+import numpy as np
+from models.meal_plan import MACROS, Food, Meal, MealPlanDay, MacroTotals
+
+# Fraction of each target the fit aims for (middle of the 0-2% under band)
+TARGET_RATIO = 0.99
+
+# Portion scale limits, so foods stay recognisable (no 5 g steaks or 2 kg of rice)
+MIN_SCALE = 0.25
+MAX_SCALE = 3.0
+
+# Pull towards the model's original portions when the fit is underdetermined
+REGULARIZATION = 1e-6
+
+
+def _bounded_least_squares(
+    matrix: np.ndarray,
+    rhs: np.ndarray,
+    lower: float,
+    upper: float
+) -> np.ndarray:
+    """
+    Minimize ||matrix @ s - rhs||^2 + REGULARIZATION * ||s - 1||^2 with lower <= s <= upper.
+
+    Active-set iteration: solve over the free variables, pin any that leave the
+    bounds, and repeat. Converges in at most n solves for these tiny problems
+    (4 macros x ~10-20 foods).
+    """
+    n = matrix.shape[1]
+    scales = np.ones(n)
+    free = np.ones(n, dtype=bool)
+
+    for _ in range(n + 1):
+        fixed_contribution = matrix[:, ~free] @ scales[~free]
+        sub = matrix[:, free]
+        normal = sub.T @ sub + REGULARIZATION * np.eye(sub.shape[1])
+        solution = np.linalg.solve(normal, sub.T @ (rhs - fixed_contribution) + REGULARIZATION)
+
+        clipped = np.clip(solution, lower, upper)
+        scales[free] = clipped
+        newly_bound = solution != clipped
+        if not newly_bound.any():
+            break
+
+        free_indices = np.flatnonzero(free)
+        free[free_indices[newly_bound]] = False
+        if not free.any():
+            break
+
+    return scales
+
+
+def scale_day_to_target(day: MealPlanDay, target: MacroTotals) -> MealPlanDay:
+    """
+    Rescale a day's portions so its totals land 0-2% under target without exceeding it.
+
+    How close each macro gets depends on the foods the model chose (e.g. a day
+    with no fat sources can't reach the fat target); no macro ever ends above
+    target.
+
+    Args:
+        day: Generated day (food macros are taken as given for its quantity_g)
+        target: Daily macro targets
+
+    Returns:
+        New MealPlanDay with scaled foods and recomputed meal and daily totals
+    """
+    foods = [food for meal in day.meals for food in meal.foods]
+    targets = np.array([getattr(target, macro) for macro in MACROS], dtype=float)
+    macros = np.array([[getattr(food, macro) for food in foods] for macro in MACROS], dtype=float)
+
+    # Fit in relative terms so calories don't dominate grams; skip zero targets
+    active = targets > 0
+    relative = macros[active] / targets[active, None]
+    scales = _bounded_least_squares(relative, np.full(active.sum(), TARGET_RATIO), MIN_SCALE, MAX_SCALE)
+
+    # Uniform shrink so no macro is over target
+    if active.any():
+        peak = (relative @ scales).max()
+        if peak > 1.0:
+            scales = scales / peak
+
+    # Round food macros down so rounded sums can't creep over target
+    scaled_iter = iter(scales)
+    meals = []
+    for meal in day.meals:
+        scaled_foods = []
+        for food in meal.foods:
+            scale = next(scaled_iter)
+            scaled_foods.append(Food(
+                name=food.name,
+                quantity_g=max(round(food.quantity_g * scale, 1), 0.1),
+                **{macro: float(np.floor(getattr(food, macro) * scale * 10)) / 10 for macro in MACROS}
+            ))
+        meals.append(Meal(
+            id=meal.id,
+            name=meal.name,
+            meal_type=meal.meal_type,
+            foods=scaled_foods,
+            totals=MacroTotals.sum_of(scaled_foods)
+        ))
+
+    return MealPlanDay(
+        date=day.date,
+        day_name=day.day_name,
+        meals=meals,
+        daily_totals=MacroTotals.sum_of([meal.totals for meal in meals])
+    )
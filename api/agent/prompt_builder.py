@@ -0,0 +1,102 @@
+"""
+Compact prompt sections for the meal plan generators.
+
+Targets go on one line, favorite foods in a per-100g table (deduplicated by
+name) and days with their theme on one line each. Instructions that hold
+for every request (output structure, what to do without favorites) live in
+the system prompts only, so every chunk prompt carries just the request's
+data. Prompt sizes are measured with the local token estimate from
+utils/tokens.py.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.tokens import estimate_tokens
+
+# Favorite foods listed in a prompt
+MAX_PROMPT_FAVORITES = 10
+
+
+def _number(value: float) -> str:
+    """Render 67.0 as "67" and 3.60 as "3.6"."""
+    return f"{float(value):g}"
+
+
+def format_targets(targets: Dict, label: str = "Daily targets") -> str:
+    """One-line macro targets, e.g. "Daily targets (never exceed): 2000 kcal, P 150g, C 200g, F 67g"."""
+    return (
+        f"{label} (never exceed): {_number(targets['calories'])} kcal, P {_number(targets['protein'])}g, "
+        f"C {_number(targets['carbs'])}g, F {_number(targets['fat'])}g\n\n"
+    )
+
+
+def format_favorites(favorite_foods: Optional[List[Dict]], limit: int = MAX_PROMPT_FAVORITES) -> str:
+    """
+    Favorite foods as a compact per-100g table.
+
+    Foods repeated under the same name (any case) are listed once. Without
+    favorites the section is empty; the system prompts say what to do then.
+
+    Args:
+        favorite_foods: Favorite food rows with *_per_100g macros
+        limit: Maximum foods listed
+
+    Returns:
+        Prompt section, or "" without favorites
+    """
+    rows = []
+    seen = set()
+    for food in favorite_foods or []:
+        key = food['name'].strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append(
+            f"{food['name']}|{_number(food['calories_per_100g'])}|{_number(food['protein_per_100g'])}|"
+            f"{_number(food['carbs_per_100g'])}|{_number(food['fat_per_100g'])}"
+        )
+        if len(rows) == limit:
+            break
+
+    if not rows:
+        return ""
+    return "Favorite foods, use when possible (name|kcal|P|C|F per 100g):\n" + "\n".join(rows) + "\n\n"
+
+
+def format_preferences(food_preferences: str, label: str = "USER FOOD PREFERENCES") -> str:
+    """User preferences or change requests, marked as mandatory."""
+    if not food_preferences:
+        return ""
+    return f"🔴 {label} (MUST FOLLOW):\n{food_preferences}\n\n"
+
+
+def build_chunk_prompt(
+    user_targets: Dict,
+    favorite_foods: Optional[List[Dict]],
+    days: Sequence[Tuple[str, str, Optional[str]]],
+    food_preferences: str = ""
+) -> str:
+    """
+    Build the user prompt for one day chunk.
+
+    Args:
+        user_targets: Daily macro targets
+        favorite_foods: User's favorite foods with macro info
+        days: (day name, date, theme or None) per requested day
+        food_preferences: User's specific food preferences from conversation
+
+    Returns:
+        Prompt listing each day as "- Monday (2025-01-13): theme"
+    """
+    prompt = format_targets(user_targets)
+    prompt += "Days (each with its own theme; other days use different themes, don't repeat their dishes):\n"
+    for day_name, date, theme in days:
+        prompt += f"- {day_name} ({date})" + (f": {theme}" if theme else "") + "\n"
+    prompt += "\n"
+    prompt += format_preferences(food_preferences)
+    prompt += format_favorites(favorite_foods)
+    return prompt
+
+
+def estimate_request_tokens(system_prompt: str, prompt: str) -> int:
+    """Estimated input tokens of a request (system plus user prompt, excluding the output schema)."""
+    return estimate_tokens(system_prompt) + estimate_tokens(prompt)
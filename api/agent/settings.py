@@ -4,7 +4,7 @@ Configuration management using pydantic-settings and python-dotenv.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator, ConfigDict
 from dotenv import load_dotenv
@@ -30,12 +30,174 @@ class Settings(BaseSettings):
     # Supabase Configuration
     supabase_url: str = Field(..., description="Supabase project URL")
     supabase_service_key: str = Field(..., description="Supabase service role key")
+    supabase_jwt_secret: Optional[str] = Field(
+        default=None,
+        description="Supabase JWT secret for local HS256 token verification (JWKS is used for asymmetric keys)"
+    )
+
+    # Auth Cache Configuration
+    auth_user_cache_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="Lifetime of cached auth_id -> user_id mappings (bounds revocation delay)"
+    )
+    auth_user_cache_size: int = Field(default=10000, ge=1, description="Max cached auth_id -> user_id mappings")
+    auth_jwks_cache_seconds: int = Field(default=3600, ge=60, description="Lifetime of the cached JWKS key set")
 
     # LLM Configuration
     llm_provider: str = Field(default="anthropic", description="LLM provider (openai or anthropic)")
     llm_api_key: str = Field(..., description="API key for LLM provider")
     llm_model: str = Field(default="claude-3-5-haiku-20241022", description="Model name")
 
+    # Conversation Store Configuration
+    conversation_cache_size: int = Field(default=1000, ge=1, description="Max conversations kept in memory")
+    conversation_cache_ttl_seconds: int = Field(
+        default=3600,
+        ge=1,
+        description="Idle lifetime of an in-memory conversation before reloading from Supabase"
+    )
+
+    # History Compaction Configuration
+    history_keep_turns: int = Field(default=4, ge=1, description="Most recent turns always sent verbatim to the coach")
+    history_token_budget: int = Field(
+        default=3000,
+        ge=0,
+        description="Estimated history tokens above which older turns are folded into a rolling summary"
+    )
+    history_summary_cache_size: int = Field(default=1000, ge=1, description="Max cached rolling summaries")
+
+    # Meal Plan Generation Configuration
+    meal_plan_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Max day chunks generated concurrently per meal plan"
+    )
+    meal_plan_generation_mode: Literal["chunked", "outline", "fast"] = Field(
+        default="chunked",
+        description=(
+            "Default meal plan pipeline: 'chunked', 'outline' (outline first, then days in parallel) "
+            "or 'fast' (no model calls)"
+        )
+    )
+    meal_plan_overload_fallback: bool = Field(
+        default=True,
+        description="Build the plan with the LLM-free fallback planner when the model API stays overloaded"
+    )
+    meal_plan_day_attempts: int = Field(
+        default=2,
+        ge=1,
+        description="Attempts per day (outline days and invalid single-day chunks) before the plan fails"
+    )
+    meal_plan_retry_budget: int = Field(
+        default=6,
+        ge=0,
+        description="Retries shared by all retry layers (overload backoff, day retries, chunk splits) of one meal plan"
+    )
+    meal_plan_hedging: bool = Field(
+        default=False,
+        description="Send a duplicate day-chunk request when the first is slower than the learned p90 latency"
+    )
+    meal_plan_hedge_ratio: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description="Maximum hedged requests per day-chunk request"
+    )
+    meal_plan_hedge_default_seconds: float = Field(
+        default=30,
+        gt=0,
+        description="Hedge delay used until enough chunk latencies are recorded for a p90"
+    )
+    meal_plan_result_memo_seconds: float = Field(
+        default=60,
+        ge=0,
+        description="How long a finished meal plan is reused for an identical repeated request"
+    )
+    meal_plan_result_memo_size: int = Field(default=1000, ge=1, description="Max finished meal plans memoized")
+    meal_plan_day_cache_size: int = Field(default=500, ge=1, description="Max generic meal plan weeks cached in memory")
+    meal_plan_day_cache_ttl_seconds: float = Field(
+        default=7 * 24 * 3600,
+        gt=0,
+        description="Lifetime of a cached generic meal plan week"
+    )
+    meal_plan_day_cache_variants: int = Field(
+        default=3,
+        ge=1,
+        description="Different generic weeks kept per day cache key, so repeat requests get a new plan"
+    )
+    meal_plan_day_cache_persist: bool = Field(
+        default=False,
+        description="Also store cached weeks in the meal_plan_day_cache Supabase table"
+    )
+    today_summary_cache_size: int = Field(default=5000, ge=1, description="Max users whose today summary is cached")
+    today_summary_cache_ttl_seconds: float = Field(
+        default=300,
+        gt=0,
+        description="Lifetime of a cached today summary while daily_summary realtime events are received"
+    )
+    today_summary_cache_fallback_ttl_seconds: float = Field(
+        default=10,
+        ge=0,
+        description="Lifetime of a cached today summary while the realtime channel is down"
+    )
+    summary_series_cache_size: int = Field(default=2000, ge=1, description="Max users whose recent daily summaries are cached")
+    summary_series_cache_days: int = Field(
+        default=90,
+        ge=1,
+        description="Days of daily summaries loaded per user (the longest analytics window)"
+    )
+    summary_series_cache_ttl_seconds: float = Field(
+        default=3600,
+        gt=0,
+        description="Lifetime of a cached daily summary series before it is fully reloaded"
+    )
+    summary_series_cache_refresh_seconds: float = Field(
+        default=10,
+        ge=0,
+        description="Interval between refreshes of a cached series' newest days while the realtime channel is down"
+    )
+    meal_plan_progress_channels: int = Field(default=1000, ge=1, description="Max meal plan progress channels kept in memory")
+    meal_plan_progress_ttl_seconds: float = Field(
+        default=900,
+        gt=0,
+        description="How long a generation's progress events are kept for replay"
+    )
+    meal_plan_progress_wait_seconds: float = Field(
+        default=300,
+        gt=0,
+        description="How long a progress subscriber waits for its generation to finish"
+    )
+    meal_plan_background_jobs: bool = Field(
+        default=True,
+        description=(
+            "Generate meal plans in the background job queue and return meal_plan_job_id for clients "
+            "to poll at /api/meal-plan-jobs/{id}; False generates inline and returns meal_plan (legacy clients)"
+        )
+    )
+    meal_plan_job_workers: int = Field(default=2, ge=1, description="Meal plan jobs generated concurrently")
+    meal_plan_job_queue_size: int = Field(default=100, ge=1, description="Max meal plan jobs waiting for a worker")
+    meal_plan_job_cache_size: int = Field(default=1000, ge=1, description="Max meal plan job statuses kept in memory")
+    meal_plan_job_ttl_seconds: float = Field(
+        default=24 * 3600,
+        gt=0,
+        description="How long meal plan job status is kept in memory"
+    )
+    meal_plan_job_stale_seconds: float = Field(
+        default=3600,
+        gt=0,
+        description="Jobs left queued or running this long without an update are marked failed at startup"
+    )
+    food_index_refresh_seconds: float = Field(
+        default=3600,
+        gt=0,
+        description="How often the in-memory food macro index fetches food_items synced since its last load"
+    )
+    food_index_full_refresh_seconds: float = Field(
+        default=86400,
+        gt=0,
+        description="How often the food index reloads all food_items (drops deleted rows)"
+    )
+
     # Application Configuration
     app_env: str = Field(default="development", description="Environment")
     log_level: str = Field(default="INFO", description="Logging level")
@@ -6,20 +6,83 @@ import logging
 import asyncio
 import json
 from datetime import datetime, timedelta
+from typing import Optional
+from uuid import uuid4
 from pydantic_ai import RunContext
 from agent.dependencies import CoachAgentDependencies
+from agent.meal_plan_progress import meal_plan_progress, ProgressReporter
+from agent.meal_plan_jobs import (
+    meal_plan_jobs,
+    MealPlanJob,
+    QueueFullError,
+    TERMINAL_STATUSES,
+    generate_and_save_meal_plan
+)
+from agent.settings import settings
 from database.queries import (
     fetch_today_summary,
     fetch_weekly_summary,
     fetch_pattern_summary,
+    fetch_summary_rows,
     fetch_user_favorites,
-    save_meal_plan,
-    fetch_frequently_logged_foods
+    fetch_frequently_logged_foods,
+    get_meal_plan,
+    fetch_latest_meal_plan,
+    update_meal_plan_day
 )
+from database.today_summary_cache import today_summary_cache
+from database.summary_series_cache import summary_series_cache
+from utils.analytics import SummarySeries
+from models.meal_plan import MealPlan
 
 logger = logging.getLogger(__name__)
 
 
+async def _load_meal_plan(deps: CoachAgentDependencies, week_start: str) -> Optional[MealPlan]:
+    """Load the plan for week_start, or the user's latest plan if no week is given."""
+    if week_start:
+        row = await get_meal_plan(deps.supabase, deps.user_id, week_start)
+    else:
+        row = await fetch_latest_meal_plan(deps.supabase, deps.user_id)
+
+    if not row or 'plan_data' not in row:
+        return None
+    return MealPlan.model_validate(row['plan_data'])
+
+
+async def _load_summary_series(deps: CoachAgentDependencies, days: int) -> SummarySeries:
+    """The user's cached daily summaries covering the last N days (shared by the analytics tools)."""
+    return await summary_series_cache.get(
+        deps.user_id,
+        days,
+        lambda start_date: fetch_summary_rows(deps.supabase, deps.user_id, start_date)
+    )
+
+
+# (summary key, label, unit) for the weekly trend report
+_TREND_MACROS = (("calories", "Calories", ""), ("protein", "Protein", "g"), ("carbs", "Carbs", "g"), ("fat", "Fat", "g"))
+
+
+def _format_change(value: Optional[float], unit: str) -> str:
+    return "n/a" if value is None else f"{value:+.0f}{unit}"
+
+
+def _format_trend_week(week: dict) -> str:
+    """One weekly_trend week as a report line."""
+    if not week['days_logged']:
+        return f"- Week ending {week['end_date']}: nothing logged"
+    return (
+        f"- Week ending {week['end_date']}: {week['avg_calories']:.0f} cal, {week['avg_protein']:.0f}g protein, "
+        f"{week['avg_carbs']:.0f}g carbs, {week['avg_fat']:.0f}g fat ({week['days_logged']}/7 days logged)"
+    )
+
+
+def _find_day(meal_plan: MealPlan, day_name: str) -> Optional[int]:
+    """Index of the plan day matching a day name (case-insensitive)."""
+    wanted = day_name.strip().lower()
+    return next((idx for idx, day in enumerate(meal_plan.days) if day.day_name.value.lower() == wanted), None)
+
+
 # Import after logger to avoid circular import
 def register_tools():
     """Register all tools with the nutrition_coach agent."""
@@ -39,9 +102,9 @@ def register_tools():
             Formatted summary of today's progress
         """
         try:
-            summary = await fetch_today_summary(
-                ctx.deps.supabase,
-                ctx.deps.user_id
+            summary = await today_summary_cache.get(
+                ctx.deps.user_id,
+                lambda: fetch_today_summary(ctx.deps.supabase, ctx.deps.user_id)
             )
 
             if summary is None:
@@ -94,14 +157,11 @@ Remaining to hit targets:
             if days < 1 or days > 30:
                 return "Error: days must be between 1 and 30"
 
-            summary = await asyncio.wait_for(
-                fetch_weekly_summary(
-                    ctx.deps.supabase,
-                    ctx.deps.user_id,
-                    days
-                ),
-                timeout=5.0
-            )
+            async def load_summary():
+                series = await _load_summary_series(ctx.deps, days)
+                return await fetch_weekly_summary(ctx.deps.supabase, ctx.deps.user_id, days, series)
+
+            summary = await asyncio.wait_for(load_summary(), timeout=5.0)
 
             if summary is None:
                 return f"No nutrition data found for the last {days} days. User hasn't logged any meals yet."
@@ -141,11 +201,12 @@ Worst protein day: {summary['worst_protein_day']}"""
 
         Use this when user asks about long-term trends, consistency issues, or
         wants to understand their eating patterns (e.g., weekday vs weekend):
-        "Why can't I stick to my carbs on weekends?", "What's my pattern with protein?"
+        "Why can't I stick to my carbs on weekends?", "What's my pattern with protein?",
+        "Am I eating less than a few weeks ago?" (weekly_trend)
 
         Args:
             days: Number of days to analyze (7-90, default 30)
-            pattern_type: Type of analysis - "weekday_weekend" or "macro_consistency"
+            pattern_type: Type of analysis - "weekday_weekend", "weekly_trend" or "macro_consistency"
 
         Returns:
             Formatted pattern analysis
@@ -154,7 +215,7 @@ Worst protein day: {summary['worst_protein_day']}"""
             if days < 7 or days > 90:
                 return "Error: days must be between 7 and 90"
 
-            valid_patterns = ["weekday_weekend", "macro_consistency"]
+            valid_patterns = ["weekday_weekend", "weekly_trend", "macro_consistency"]
             if pattern_type not in valid_patterns:
                 return f"Error: pattern_type must be one of {valid_patterns}"
 
@@ -162,10 +223,13 @@ Worst protein day: {summary['worst_protein_day']}"""
                 ctx.deps.supabase,
                 ctx.deps.user_id,
                 days,
-                pattern_type
+                pattern_type,
+                await _load_summary_series(ctx.deps, days)
             )
 
             if summary is None:
+                if pattern_type == "weekly_trend":
+                    return "Need at least two weeks of logged data for a weekly trend. User hasn't logged enough meals yet."
                 return f"Need at least 7 days of logged data for pattern analysis. User hasn't logged enough meals yet."
 
             if pattern_type == "weekday_weekend":
@@ -191,6 +255,27 @@ Weekends (Sat-Sun):
 Key Pattern:
 Weekend calories are {abs(cal_pct):.0f}% {'higher' if cal_diff > 0 else 'lower'} than weekdays, with carbs showing the biggest difference ({abs(carbs_pct):.0f}% {'increase' if carbs_diff > 0 else 'decrease'})."""
 
+            elif pattern_type == "weekly_trend":
+                weeks = "\n".join(_format_trend_week(week) for week in summary['weeks'])
+                changes = "\n".join(
+                    f"- {label}: {_format_change(summary[f'{macro}_wow_delta'], unit)} vs previous week, "
+                    f"{_format_change(summary[f'{macro}_slope_per_week'], unit)} per week overall"
+                    for macro, label, unit in _TREND_MACROS
+                )
+                slope = summary['calories_slope_per_week']
+                direction = "steady" if slope is None or abs(slope) < 25 else ("rising" if slope > 0 else "falling")
+
+                return f"""Weekly Trend Analysis (Last {days} days):
+
+Weekly Averages (logged days only):
+{weeks}
+
+Changes (rolling 7-day average):
+{changes}
+
+Pattern:
+Calorie intake is {direction} over this period."""
+
             elif pattern_type == "macro_consistency":
                 stds = {
                     'protein': summary['protein_std'],
@@ -261,7 +346,8 @@ Your {most_consistent} intake is very consistent, while {least_consistent} varie
     async def generate_meal_plan(
         ctx: RunContext[CoachAgentDependencies],
         duration_days: int = 7,
-        food_preferences: str = ""
+        food_preferences: str = "",
+        new_plan: bool = False
     ) -> str:
         """
         Generate a personalized 7-day meal plan using Claude AI based on user's macro targets.
@@ -277,18 +363,38 @@ Your {most_consistent} intake is very consistent, while {least_consistent} varie
             food_preferences: User's specific food preferences or requirements from the conversation
                             (e.g., "include steak and eggs daily", "lots of fruit", "vegetarian", etc.)
                             Extract this from the user's message when they specify preferences.
+            new_plan: True when the user asks for a different plan than the one they just got
+                     (e.g., "regenerate my plan", "give me another one")
 
         Returns:
-            Confirmation message about generated meal plan
+            Confirmation message about generated meal plan (or the queued job)
         """
+        generation_id = ctx.deps.meal_plan_generation_id
+        progress = None
+
         try:
+            # The job id doubles as the progress channel id the client already knows, so a
+            # generation_id that already names a job is a retry: point at that job instead of
+            # queuing another one the client isn't listening to
+            if settings.meal_plan_background_jobs and generation_id and generation_id in meal_plan_jobs:
+                existing = await meal_plan_jobs.get(generation_id, ctx.deps.user_id)
+                if existing is None:
+                    return "Error: this meal plan generation id is already in use. Please try again."
+                ctx.deps.meal_plan_job_id = generation_id
+                if existing['status'] in TERMINAL_STATUSES:
+                    return f"That meal plan request (job {generation_id}) already finished with status '{existing['status']}'. Ask again to create a new plan."
+                return f"⏳ Your 7-day meal plan starting {existing['week_start']} is already being created (job {generation_id}) and will appear at /meal-plans when it's ready."
+
             # 1. Fetch user's macro targets
-            summary = await fetch_today_summary(
-                ctx.deps.supabase,
-                ctx.deps.user_id
+            summary = await today_summary_cache.get(
+                ctx.deps.user_id,
+                lambda: fetch_today_summary(ctx.deps.supabase, ctx.deps.user_id)
             )
 
             if summary is None:
+                if generation_id:
+                    progress = ProgressReporter(meal_plan_progress, generation_id, ctx.deps.user_id)
+                    progress.publish('error', content='No macro targets set')
                 return "Please set your daily macro targets first before generating a meal plan."
 
             # Extract targets
@@ -324,53 +430,190 @@ Your {most_consistent} intake is very consistent, while {least_consistent} varie
             week_start = today + timedelta(days=days_until_monday)
             week_start_str = week_start.strftime('%Y-%m-%d')
 
-            # 4. Generate meal plan using Claude structured output
-            from agent.meal_plan_generator import generate_meal_plan_structured
-
             logger.info(f"Generating AI meal plan for user {ctx.deps.user_id}, week {week_start_str}")
             if food_preferences:
                 logger.info(f"User food preferences: {food_preferences}")
 
-            meal_plan_obj = await generate_meal_plan_structured(
-                user_targets=targets,
-                favorite_foods=favorites,
-                week_start=week_start_str,
-                food_preferences=food_preferences
-            )
-
-            # Convert Pydantic model to dict for database/API
-            meal_plan_dict = meal_plan_obj.model_dump()
-
-            # 5. Validate macro accuracy
-            if not meal_plan_obj.validate_macro_accuracy(tolerance=0.05):
-                logger.warning(f"Generated meal plan exceeds ±5% macro tolerance for user {ctx.deps.user_id}")
-                # Continue anyway for MVP - Claude did its best
+            if favorites:
+                food_note = "The plan uses your favorite foods and includes varied, balanced meals."
+            else:
+                food_note = "The plan uses common healthy whole foods with varied, balanced meals."
 
-            # 6. Save to database
-            saved = await save_meal_plan(
+            # 4a. Queue in the background so the chat turn returns immediately
+            if settings.meal_plan_background_jobs:
+                # The job id doubles as the progress channel id the client already knows
+                job = await meal_plan_jobs.submit(MealPlanJob(
+                    job_id=generation_id or str(uuid4()),
+                    user_id=ctx.deps.user_id,
+                    week_start=week_start_str,
+                    user_targets=targets,
+                    favorite_foods=favorites,
+                    food_preferences=food_preferences,
+                    fresh=new_plan
+                ))
+                ctx.deps.meal_plan_job_id = job.job_id
+
+                return f"⏳ I'm creating your 7-day meal plan starting {week_start_str} now - it takes about a minute and will appear at /meal-plans when it's ready (job {job.job_id}). Each day is personalized to your targets ({targets['calories']} cal, {targets['protein']}g protein, {targets['carbs']}g carbs, {targets['fat']}g fat). {food_note}"
+
+            # 4b. Generate inline, streaming days to the client's progress channel
+            if generation_id:
+                progress = ProgressReporter(meal_plan_progress, generation_id, ctx.deps.user_id)
+
+            meal_plan_dict = await generate_and_save_meal_plan(
                 ctx.deps.supabase,
                 ctx.deps.user_id,
+                targets,
+                favorites,
                 week_start_str,
-                meal_plan_dict
+                food_preferences,
+                progress,
+                new_plan
             )
 
-            if not saved:
+            if meal_plan_dict is None:
                 return "Failed to save your meal plan. Please try again."
 
-            # 7. Store in deps for response passthrough
+            # 5. Store in deps for response passthrough
             ctx.deps.generated_meal_plan = meal_plan_dict
 
-            # 8. Return conversational confirmation
-            if favorites:
-                food_note = "The plan uses your favorite foods and includes varied, balanced meals."
-            else:
-                food_note = "The plan uses common healthy whole foods with varied, balanced meals."
-
+            # 6. Return conversational confirmation
             return f"✅ I've created your 7-day meal plan starting {week_start_str}! Each day is personalized to hit your targets ({targets['calories']} cal, {targets['protein']}g protein, {targets['carbs']}g carbs, {targets['fat']}g fat) within ±5%. {food_note}\n\nView your meal plan at: /meal-plans"
 
+        except QueueFullError:
+            logger.warning(f"Meal plan queue full, rejecting request from user {ctx.deps.user_id}")
+            return "Lots of people are generating meal plans right now. Please try again in a few minutes."
+
         except Exception as e:
             logger.error(f"generate_meal_plan failed: {e}", exc_info=True)
+            if progress:
+                progress.publish('error', content='Meal plan generation failed')
             return "I encountered an error generating your meal plan. Please try again or contact support if the issue persists."
 
+        finally:
+            if progress:
+                progress.close()
+
+    @nutrition_coach.tool
+    async def regenerate_meal_plan_day(
+        ctx: RunContext[CoachAgentDependencies],
+        day_name: str,
+        change_request: str = "",
+        week_start: str = ""
+    ) -> str:
+        """
+        Regenerate one day of an existing meal plan, keeping the rest of the week.
+
+        Use this when the user wants to change a whole day of a plan they already have:
+        "Redo Wednesday", "Give me different meals on Saturday", "Make Friday vegetarian"
+
+        Args:
+            day_name: Day to regenerate (Monday-Sunday)
+            change_request: What the user wants changed, in their words
+            week_start: Week start date (YYYY-MM-DD); defaults to the latest plan
+
+        Returns:
+            Confirmation message with the new meals
+        """
+        try:
+            from agent.meal_plan_generator import regenerate_day
+
+            meal_plan = await _load_meal_plan(ctx.deps, week_start)
+            if meal_plan is None:
+                return "You don't have a meal plan to edit yet. Ask me to generate one first."
+
+            day_index = _find_day(meal_plan, day_name)
+            if day_index is None:
+                return f"Error: day_name must be a weekday name (Monday-Sunday), got '{day_name}'"
+
+            favorites = await fetch_user_favorites(ctx.deps.supabase, ctx.deps.user_id)
+
+            logger.info(f"Regenerating {day_name} of meal plan {meal_plan.week_start} for user {ctx.deps.user_id}")
+            day = await regenerate_day(meal_plan, day_index, change_request, favorites)
+
+            saved = await update_meal_plan_day(
+                ctx.deps.supabase,
+                ctx.deps.user_id,
+                meal_plan.week_start,
+                day_index,
+                day.model_dump()
+            )
+            if saved is None:
+                return "Failed to save the updated day. Please try again."
+
+            ctx.deps.generated_meal_plan = saved['plan_data']
+
+            meals = "\n".join(f"- {meal.meal_type.value.capitalize()}: {meal.name}" for meal in day.meals)
+            return f"✅ I've updated {day.day_name.value} ({day.date}) - the rest of the week is unchanged:\n{meals}\n\nView your meal plan at: /meal-plans"
+
+        except Exception as e:
+            logger.error(f"regenerate_meal_plan_day failed: {e}", exc_info=True)
+            return "I encountered an error updating that day. Please try again."
+
+    @nutrition_coach.tool
+    async def regenerate_meal(
+        ctx: RunContext[CoachAgentDependencies],
+        day_name: str,
+        meal_type: str,
+        change_request: str = "",
+        week_start: str = ""
+    ) -> str:
+        """
+        Replace a single meal in an existing meal plan, keeping everything else.
+
+        Use this when the user wants to swap one meal:
+        "Swap Wednesday dinner", "I don't like Monday's breakfast", "Different snack on Sunday"
+
+        Args:
+            day_name: Day of the meal (Monday-Sunday)
+            meal_type: "breakfast", "lunch", "dinner" or "snack"
+            change_request: What the user wants instead, in their words
+            week_start: Week start date (YYYY-MM-DD); defaults to the latest plan
+
+        Returns:
+            Confirmation message with the new meal
+        """
+        try:
+            from agent.meal_plan_generator import regenerate_meal as regenerate_meal_in_plan
+
+            meal_plan = await _load_meal_plan(ctx.deps, week_start)
+            if meal_plan is None:
+                return "You don't have a meal plan to edit yet. Ask me to generate one first."
+
+            day_index = _find_day(meal_plan, day_name)
+            if day_index is None:
+                return f"Error: day_name must be a weekday name (Monday-Sunday), got '{day_name}'"
+
+            day = meal_plan.days[day_index]
+            wanted = meal_type.strip().lower()
+            meal_index = next((idx for idx, meal in enumerate(day.meals) if meal.meal_type.value == wanted), None)
+            if meal_index is None:
+                available = [meal.meal_type.value for meal in day.meals]
+                return f"Error: {day.day_name.value} has no {meal_type}. Available meals: {available}"
+
+            favorites = await fetch_user_favorites(ctx.deps.supabase, ctx.deps.user_id)
+
+            logger.info(f"Regenerating {day_name} {wanted} of meal plan {meal_plan.week_start} for user {ctx.deps.user_id}")
+            new_day = await regenerate_meal_in_plan(meal_plan, day_index, meal_index, change_request, favorites)
+
+            saved = await update_meal_plan_day(
+                ctx.deps.supabase,
+                ctx.deps.user_id,
+                meal_plan.week_start,
+                day_index,
+                new_day.model_dump()
+            )
+            if saved is None:
+                return "Failed to save the updated meal. Please try again."
+
+            ctx.deps.generated_meal_plan = saved['plan_data']
+
+            meal = new_day.meals[meal_index]
+            foods = ", ".join(f"{food.name} ({food.quantity_g:.0f}g)" for food in meal.foods)
+            return f"✅ I've replaced {day.day_name.value}'s {wanted} with {meal.name}: {foods} ({meal.totals.calories:.0f} cal, {meal.totals.protein:.0f}g protein). The rest of your plan is unchanged.\n\nView your meal plan at: /meal-plans"
+
+        except Exception as e:
+            logger.error(f"regenerate_meal failed: {e}", exc_info=True)
+            return "I encountered an error replacing that meal. Please try again."
+
 # Register tools when module is imported
 register_tools()
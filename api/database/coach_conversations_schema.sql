@@ -0,0 +1,30 @@
+-- Coach Conversation Messages Table Schema
+-- Stores server-side chat history for the AI Nutrition Coach so clients can
+-- send only the new message each turn (see api/database/conversation_store.py)
+
+CREATE TABLE IF NOT EXISTS coach_conversation_messages (
+  conversation_id UUID NOT NULL,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  seq INTEGER NOT NULL CHECK (seq >= 0),
+  message JSONB NOT NULL,  -- One serialized pydantic-ai ModelMessage
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+
+  -- Messages are append-only and ordered within a conversation
+  PRIMARY KEY (conversation_id, seq)
+);
+
+-- Index for listing/cleaning up a user's conversations
+CREATE INDEX IF NOT EXISTS idx_coach_conversation_messages_user
+  ON coach_conversation_messages(user_id, created_at);
+
+-- Row Level Security (RLS) Policies
+-- The backend uses the service role key; end users may only read their own history
+ALTER TABLE coach_conversation_messages ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own coach conversations"
+  ON coach_conversation_messages FOR SELECT
+  USING (user_id IN (SELECT id FROM users WHERE auth_id = auth.uid()));
+
+CREATE POLICY "Users can delete own coach conversations"
+  ON coach_conversation_messages FOR DELETE
+  USING (user_id IN (SELECT id FROM users WHERE auth_id = auth.uid()));
@@ -0,0 +1,167 @@
+"""
+Server-side conversation store for the nutrition coach.
+
+Keeps parsed pydantic-ai ModelMessage lists in an in-memory LRU and persists
+them to the coach_conversation_messages table, so clients send only the new
+message each turn. Per-turn work is proportional to the new messages: history
+is parsed from the database at most once per cache miss, and each turn appends
+only what the agent produced.
+"""
+
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import List
+from supabase import AsyncClient
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
+from agent.settings import settings
+from database.queries import fetch_conversation_messages, append_conversation_messages
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationNotFoundError(Exception):
+    """Raised when a conversation belongs to a different user."""
+
+
+@dataclass
+class Conversation:
+    """Cached conversation state."""
+    conversation_id: str
+    user_id: str
+    messages: List[ModelMessage] = field(default_factory=list)
+    persisted_count: int = 0  # Messages already written to Supabase
+
+
+class ConversationStore:
+    """
+    In-memory LRU of conversations backed by Supabase.
+
+    Args:
+        maxsize: Maximum number of conversations kept in memory
+        ttl_seconds: Idle lifetime of a cached conversation
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._cache: TTLCache[str, Conversation] = TTLCache(
+            maxsize=maxsize,
+            ttl_seconds=ttl_seconds,
+            on_evict=self._on_evict
+        )
+        # Serializes appends per conversation; entries go away once no append holds them
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def _on_evict(conversation_id: str, conversation: Conversation) -> None:
+        unsaved = len(conversation.messages) - conversation.persisted_count
+        if unsaved:
+            logger.error(
+                f"Evicted conversation {conversation_id} with {unsaved} unsaved messages; "
+                "they are lost from its history"
+            )
+
+    async def _get(
+        self,
+        supabase: AsyncClient,
+        conversation_id: str,
+        user_id: str
+    ) -> Conversation:
+        conversation = self._cache.get(conversation_id)
+
+        if conversation is None:
+            rows = await fetch_conversation_messages(supabase, conversation_id)
+
+            if rows and any(row['user_id'] != user_id for row in rows):
+                raise ConversationNotFoundError(conversation_id)
+
+            messages = ModelMessagesTypeAdapter.validate_python([row['message'] for row in rows])
+            conversation = Conversation(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                messages=list(messages),
+                persisted_count=len(messages)
+            )
+            logger.debug(f"Loaded conversation {conversation_id} with {len(messages)} messages")
+
+        elif conversation.user_id != user_id:
+            raise ConversationNotFoundError(conversation_id)
+
+        # Refresh LRU position and TTL
+        self._cache.set(conversation_id, conversation)
+        return conversation
+
+    async def load(
+        self,
+        supabase: AsyncClient,
+        conversation_id: str,
+        user_id: str
+    ) -> List[ModelMessage]:
+        """
+        Get the message history for a conversation.
+
+        Unknown conversation IDs start a new, empty conversation.
+
+        Args:
+            supabase: Async Supabase client
+            conversation_id: Client-supplied conversation UUID
+            user_id: Authenticated user ID
+
+        Returns:
+            Parsed message history (a copy; safe to pass to the agent)
+
+        Raises:
+            ConversationNotFoundError: Conversation belongs to another user
+        """
+        conversation = await self._get(supabase, conversation_id, user_id)
+        return list(conversation.messages)
+
+    async def append(
+        self,
+        supabase: AsyncClient,
+        conversation_id: str,
+        user_id: str,
+        new_messages: List[ModelMessage]
+    ) -> None:
+        """
+        Append a turn's new messages and persist everything not yet written.
+
+        Persistence failures are logged and retried on the next append; the
+        in-memory history stays authoritative meanwhile. Concurrent appends to
+        one conversation run one at a time so sequence numbers never collide.
+
+        Args:
+            supabase: Async Supabase client
+            conversation_id: Conversation UUID
+            user_id: Authenticated user ID
+            new_messages: Messages produced by this turn (result.new_messages())
+        """
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = self._locks[conversation_id] = asyncio.Lock()
+
+        async with lock:
+            conversation = await self._get(supabase, conversation_id, user_id)
+            conversation.messages.extend(new_messages)
+
+            # Reserve seq numbers for exactly these rows before awaiting the write
+            first_seq = conversation.persisted_count
+            unsaved = conversation.messages[first_seq:]
+            saved = await append_conversation_messages(
+                supabase,
+                conversation_id,
+                user_id,
+                first_seq,
+                ModelMessagesTypeAdapter.dump_python(unsaved, mode='json')
+            )
+
+            if saved:
+                conversation.persisted_count = first_seq + len(unsaved)
+
+
+# Global conversation store instance
+conversation_store = ConversationStore(
+    maxsize=settings.conversation_cache_size,
+    ttl_seconds=settings.conversation_cache_ttl_seconds
+)
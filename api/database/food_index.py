@@ -0,0 +1,197 @@
+"""
+In-memory name index of per-100g food macros.
+
+Loads curated_foods and food_items once, refreshes them in the background
+(only food_items synced since the last load, plus a periodic full reload that
+drops deleted rows), and recomputes generated foods' macros as quantity_g / 100 * per_100g, so
+meal plan numbers come from the food database rather than the model's
+arithmetic. Lookups are plain dict hits and never touch the network.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from agent.settings import settings
+from database.queries import fetch_food_macro_catalog
+from database.supabase import get_supabase_client
+from models.meal_plan import Food, Meal, MealPlanDay, MacroTotals
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9%]+")
+
+
+@dataclass(frozen=True)
+class FoodMacros:
+    """Per-100g macros for one database food."""
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
+    source: str  # 'curated_foods' or 'food_items'
+
+
+def normalize_food_name(name: str) -> str:
+    """Lowercase and strip punctuation ("Chicken Breast, Grilled" -> "chicken breast grilled")."""
+    return " ".join(_NON_WORD.sub(" ", name.lower()).split())
+
+
+def _name_keys(name: str) -> List[str]:
+    """Exact and word-order-insensitive keys for a food name."""
+    normalized = normalize_food_name(name)
+    if not normalized:
+        return []
+    return [normalized, " ".join(sorted(normalized.split()))]
+
+
+class FoodIndex:
+    """
+    Food name -> per-100g macros, refreshed periodically from Supabase.
+
+    Curated foods (reviewed, with aliases) win over cached USDA food_items
+    when both match a name.
+
+    Args:
+        refresh_seconds: How often the background loop reloads the index
+        full_refresh_seconds: How often a refresh reloads all food_items
+            instead of only the ones synced since the last refresh
+    """
+
+    def __init__(self, refresh_seconds: float, full_refresh_seconds: float = 86400):
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self._entries: Dict[str, FoodMacros] = {}
+        self._food_items: Dict[str, Dict] = {}  # id -> row, merged across incremental loads
+        self._food_items_synced_at: Optional[str] = None  # Newest last_synced loaded
+        self._full_loaded_at: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, catalog: Dict[str, List[Dict]], incremental: bool = False) -> None:
+        """
+        Rebuild the index from rows from fetch_food_macro_catalog.
+
+        Args:
+            catalog: Dict of 'curated_foods' and 'food_items' rows
+            incremental: catalog's food_items are only the rows synced since
+                the last load; merge them into the ones already loaded
+        """
+        food_items = dict(self._food_items) if incremental else {}
+        synced_at = self._food_items_synced_at if incremental else None
+        for row in catalog.get('food_items', []):
+            food_items[row['id']] = row
+            if row.get('last_synced') and (synced_at or '') < row['last_synced']:
+                synced_at = row['last_synced']
+
+        entries: Dict[str, FoodMacros] = {}
+
+        # Lower priority first so curated entries overwrite USDA ones
+        sources = (('food_items', food_items.values()), ('curated_foods', catalog.get('curated_foods', [])))
+        for source, rows in sources:
+            for row in rows:
+                macros = FoodMacros(
+                    calories=float(row.get('calories_per_100g') or 0),
+                    protein=float(row.get('protein_per_100g') or 0),
+                    carbs=float(row.get('carbs_per_100g') or 0),
+                    fat=float(row.get('fat_per_100g') or 0),
+                    source=source
+                )
+                names = [row.get('name'), row.get('display_name'), *(row.get('aliases') or [])]
+                for name in filter(None, names):
+                    for key in _name_keys(name):
+                        entries[key] = macros
+
+        # Swap in one assignment so concurrent lookups never see a partial index
+        self._entries = entries
+        self._food_items = food_items
+        self._food_items_synced_at = synced_at
+        self.loaded_at = time.monotonic()
+        logger.info(f"Food index loaded with {len(entries)} name keys")
+
+    async def refresh(self) -> None:
+        """Reload the index from Supabase (keeps the old index on failure)."""
+        full = (
+            self._full_loaded_at is None
+            or time.monotonic() - self._full_loaded_at >= self.full_refresh_seconds
+        )
+        try:
+            supabase = await get_supabase_client()
+            catalog = await fetch_food_macro_catalog(supabase, None if full else self._food_items_synced_at)
+            self.load(catalog, incremental=not full)
+            if full:
+                self._full_loaded_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Food index refresh failed, keeping {len(self._entries)} cached keys: {e}")
+
+    async def run_refresh_loop(self) -> None:
+        """Load the index now and then every refresh_seconds (run as a background task)."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_seconds)
+
+    def lookup(self, name: str) -> Optional[FoodMacros]:
+        """Find per-100g macros for a food name, or None if it isn't in the database."""
+        for key in _name_keys(name):
+            macros = self._entries.get(key)
+            if macros is not None:
+                return macros
+        return None
+
+    def correct_food(self, food: Food) -> Food:
+        """Recompute a food's macros from the database if its name matches."""
+        macros = self.lookup(food.name)
+        if macros is None:
+            return food
+
+        factor = food.quantity_g / 100
+        return Food(
+            name=food.name,
+            quantity_g=food.quantity_g,
+            calories=round(macros.calories * factor, 1),
+            protein=round(macros.protein * factor, 1),
+            carbs=round(macros.carbs * factor, 1),
+            fat=round(macros.fat * factor, 1)
+        )
+
+    def correct_day(self, day: MealPlanDay) -> MealPlanDay:
+        """
+        Recompute matched foods' macros and rebuild meal and daily totals.
+
+        Unmatched foods keep the model's numbers; totals are always re-summed,
+        so wrong totals are fixed even when nothing matches.
+
+        Args:
+            day: Generated day
+
+        Returns:
+            New MealPlanDay with corrected foods and totals
+        """
+        meals = []
+        for meal in day.meals:
+            foods = [self.correct_food(food) for food in meal.foods]
+            meals.append(Meal(
+                id=meal.id,
+                name=meal.name,
+                meal_type=meal.meal_type,
+                foods=foods,
+                totals=MacroTotals.sum_of(foods)
+            ))
+
+        return MealPlanDay(
+            date=day.date,
+            day_name=day.day_name,
+            meals=meals,
+            daily_totals=MacroTotals.sum_of([meal.totals for meal in meals])
+        )
+
+
+# Global food index instance (populated by the refresh loop started in main.lifespan)
+food_index = FoodIndex(
+    refresh_seconds=settings.food_index_refresh_seconds,
+    full_refresh_seconds=settings.food_index_full_refresh_seconds
+)
@@ -0,0 +1,23 @@
+-- food_items last_synced maintenance
+-- The API's food index (api/database/food_index.py) refreshes incrementally by
+-- fetching only food_items with last_synced at or after the newest value it
+-- has loaded. last_synced defaults to NOW() on insert; this trigger also bumps
+-- it when an upsert rewrites an existing row, so changed macros are picked up.
+
+CREATE OR REPLACE FUNCTION touch_food_items_last_synced()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.last_synced = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS food_items_touch_last_synced ON food_items;
+CREATE TRIGGER food_items_touch_last_synced
+  BEFORE UPDATE ON food_items
+  FOR EACH ROW
+  EXECUTE FUNCTION touch_food_items_last_synced();
+
+-- Index for the incremental refresh filter
+CREATE INDEX IF NOT EXISTS idx_food_items_last_synced
+  ON food_items(last_synced);
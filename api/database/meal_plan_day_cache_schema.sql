@@ -0,0 +1,21 @@
+-- Meal Plan Day Cache Table Schema
+-- Shares generic generated weeks between users with similar macro targets and
+-- food preferences (see api/agent/day_cache.py). Only plans generated without
+-- favorite foods are cached, so rows contain no user data. Each key keeps a
+-- few different weeks (variants) so users asking again get a new plan.
+
+CREATE TABLE IF NOT EXISTS meal_plan_day_cache (
+  cache_key TEXT NOT NULL,     -- Bucketed targets + food preferences hash
+  variant TEXT NOT NULL,       -- Content hash of the week
+  days JSONB NOT NULL,         -- 7 serialized MealPlanDay objects
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (cache_key, variant)
+);
+
+-- Index for expiring old entries
+CREATE INDEX IF NOT EXISTS idx_meal_plan_day_cache_created
+  ON meal_plan_day_cache(created_at);
+
+-- Row Level Security (RLS)
+-- Backend-only table: no policies, so only the service role key can access it
+ALTER TABLE meal_plan_day_cache ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,23 @@
+-- Partial Meal Plan Update Function
+-- Replaces one day of a stored meal plan in place with jsonb_set, so editing
+-- a day or a single meal doesn't round-trip and rewrite the whole plan_data
+-- Called from database/queries.py::update_meal_plan_day via supabase.rpc
+
+CREATE OR REPLACE FUNCTION update_meal_plan_day(
+  p_user_id UUID,
+  p_week_start_date DATE,
+  p_day_index INT,
+  p_day JSONB
+)
+RETURNS SETOF meal_plans
+LANGUAGE sql
+AS $$
+  UPDATE meal_plans
+  SET plan_data = jsonb_set(plan_data, ARRAY['days', p_day_index::text], p_day, false),
+      updated_at = NOW()
+  WHERE user_id = p_user_id
+    AND week_start_date = p_week_start_date
+    AND p_day_index >= 0
+    AND p_day_index < jsonb_array_length(plan_data->'days')
+  RETURNING *;
+$$;
@@ -0,0 +1,28 @@
+-- Meal Plan Jobs Table Schema
+-- Status of background meal plan generations (see api/agent/meal_plan_jobs.py)
+-- so clients can poll a job after a disconnect or from another API worker
+
+CREATE TABLE IF NOT EXISTS meal_plan_jobs (
+  id UUID PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT 'queued',
+  week_start_date DATE NOT NULL,
+  meal_plan JSONB,  -- Saved plan once the job succeeds
+  error TEXT,       -- Failure reason once the job fails
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+
+  CONSTRAINT valid_meal_plan_job_status CHECK (status IN ('queued', 'running', 'succeeded', 'failed'))
+);
+
+-- Index for listing a user's recent jobs
+CREATE INDEX IF NOT EXISTS idx_meal_plan_jobs_user
+  ON meal_plan_jobs(user_id, created_at DESC);
+
+-- Row Level Security (RLS) Policies
+-- The backend writes with the service role key; users may read their own jobs
+ALTER TABLE meal_plan_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own meal plan jobs"
+  ON meal_plan_jobs FOR SELECT
+  USING (user_id IN (SELECT id FROM users WHERE auth_id = auth.uid()));
@@ -2,10 +2,12 @@
 Database query functions for nutrition data.
 """
 
+from postgrest.exceptions import APIError
 from supabase import AsyncClient
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from utils.analytics import PATTERN_STATS, SummarySeries, weekly_stats
 from utils.date_helpers import get_today_utc, get_date_n_days_ago
 
 logger = logging.getLogger(__name__)
@@ -73,18 +75,84 @@ async def fetch_today_summary(
     return None  # No goals set yet
 
 
+# PostgREST error code for an unknown RPC function (database/summary_stats.sql not applied yet)
+RPC_NOT_FOUND = 'PGRST202'
+
+# Supported pattern types, and those the pattern_stats RPC computes (the rest are computed from rows)
+PATTERN_TYPES = tuple(PATTERN_STATS)
+RPC_PATTERN_TYPES = ('weekday_weekend', 'macro_consistency')
+
+
+async def fetch_summary_rows(supabase: AsyncClient, user_id: str, start_date: str) -> List[Dict]:
+    """
+    Raw daily_summary rows since start_date (inclusive), newest first.
+
+    Loads the summary series cache, and is the fallback when the stats RPCs are missing.
+    """
+    response = await supabase.table('daily_summary') \
+        .select('*') \
+        .eq('user_id', user_id) \
+        .gte('date', start_date) \
+        .order('date', desc=True) \
+        .execute()
+    return response.data or []
+
+
+async def _weekly_stats_rpc(supabase: AsyncClient, user_id: str, start_date: str) -> Optional[Dict]:
+    """weekly_summary_stats RPC, aggregating the rows in Python if it isn't deployed."""
+    try:
+        response = await supabase.rpc('weekly_summary_stats', {
+            'p_user_id': user_id,
+            'p_start_date': start_date
+        }).execute()
+        return response.data
+    except APIError as e:
+        if e.code != RPC_NOT_FOUND:
+            raise
+        logger.warning("weekly_summary_stats RPC not found (apply database/summary_stats.sql), aggregating rows")
+        return weekly_stats(SummarySeries.from_rows(await fetch_summary_rows(supabase, user_id, start_date)))
+
+
+async def _pattern_stats_rpc(supabase: AsyncClient, user_id: str, start_date: str, pattern_type: str) -> Optional[Dict]:
+    """pattern_stats RPC, aggregating the rows in Python if it isn't deployed or lacks the pattern type."""
+    if pattern_type not in RPC_PATTERN_TYPES:
+        series = SummarySeries.from_rows(await fetch_summary_rows(supabase, user_id, start_date))
+        return PATTERN_STATS[pattern_type](series)
+
+    try:
+        response = await supabase.rpc('pattern_stats', {
+            'p_user_id': user_id,
+            'p_start_date': start_date,
+            'p_kind': pattern_type
+        }).execute()
+        return response.data
+    except APIError as e:
+        if e.code != RPC_NOT_FOUND:
+            raise
+        logger.warning("pattern_stats RPC not found (apply database/summary_stats.sql), aggregating rows")
+        series = SummarySeries.from_rows(await fetch_summary_rows(supabase, user_id, start_date))
+        return PATTERN_STATS[pattern_type](series)
+
+
 async def fetch_weekly_summary(
     supabase: AsyncClient,
     user_id: str,
-    days: int = 7
+    days: int = 7,
+    series: Optional[SummarySeries] = None
 ) -> Optional[Dict]:
     """
-    Fetch and aggregate last N days of data.
+    Fetch aggregated stats for the last N days.
+
+    With the user's cached series (database/summary_series_cache.py) the
+    window is sliced out of it and nothing is queried. Otherwise aggregation
+    runs in Postgres (weekly_summary_stats RPC in database/summary_stats.sql),
+    so one pre-aggregated object comes back regardless of the period.
 
     Args:
         supabase: Async Supabase client
         user_id: Authenticated user ID
         days: Number of days to analyze (default 7)
+        series: The user's recent days, covering at least this window
 
     Returns:
         Dictionary with aggregated weekly summary or None if no data
@@ -92,36 +160,15 @@ async def fetch_weekly_summary(
     start_date = get_date_n_days_ago(days)
 
     try:
-        response = await supabase.table('daily_summary') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .gte('date', start_date) \
-            .order('date', desc=True) \
-            .execute()
+        if series is not None:
+            stats = weekly_stats(series.since(start_date))
+        else:
+            stats = await _weekly_stats_rpc(supabase, user_id, start_date)
 
-        if not response.data or len(response.data) == 0:
+        if not stats or not stats.get('days_analyzed'):
             return None
 
-        rows = response.data
-
-        # Pre-aggregate into summary (minimize tokens)
-        summary = {
-            'period': f'Last {days} days',
-            'days_analyzed': len(rows),
-            'avg_calories': sum(r['total_calories'] for r in rows) / len(rows),
-            'avg_protein': sum(r['total_protein'] for r in rows) / len(rows),
-            'avg_carbs': sum(r['total_carbs'] for r in rows) / len(rows),
-            'avg_fat': sum(r['total_fat'] for r in rows) / len(rows),
-            'days_logged': sum(1 for r in rows if r['has_logged']),
-            'consistency_rate': sum(1 for r in rows if r['has_logged']) / len(rows),
-            'protein_target_hit_rate': sum(1 for r in rows if r['total_protein'] >= r['protein_target']) / len(rows),
-            'carbs_target_hit_rate': sum(1 for r in rows if r['total_carbs'] <= r['carbs_target'] * 1.1) / len(rows),
-            'calories_target_hit_rate': sum(1 for r in rows if abs(r['total_calories'] - r['calories_target']) <= 100) / len(rows),
-            'best_protein_day': max(rows, key=lambda r: r['total_protein'])['date'],
-            'worst_protein_day': min(rows, key=lambda r: r['total_protein'])['date']
-        }
-
-        return summary
+        return {'period': f'Last {days} days', **stats}
 
     except Exception as e:
         logger.error(f"fetch_weekly_summary failed for user {user_id}: {e}")
@@ -132,86 +179,50 @@ async def fetch_pattern_summary(
     supabase: AsyncClient,
     user_id: str,
     days: int = 30,
-    pattern_type: str = "weekday_weekend"
+    pattern_type: str = "weekday_weekend",
+    series: Optional[SummarySeries] = None
 ) -> Optional[Dict]:
     """
     Analyze eating patterns over time.
 
+    Computed from the user's cached series when given, otherwise in Postgres
+    (pattern_stats RPC in database/summary_stats.sql). weekly_trend always
+    runs in utils/analytics.py over the fetched rows.
+
     Args:
         supabase: Async Supabase client
         user_id: Authenticated user ID
         days: Number of days to analyze (default 30)
         pattern_type: Type of analysis ("weekday_weekend", "weekly_trend", "macro_consistency")
+        series: The user's recent days, covering at least this window
 
     Returns:
         Dictionary with pattern analysis or None if insufficient data
     """
+    if pattern_type not in PATTERN_TYPES:
+        return None  # Unsupported pattern type
+
     start_date = get_date_n_days_ago(days)
 
     try:
-        response = await supabase.table('daily_summary') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .gte('date', start_date) \
-            .execute()
+        if series is not None:
+            stats = PATTERN_STATS[pattern_type](series.since(start_date))
+        else:
+            stats = await _pattern_stats_rpc(supabase, user_id, start_date, pattern_type)
 
-        if not response.data or len(response.data) < 7:
+        if not stats or stats['row_count'] < 7:
             return None  # Need at least 7 days for pattern analysis
 
-        rows = response.data
-
         if pattern_type == "weekday_weekend":
-            # Split into weekdays vs weekends
-            weekdays = []
-            weekends = []
-
-            for row in rows:
-                date_obj = datetime.fromisoformat(row['date'])
-                if date_obj.weekday() < 5:  # Mon-Fri
-                    weekdays.append(row)
-                else:  # Sat-Sun
-                    weekends.append(row)
-
-            if not weekdays or not weekends:
+            if not stats['weekday_count'] or not stats['weekend_count']:
                 return None
+        elif stats['logged_count'] < 3:
+            return None
+        elif pattern_type == "weekly_trend" and len(stats['weeks']) < 2:
+            return None  # Need two full weeks to compare
 
-            return {
-                'pattern_type': 'weekday_weekend',
-                'weekday_count': len(weekdays),
-                'weekend_count': len(weekends),
-                'weekday_avg_calories': sum(r['total_calories'] for r in weekdays) / len(weekdays),
-                'weekend_avg_calories': sum(r['total_calories'] for r in weekends) / len(weekends),
-                'weekday_avg_protein': sum(r['total_protein'] for r in weekdays) / len(weekdays),
-                'weekend_avg_protein': sum(r['total_protein'] for r in weekends) / len(weekends),
-                'weekday_avg_carbs': sum(r['total_carbs'] for r in weekdays) / len(weekdays),
-                'weekend_avg_carbs': sum(r['total_carbs'] for r in weekends) / len(weekends),
-                'weekday_logged': sum(1 for r in weekdays if r['has_logged']) / len(weekdays),
-                'weekend_logged': sum(1 for r in weekends if r['has_logged']) / len(weekends)
-            }
-
-        elif pattern_type == "macro_consistency":
-            # Calculate standard deviation for each macro
-            import statistics
-
-            protein_values = [r['total_protein'] for r in rows if r['has_logged']]
-            carbs_values = [r['total_carbs'] for r in rows if r['has_logged']]
-            fat_values = [r['total_fat'] for r in rows if r['has_logged']]
-
-            if len(protein_values) < 3:
-                return None
-
-            return {
-                'pattern_type': 'macro_consistency',
-                'protein_std': statistics.stdev(protein_values),
-                'carbs_std': statistics.stdev(carbs_values),
-                'fat_std': statistics.stdev(fat_values),
-                'protein_avg': statistics.mean(protein_values),
-                'carbs_avg': statistics.mean(carbs_values),
-                'fat_avg': statistics.mean(fat_values)
-            }
-
-        else:
-            return None  # Unsupported pattern type
+        stats = {key: value for key, value in stats.items() if key not in ('row_count', 'logged_count')}
+        return {'pattern_type': pattern_type, **stats}
 
     except Exception as e:
         logger.error(f"fetch_pattern_summary failed for user {user_id}: {e}")
@@ -332,6 +343,35 @@ async def get_meal_plan(
         return None
 
 
+async def fetch_latest_meal_plan(
+    supabase: AsyncClient,
+    user_id: str
+) -> Optional[Dict]:
+    """
+    Fetch the user's meal plan with the latest week start date.
+
+    Args:
+        supabase: Async Supabase client
+        user_id: Authenticated user ID
+
+    Returns:
+        Meal plan data or None if the user has no plans
+    """
+    try:
+        response = await supabase.table('meal_plans') \
+            .select('*') \
+            .eq('user_id', user_id) \
+            .order('week_start_date', desc=True) \
+            .limit(1) \
+            .execute()
+
+        return response.data[0] if response.data else None
+
+    except Exception as e:
+        logger.error(f"fetch_latest_meal_plan failed for user {user_id}: {e}")
+        return None
+
+
 async def update_meal_plan_day(
     supabase: AsyncClient,
     user_id: str,
@@ -342,6 +382,11 @@ async def update_meal_plan_day(
     """
     Update a single day in an existing meal plan.
 
+    Calls the update_meal_plan_day RPC (database/meal_plan_day_update.sql),
+    which replaces the day in place with jsonb_set instead of reading and
+    rewriting the whole plan. Falls back to read-modify-write while the RPC
+    isn't deployed.
+
     Args:
         supabase: Async Supabase client
         user_id: Authenticated user ID
@@ -353,29 +398,53 @@ async def update_meal_plan_day(
         Updated meal plan record or None on error
     """
     try:
-        # First, fetch the existing plan
-        existing_plan = await get_meal_plan(supabase, user_id, week_start_date)
-
-        if not existing_plan or 'plan_data' not in existing_plan:
-            logger.error(f"No existing meal plan found for user {user_id} on {week_start_date}")
-            return None
+        try:
+            response = await supabase.rpc('update_meal_plan_day', {
+                'p_user_id': user_id,
+                'p_week_start_date': week_start_date,
+                'p_day_index': day_index,
+                'p_day': updated_day_data
+            }).execute()
+        except APIError as e:
+            if e.code != RPC_NOT_FOUND:
+                raise
+            logger.warning("update_meal_plan_day RPC not found (apply database/meal_plan_day_update.sql), rewriting the plan")
+            return await _rewrite_meal_plan_day(supabase, user_id, week_start_date, day_index, updated_day_data)
 
-        # Update the specific day
-        plan_data = existing_plan['plan_data']
-        if 'days' in plan_data and day_index < len(plan_data['days']):
-            plan_data['days'][day_index] = updated_day_data
+        if response.data and len(response.data) > 0:
+            return response.data[0]
 
-            # Save the updated plan
-            return await save_meal_plan(supabase, user_id, week_start_date, plan_data)
-        else:
-            logger.error(f"Invalid day_index {day_index} for meal plan")
-            return None
+        logger.error(f"No meal plan day {day_index} found for user {user_id} on {week_start_date}")
+        return None
 
     except Exception as e:
         logger.error(f"update_meal_plan_day failed for user {user_id}: {e}")
         return None
 
 
+async def _rewrite_meal_plan_day(
+    supabase: AsyncClient,
+    user_id: str,
+    week_start_date: str,
+    day_index: int,
+    updated_day_data: Dict
+) -> Optional[Dict]:
+    """Replace one day by reading the whole plan and saving it back (fallback for update_meal_plan_day)."""
+    existing_plan = await get_meal_plan(supabase, user_id, week_start_date)
+
+    if not existing_plan or 'plan_data' not in existing_plan:
+        logger.error(f"No existing meal plan found for user {user_id} on {week_start_date}")
+        return None
+
+    plan_data = existing_plan['plan_data']
+    if 'days' in plan_data and day_index < len(plan_data['days']):
+        plan_data['days'][day_index] = updated_day_data
+        return await save_meal_plan(supabase, user_id, week_start_date, plan_data)
+
+    logger.error(f"Invalid day_index {day_index} for meal plan")
+    return None
+
+
 async def fetch_frequently_logged_foods(
     supabase: AsyncClient,
     user_id: str,
@@ -433,3 +502,289 @@ async def fetch_frequently_logged_foods(
     except Exception as e:
         logger.error(f"fetch_frequently_logged_foods failed for user {user_id}: {e}")
         return []
+
+
+async def fetch_conversation_messages(
+    supabase: AsyncClient,
+    conversation_id: str
+) -> List[Dict]:
+    """
+    Fetch all stored messages for a coach conversation in order.
+
+    Args:
+        supabase: Async Supabase client
+        conversation_id: Conversation UUID
+
+    Returns:
+        List of rows with 'user_id', 'seq' and serialized 'message'
+        (empty list if the conversation doesn't exist yet)
+    """
+    response = await supabase.table('coach_conversation_messages') \
+        .select('user_id, seq, message') \
+        .eq('conversation_id', conversation_id) \
+        .order('seq') \
+        .execute()
+
+    return response.data or []
+
+
+async def append_conversation_messages(
+    supabase: AsyncClient,
+    conversation_id: str,
+    user_id: str,
+    start_seq: int,
+    messages: List[Dict]
+) -> bool:
+    """
+    Append serialized messages to a coach conversation.
+
+    Only the new messages are written; earlier turns are never re-sent.
+
+    Args:
+        supabase: Async Supabase client
+        conversation_id: Conversation UUID
+        user_id: Authenticated user ID (conversation owner)
+        start_seq: Sequence number of the first message
+        messages: JSON-serializable ModelMessage dicts
+
+    Returns:
+        True if the rows were inserted, False on error
+    """
+    if not messages:
+        return True
+
+    try:
+        await supabase.table('coach_conversation_messages') \
+            .insert([
+                {
+                    'conversation_id': conversation_id,
+                    'user_id': user_id,
+                    'seq': start_seq + offset,
+                    'message': message
+                }
+                for offset, message in enumerate(messages)
+            ]) \
+            .execute()
+        return True
+
+    except Exception as e:
+        logger.error(f"append_conversation_messages failed for conversation {conversation_id}: {e}")
+        return False
+
+
+async def _fetch_all_rows(
+    supabase: AsyncClient,
+    table: str,
+    columns: str,
+    filters: Tuple[Tuple[str, str, object], ...] = (),
+    page_size: int = 1000
+) -> List[Dict]:
+    """
+    Page through a table (PostgREST caps a single response at max-rows).
+
+    filters are (operator, column, value) triples applied server-side,
+    e.g. ('eq', 'review_status', 'approved').
+    """
+    rows: List[Dict] = []
+    while True:
+        query = supabase.table(table).select(columns)
+        for operator, column, value in filters:
+            query = getattr(query, operator)(column, value)
+        response = await query \
+            .order('id') \
+            .range(len(rows), len(rows) + page_size - 1) \
+            .execute()
+
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+async def fetch_food_macro_catalog(
+    supabase: AsyncClient,
+    food_items_synced_since: Optional[str] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch per-100g macros for the food index.
+
+    Args:
+        supabase: Async Supabase client
+        food_items_synced_since: Only fetch food_items synced at or after this
+            last_synced timestamp (None fetches them all)
+
+    Returns:
+        Dict with 'curated_foods' (approved curated foods, including
+        display_name and aliases) and 'food_items' (cached USDA foods,
+        including last_synced) rows
+    """
+    macro_columns = 'calories_per_100g, protein_per_100g, carbs_per_100g, fat_per_100g'
+
+    curated = await _fetch_all_rows(
+        supabase,
+        'curated_foods',
+        f'id, name, display_name, aliases, {macro_columns}',
+        filters=(('eq', 'review_status', 'approved'),)
+    )
+    food_items = await _fetch_all_rows(
+        supabase,
+        'food_items',
+        f'id, name, last_synced, {macro_columns}',
+        filters=(('gte', 'last_synced', food_items_synced_since),) if food_items_synced_since else ()
+    )
+
+    return {'curated_foods': curated, 'food_items': food_items}
+
+
+async def fetch_cached_meal_plan_week(
+    supabase: AsyncClient,
+    cache_key: str,
+    max_age_seconds: float,
+    limit: int = 1
+) -> Optional[List[Dict]]:
+    """
+    Fetch the cached generic weeks of meal plan days for a key.
+
+    Args:
+        supabase: Async Supabase client
+        cache_key: Bucketed targets + preferences key
+        max_age_seconds: Ignore entries older than this
+        limit: Maximum variants returned
+
+    Returns:
+        Rows with variant and days (7 serialized MealPlanDay dicts), newest
+        first, or None if missing, stale or on error
+    """
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+        response = await supabase.table('meal_plan_day_cache') \
+            .select('variant, days') \
+            .eq('cache_key', cache_key) \
+            .gte('created_at', cutoff) \
+            .order('created_at', desc=True) \
+            .limit(limit) \
+            .execute()
+
+        return response.data or None
+
+    except Exception as e:
+        logger.error(f"fetch_cached_meal_plan_week failed for key {cache_key}: {e}")
+        return None
+
+
+async def store_cached_meal_plan_week(
+    supabase: AsyncClient,
+    cache_key: str,
+    variant: str,
+    days: List[Dict]
+) -> bool:
+    """
+    Store (or refresh) a cached generic week of meal plan days.
+
+    Args:
+        supabase: Async Supabase client
+        cache_key: Bucketed targets + preferences key
+        variant: Content hash identifying this week among the key's variants
+        days: Serialized MealPlanDay dicts
+
+    Returns:
+        True if stored, False on error
+    """
+    try:
+        await supabase.table('meal_plan_day_cache') \
+            .upsert({
+                'cache_key': cache_key,
+                'variant': variant,
+                'days': days,
+                'created_at': datetime.now(timezone.utc).isoformat()
+            }, on_conflict='cache_key,variant') \
+            .execute()
+        return True
+
+    except Exception as e:
+        logger.error(f"store_cached_meal_plan_week failed for key {cache_key}: {e}")
+        return False
+
+
+async def upsert_meal_plan_job(
+    supabase: AsyncClient,
+    job: Dict
+) -> bool:
+    """
+    Insert or update a background meal plan job's status.
+
+    Args:
+        supabase: Async Supabase client
+        job: Row with id, user_id, status, week_start_date and optional
+             meal_plan / error
+
+    Returns:
+        True if stored, False on error
+    """
+    try:
+        await supabase.table('meal_plan_jobs') \
+            .upsert({**job, 'updated_at': datetime.utcnow().isoformat()}, on_conflict='id') \
+            .execute()
+        return True
+
+    except Exception as e:
+        logger.error(f"upsert_meal_plan_job failed for job {job.get('id')}: {e}")
+        return False
+
+
+async def fail_stale_meal_plan_jobs(
+    supabase: AsyncClient,
+    updated_before: str,
+    error: str
+) -> int:
+    """
+    Mark background meal plan jobs stuck in queued/running as failed.
+
+    Args:
+        supabase: Async Supabase client
+        updated_before: Only jobs whose status hasn't changed since this ISO timestamp
+        error: Failure reason stored on the jobs
+
+    Returns:
+        Number of jobs marked failed (0 on error)
+    """
+    try:
+        response = await supabase.table('meal_plan_jobs') \
+            .update({'status': 'failed', 'error': error, 'updated_at': datetime.utcnow().isoformat()}) \
+            .in_('status', ['queued', 'running']) \
+            .lt('updated_at', updated_before) \
+            .execute()
+
+        return len(response.data or [])
+
+    except Exception as e:
+        logger.error(f"fail_stale_meal_plan_jobs failed: {e}")
+        return 0
+
+
+async def fetch_meal_plan_job(
+    supabase: AsyncClient,
+    job_id: str
+) -> Optional[Dict]:
+    """
+    Fetch a background meal plan job.
+
+    Args:
+        supabase: Async Supabase client
+        job_id: Job UUID
+
+    Returns:
+        Job row or None if not found or on error
+    """
+    try:
+        response = await supabase.table('meal_plan_jobs') \
+            .select('*') \
+            .eq('id', job_id) \
+            .limit(1) \
+            .execute()
+
+        return response.data[0] if response.data else None
+
+    except Exception as e:
+        logger.error(f"fetch_meal_plan_job failed for job {job_id}: {e}")
+        return None
@@ -0,0 +1,160 @@
+"""
+Per-user cache of recent daily_summary rows, serving every analytics window.
+
+The coach often asks for a weekly summary and then a pattern analysis in the
+same conversation, and each used to run its own daily_summary range query.
+Instead the user's last 90 days (the longest window a tool accepts) are
+loaded once into a SummarySeries, and fetch_weekly_summary /
+fetch_pattern_summary slice their window out of it.
+
+Days before the one that was "today" at the last sync are treated as final:
+a refresh re-fetches only the rows from that day on and appends them.
+daily_summary realtime events (forwarded by today_summary_cache, which owns
+the channel) mark an entry for refresh when they touch those days and drop
+it when they touch an older day. While the channel isn't subscribed,
+entries refresh after a short interval instead, and edits to older days
+show up once the entry expires.
+"""
+
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from agent.settings import settings
+from utils.analytics import SummarySeries
+from utils.date_helpers import get_today_utc
+from utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class _Entry:
+    start_date: str  # Oldest day covered
+    synced_date: str  # Today's date at the last fetch; rows from this day on may still change
+    synced_at: float
+    rows: Dict[str, Dict]  # date -> daily_summary row
+    series: SummarySeries
+    stale: bool = False  # A change event touched synced_date or later
+
+
+def _days_before(day: str, days: int) -> str:
+    return (date.fromisoformat(day) - timedelta(days=days)).isoformat()
+
+
+class SummarySeriesCache:
+    """
+    Each user's recent daily_summary rows, refreshed by appending the newest days.
+
+    Args:
+        maxsize: Maximum users cached
+        days: Days loaded on a miss (longer windows extend the entry)
+        ttl_seconds: Entry lifetime before a full reload
+        refresh_seconds: Interval between append refreshes while the realtime channel isn't subscribed
+        clock: Monotonic time source (overridable for tests)
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        days: int,
+        ttl_seconds: float,
+        refresh_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.days = days
+        self.refresh_seconds = refresh_seconds
+        self.live = False  # True while the realtime channel is subscribed
+        self._clock = clock
+        self._entries: TTLCache[str, _Entry] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds, clock=clock)
+        self._invalidations = 0  # Bumped by every invalidation, to spot events racing a load
+
+    async def get(
+        self,
+        user_id: str,
+        days: int,
+        load: Callable[[str], Awaitable[List[Dict]]]
+    ) -> SummarySeries:
+        """
+        The user's days covering at least the last `days` days, oldest first.
+
+        Args:
+            user_id: Authenticated user ID
+            days: Window the caller will slice (as in get_date_n_days_ago(days))
+            load: Fetches rows since a date (e.g. fetch_summary_rows bound to a client)
+
+        Returns:
+            Series for the cached range (slice it with SummarySeries.since)
+        """
+        today = get_today_utc()
+        oldest = _days_before(today, max(days, self.days))
+        entry: Optional[_Entry] = self._entries.get(user_id)
+
+        if entry is not None and entry.start_date <= _days_before(today, days):
+            needs_refresh = (
+                entry.stale
+                or entry.synced_date != today
+                or (not self.live and self._clock() - entry.synced_at >= self.refresh_seconds)
+            )
+            if not needs_refresh:
+                return entry.series
+            # Append: keep the final days, re-fetch from the last synced day on
+            start_date = entry.synced_date
+            oldest = max(oldest, entry.start_date)
+            rows = {day: row for day, row in entry.rows.items() if oldest <= day < start_date}
+        else:
+            start_date = oldest
+            rows = {}
+
+        invalidations = self._invalidations
+        for row in await load(start_date):
+            rows[row['date']] = row
+
+        series = SummarySeries.from_rows([rows[day] for day in sorted(rows)])
+        # A change event during the load may mean the loaded rows are already stale
+        if invalidations == self._invalidations:
+            self._entries.set(user_id, _Entry(oldest, today, self._clock(), rows, series))
+        else:
+            self._entries.pop(user_id)
+        return series
+
+    def invalidate(self, user_id: str, day: Optional[str] = None) -> None:
+        """
+        Note a change to a user's daily_summary.
+
+        Args:
+            user_id: User whose summary changed
+            day: Changed date; changes on or after the last sync only trigger an append refresh
+        """
+        self._invalidations += 1
+        entry = self._entries.get(user_id)
+        if entry is not None and day is not None and day >= entry.synced_date:
+            self._entries.set(user_id, replace(entry, stale=True))
+        else:
+            self._entries.pop(user_id)
+
+    def clear(self) -> None:
+        self._invalidations += 1
+        self._entries.clear()
+
+    def handle_change(self, payload: Dict[str, Any]) -> None:
+        """Realtime postgres_changes callback for daily_summary."""
+        data = payload.get('data', payload)
+        for row in (data.get('record'), data.get('old_record')):
+            if row and row.get('user_id'):
+                self.invalidate(row['user_id'], row.get('date'))
+
+    def handle_status(self, status: Any, error: Optional[Exception] = None) -> None:
+        """Realtime subscription state callback; entries are only trusted without refreshes while subscribed."""
+        live = getattr(status, 'value', status) == 'SUBSCRIBED'
+        if self.live and not live:
+            # Events may be missed from now on, including edits to older days
+            self.clear()
+        self.live = live
+
+
+# Global cache instance (fed realtime events by today_summary_cache, see main.lifespan)
+summary_series_cache = SummarySeriesCache(
+    maxsize=settings.summary_series_cache_size,
+    days=settings.summary_series_cache_days,
+    ttl_seconds=settings.summary_series_cache_ttl_seconds,
+    refresh_seconds=settings.summary_series_cache_refresh_seconds
+)
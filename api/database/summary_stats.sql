@@ -0,0 +1,84 @@
+-- Pre-aggregated daily_summary statistics
+-- Each function returns one JSON object, so the weekly and pattern tools
+-- transfer a constant-size payload instead of up to 90 daily_summary rows
+-- and do no per-row work in Python
+-- Called from database/queries.py::fetch_weekly_summary / fetch_pattern_summary via supabase.rpc
+
+-- Averages, logging consistency, target hit rates and best/worst protein days
+-- (ties go to the most recent day)
+CREATE OR REPLACE FUNCTION weekly_summary_stats(
+  p_user_id UUID,
+  p_start_date DATE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'days_analyzed', COUNT(*),
+    'avg_calories', AVG(total_calories)::float8,
+    'avg_protein', AVG(total_protein)::float8,
+    'avg_carbs', AVG(total_carbs)::float8,
+    'avg_fat', AVG(total_fat)::float8,
+    'days_logged', COUNT(*) FILTER (WHERE has_logged),
+    'consistency_rate', (COUNT(*) FILTER (WHERE has_logged))::float8 / NULLIF(COUNT(*), 0),
+    'protein_target_hit_rate', (COUNT(*) FILTER (WHERE total_protein >= protein_target))::float8 / NULLIF(COUNT(*), 0),
+    'carbs_target_hit_rate', (COUNT(*) FILTER (WHERE total_carbs <= carbs_target * 1.1))::float8 / NULLIF(COUNT(*), 0),
+    'calories_target_hit_rate', (COUNT(*) FILTER (WHERE ABS(total_calories - calories_target) <= 100))::float8 / NULLIF(COUNT(*), 0),
+    'best_protein_day', (ARRAY_AGG(date ORDER BY total_protein DESC, date DESC))[1],
+    'worst_protein_day', (ARRAY_AGG(date ORDER BY total_protein ASC, date DESC))[1]
+  )
+  FROM daily_summary
+  WHERE user_id = p_user_id
+    AND date >= p_start_date;
+$$;
+
+-- Pattern statistics by kind:
+--   'weekday_weekend'   - Mon-Fri vs Sat-Sun counts, averages and logging rates
+--   'macro_consistency' - sample standard deviations and means over logged days
+-- row_count / logged_count let the caller apply its minimum-data rules;
+-- unknown kinds return NULL
+CREATE OR REPLACE FUNCTION pattern_stats(
+  p_user_id UUID,
+  p_start_date DATE,
+  p_kind TEXT
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH days AS (
+    SELECT *, EXTRACT(ISODOW FROM date) < 6 AS is_weekday
+    FROM daily_summary
+    WHERE user_id = p_user_id
+      AND date >= p_start_date
+  )
+  SELECT CASE p_kind
+    WHEN 'weekday_weekend' THEN jsonb_build_object(
+      'row_count', COUNT(*),
+      'weekday_count', COUNT(*) FILTER (WHERE is_weekday),
+      'weekend_count', COUNT(*) FILTER (WHERE NOT is_weekday),
+      'weekday_avg_calories', (AVG(total_calories) FILTER (WHERE is_weekday))::float8,
+      'weekend_avg_calories', (AVG(total_calories) FILTER (WHERE NOT is_weekday))::float8,
+      'weekday_avg_protein', (AVG(total_protein) FILTER (WHERE is_weekday))::float8,
+      'weekend_avg_protein', (AVG(total_protein) FILTER (WHERE NOT is_weekday))::float8,
+      'weekday_avg_carbs', (AVG(total_carbs) FILTER (WHERE is_weekday))::float8,
+      'weekend_avg_carbs', (AVG(total_carbs) FILTER (WHERE NOT is_weekday))::float8,
+      'weekday_logged', (COUNT(*) FILTER (WHERE is_weekday AND has_logged))::float8
+                        / NULLIF(COUNT(*) FILTER (WHERE is_weekday), 0),
+      'weekend_logged', (COUNT(*) FILTER (WHERE NOT is_weekday AND has_logged))::float8
+                        / NULLIF(COUNT(*) FILTER (WHERE NOT is_weekday), 0)
+    )
+    WHEN 'macro_consistency' THEN jsonb_build_object(
+      'row_count', COUNT(*),
+      'logged_count', COUNT(*) FILTER (WHERE has_logged),
+      'protein_std', (STDDEV_SAMP(total_protein) FILTER (WHERE has_logged))::float8,
+      'carbs_std', (STDDEV_SAMP(total_carbs) FILTER (WHERE has_logged))::float8,
+      'fat_std', (STDDEV_SAMP(total_fat) FILTER (WHERE has_logged))::float8,
+      'protein_avg', (AVG(total_protein) FILTER (WHERE has_logged))::float8,
+      'carbs_avg', (AVG(total_carbs) FILTER (WHERE has_logged))::float8,
+      'fat_avg', (AVG(total_fat) FILTER (WHERE has_logged))::float8
+    )
+  END
+  FROM days;
+$$;
@@ -1,14 +1,30 @@
 """
 Supabase async client for database operations.
+
+A single AsyncClient is shared process-wide. Its sub-clients (PostgREST, auth,
+storage, functions) hold persistent httpx connection pools, so requests reuse keep-alive
+connections instead of paying TCP/TLS setup on every call.
 """
 
+import asyncio
+import logging
+from typing import Optional
 from supabase import acreate_client, AsyncClient
 from agent.settings import settings
 
+logger = logging.getLogger(__name__)
 
-async def get_supabase_client() -> AsyncClient:
+# Process-wide shared client, created lazily or at app startup (see main.lifespan)
+_client: Optional[AsyncClient] = None
+_client_lock = asyncio.Lock()
+
+
+async def create_supabase_client() -> AsyncClient:
     """
-    Create async Supabase client for database operations.
+    Create a new, unshared async Supabase client.
+
+    Prefer get_supabase_client() for request handling; this is only needed
+    when a caller must own the client's lifecycle (e.g. benchmarks).
 
     Returns:
         Configured AsyncClient instance
@@ -17,3 +33,69 @@ async def get_supabase_client() -> AsyncClient:
         settings.supabase_url,
         settings.supabase_service_key
     )
+
+
+async def get_supabase_client() -> AsyncClient:
+    """
+    Get the shared async Supabase client for database operations.
+
+    The client is created on first use and reused for the lifetime of the
+    process, keeping its HTTP connections alive between requests.
+
+    Returns:
+        Shared AsyncClient instance
+    """
+    global _client
+
+    if _client is not None:
+        return _client
+
+    async with _client_lock:
+        if _client is None:
+            _client = await create_supabase_client()
+            logger.info("Created shared Supabase client")
+
+    return _client
+
+
+async def init_supabase_client() -> AsyncClient:
+    """
+    Create the shared client at startup so the first request doesn't pay for it.
+
+    Returns:
+        Shared AsyncClient instance
+    """
+    return await get_supabase_client()
+
+
+async def close_supabase_client() -> None:
+    """
+    Close all of the shared client's connections (called on app shutdown).
+
+    Auth always owns an httpx session and realtime unsubscribes its channels
+    and closes its socket. PostgREST, storage and functions are created on
+    first access, so only the ones that were used are closed (touching their
+    properties here would create fresh clients just to close them).
+    """
+    global _client
+
+    async with _client_lock:
+        client = _client
+        _client = None
+
+    if client is None:
+        return
+
+    closers = [client.auth.close(), client.realtime.remove_all_channels()]
+    if client._postgrest is not None:
+        closers.append(client._postgrest.aclose())
+    if client._storage is not None:
+        closers.append(client._storage.session.aclose())
+    if client._functions is not None:
+        closers.append(client._functions._client.aclose())
+
+    for result in await asyncio.gather(*closers, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to close Supabase client cleanly: {result}")
+
+    logger.info("Closed shared Supabase client")
@@ -0,0 +1,149 @@
+"""
+Per-user cache of today's daily_summary, invalidated by Supabase Realtime.
+
+fetch_today_summary costs up to two PostgREST round trips (daily_summary,
+then macro_goals), and several tools read it in the same turn. Results are
+cached per user and day. Migration 008 publishes daily_summary on
+supabase_realtime, so a change event for a user drops their entry right
+away and entries can live long. While the realtime channel isn't subscribed
+(startup, disconnects), entries fall back to a short TTL so missed events
+can only serve stale data for a few seconds.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from agent.settings import settings
+from utils.date_helpers import get_today_utc
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REALTIME_TOPIC = "today-summary-cache"
+
+_MISSING = object()
+
+
+class TodaySummaryCache:
+    """
+    Today's summary per user, kept until a realtime change event or TTL expiry.
+
+    Args:
+        maxsize: Maximum users cached
+        ttl_seconds: Entry lifetime while the realtime channel is subscribed
+        fallback_ttl_seconds: Entry lifetime while it isn't
+        clock: Monotonic time source (overridable for tests)
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        fallback_ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.fallback_ttl_seconds = fallback_ttl_seconds
+        self.live = False  # True while the realtime channel is subscribed
+        self._clock = clock
+        # user_id -> (date, cached_at, summary)
+        self._entries: TTLCache[str, Tuple[str, float, Optional[Dict]]] = TTLCache(
+            maxsize=maxsize, ttl_seconds=ttl_seconds, clock=clock
+        )
+        self._channel = None
+        self.listeners: List[Any] = []  # Other caches fed the same events (handle_change / handle_status)
+        self._invalidations = 0  # Bumped by every invalidation, to spot events racing a load
+
+    async def get(self, user_id: str, load: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        """
+        Today's summary for a user, loading it on a miss.
+
+        Args:
+            user_id: Authenticated user ID
+            load: Fetches the summary (e.g. fetch_today_summary bound to a client)
+
+        Returns:
+            Copy of the summary, or None if the user has no goals for today
+        """
+        today = get_today_utc()
+        entry = self._entries.get(user_id, _MISSING)
+        if entry is not _MISSING:
+            date, cached_at, summary = entry
+            fresh = self.live or self._clock() - cached_at < self.fallback_ttl_seconds
+            if date == today and fresh:
+                return dict(summary) if summary is not None else None
+
+        invalidations = self._invalidations
+        summary = await load()
+        # A change event during the load may mean the loaded row is already stale
+        if invalidations == self._invalidations:
+            self._entries.set(user_id, (today, self._clock(), summary))
+        return dict(summary) if summary is not None else None
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's cached summary."""
+        self._invalidations += 1
+        self._entries.pop(user_id)
+
+    def clear(self) -> None:
+        self._invalidations += 1
+        self._entries.clear()
+
+    def handle_change(self, payload: Dict[str, Any]) -> None:
+        """Realtime postgres_changes callback for daily_summary: invalidate the row's user."""
+        data = payload.get('data', payload)
+        for row in (data.get('record'), data.get('old_record')):
+            if row and row.get('user_id'):
+                self.invalidate(row['user_id'])
+        for listener in self.listeners:
+            listener.handle_change(payload)
+
+    def handle_status(self, status: Any, error: Optional[Exception] = None) -> None:
+        """Realtime subscription state callback; long TTLs are only trusted while subscribed."""
+        live = getattr(status, 'value', status) == 'SUBSCRIBED'
+        if self.live and not live:
+            # Events may be missed from now on; don't keep serving entries cached before
+            self.clear()
+        self.live = live
+        for listener in self.listeners:
+            listener.handle_status(status, error)
+        if error is not None:
+            logger.warning(f"daily_summary realtime channel {status}: {error}")
+        else:
+            logger.info(f"daily_summary realtime channel {status}")
+
+    async def start_realtime(self, supabase) -> None:
+        """
+        Subscribe to daily_summary changes (the realtime client reconnects on its own).
+
+        Failures are logged and leave the cache on the fallback TTL.
+
+        Args:
+            supabase: Async Supabase client
+        """
+        try:
+            channel = supabase.channel(REALTIME_TOPIC)
+            channel.on_postgres_changes("*", callback=self.handle_change, table="daily_summary", schema="public")
+            self._channel = channel
+            await channel.subscribe(self.handle_status)
+        except Exception as e:
+            logger.error(f"Failed to subscribe to daily_summary changes, using the fallback TTL: {e}")
+
+    async def stop_realtime(self, supabase) -> None:
+        """Unsubscribe from daily_summary changes."""
+        channel, self._channel = self._channel, None
+        self.live = False
+        for listener in self.listeners:
+            listener.live = False
+        if channel is not None:
+            try:
+                await supabase.remove_channel(channel)
+            except Exception as e:
+                logger.warning(f"Failed to remove daily_summary realtime channel: {e}")
+
+
+# Global cache instance (realtime subscription started in main.lifespan)
+today_summary_cache = TodaySummaryCache(
+    maxsize=settings.today_summary_cache_size,
+    ttl_seconds=settings.today_summary_cache_ttl_seconds,
+    fallback_ttl_seconds=settings.today_summary_cache_fallback_ttl_seconds
+)
@@ -1,8 +1,89 @@
 """Authentication dependencies for FastAPI endpoints."""
 
+import asyncio
+import logging
+from typing import Optional
+import jwt
+from jwt import PyJWKClient
 from fastapi import Header, HTTPException
 from database.supabase import get_supabase_client
 from supabase import AsyncClient
+from agent.settings import settings
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Supabase issues user access tokens with this audience
+SUPABASE_JWT_AUDIENCE = "authenticated"
+
+# Asymmetric signing algorithms served from the project's JWKS endpoint
+JWKS_ALGORITHMS = ["RS256", "ES256"]
+
+# auth_id -> users.id mapping; the TTL bounds how long a deleted/remapped
+# profile keeps resolving after revocation
+_user_id_cache: TTLCache[str, str] = TTLCache(
+    maxsize=settings.auth_user_cache_size,
+    ttl_seconds=settings.auth_user_cache_ttl_seconds
+)
+
+_jwks_client = PyJWKClient(
+    f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+    cache_jwk_set=True,
+    lifespan=settings.auth_jwks_cache_seconds
+)
+
+
+async def verify_token_locally(token: str) -> Optional[str]:
+    """
+    Verify a Supabase JWT's signature and expiry without a network round trip.
+
+    HS256 tokens are checked against SUPABASE_JWT_SECRET; RS256/ES256 tokens
+    against the project's JWKS (fetched once, then cached).
+
+    Args:
+        token: Raw JWT access token
+
+    Returns:
+        auth_id (the token's `sub` claim), or None if local verification is
+        unavailable for this token (caller should fall back to Supabase auth)
+
+    Raises:
+        HTTPException 401: Token is malformed, expired, or has a bad signature
+    """
+    try:
+        algorithm = jwt.get_unverified_header(token).get("alg")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if algorithm == "HS256":
+        if not settings.supabase_jwt_secret:
+            return None
+        key = settings.supabase_jwt_secret
+    elif algorithm in JWKS_ALGORITHMS:
+        try:
+            # PyJWKClient is synchronous; it only hits the network when the cached key set expires
+            signing_key = await asyncio.to_thread(_jwks_client.get_signing_key_from_jwt, token)
+        except jwt.PyJWKClientConnectionError as e:
+            logger.warning(f"JWKS fetch failed, falling back to Supabase auth: {e}")
+            return None
+        except jwt.PyJWKClientError:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        key = signing_key.key
+    else:
+        return None
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    return claims["sub"]
 
 
 async def get_current_user_id(
@@ -12,11 +93,15 @@ async def get_current_user_id(
     Extract and validate user_id from Supabase JWT token.
 
     This dependency:
-    1. Validates JWT token with Supabase auth
+    1. Validates JWT signature and expiry locally (falls back to Supabase auth
+       when no secret/JWKS key applies)
     2. Extracts auth_id from token
-    3. Looks up internal user_id from users table
+    3. Looks up internal user_id from users table (cached with a TTL)
     4. Returns validated user_id for use in agent
 
+    A warm request (locally verifiable token, cached auth_id) makes no network
+    round trips.
+
     Args:
         authorization: Authorization header in format "Bearer {token}"
 
@@ -37,20 +122,32 @@ async def get_current_user_id(
     # Extract JWT token
     token = authorization.replace("Bearer ", "")
 
-    # Get Supabase client with service key (required for auth validation)
-    supabase: AsyncClient = await get_supabase_client()
-
     try:
-        # Validate JWT with Supabase and get user info
-        user_response = await supabase.auth.get_user(token)
+        auth_id = await verify_token_locally(token)
 
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid or expired token"
-            )
+        if auth_id is not None:
+            cached_user_id = _user_id_cache.get(auth_id)
+            if cached_user_id is not None:
+                return cached_user_id
+
+        # Get shared Supabase client with service key (required for auth validation)
+        supabase: AsyncClient = await get_supabase_client()
+
+        if auth_id is None:
+            # Validate JWT with Supabase and get user info
+            user_response = await supabase.auth.get_user(token)
+
+            if not user_response or not user_response.user:
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid or expired token"
+                )
+
+            auth_id = user_response.user.id
 
-        auth_id = user_response.user.id
+            cached_user_id = _user_id_cache.get(auth_id)
+            if cached_user_id is not None:
+                return cached_user_id
 
         # Look up internal user_id from users table using auth_id
         user_data = await supabase.from_("users") \
@@ -65,7 +162,9 @@ async def get_current_user_id(
                 detail="User profile not found. Please contact support."
             )
 
-        return user_data.data["id"]
+        user_id = user_data.data["id"]
+        _user_id_cache.set(auth_id, user_id)
+        return user_id
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -4,15 +4,38 @@ FastAPI main application for AI Nutrition Coach.
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
+from uuid import UUID, uuid4
+from contextlib import asynccontextmanager
+import asyncio
+import contextlib
+import json
 import logging
 from agent.coach_agent import nutrition_coach
 from agent.dependencies import CoachAgentDependencies
+from agent.history_compactor import history_compactor, CompactionResult
+from agent.meal_plan_progress import meal_plan_progress, GenerationNotFoundError
+from agent.meal_plan_jobs import meal_plan_jobs, TERMINAL_STATUSES
+from agent.output_validation import output_metrics
 from agent.settings import load_settings
-from database.supabase import get_supabase_client
+from database.supabase import get_supabase_client, init_supabase_client, close_supabase_client
+from database.conversation_store import conversation_store, ConversationNotFoundError
+from database.food_index import food_index
+from database.today_summary_cache import today_summary_cache
+from database.summary_series_cache import summary_series_cache
 from dependencies.auth import get_current_user_id
-from pydantic_ai.messages import ModelMessagesTypeAdapter
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    PartStartEvent,
+    PartDeltaEvent,
+    TextPart,
+    TextPartDelta,
+    FunctionToolCallEvent,
+    FunctionToolResultEvent
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +44,53 @@ logger = logging.getLogger(__name__)
 # Load settings
 settings = load_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for shared resources."""
+    # Startup - open the shared Supabase client so requests reuse its connections
+    try:
+        supabase = await init_supabase_client()
+    except Exception as e:
+        # Don't block startup; get_supabase_client() will retry lazily
+        supabase = None
+        logger.error(f"Failed to initialize Supabase client: {e}")
+
+    # daily_summary change events invalidate cached today summaries and analytics series
+    # (short TTL / refresh interval without them); subscribed in the background so a
+    # slow websocket doesn't hold up startup
+    if summary_series_cache not in today_summary_cache.listeners:
+        today_summary_cache.listeners.append(summary_series_cache)
+    realtime_task = asyncio.create_task(today_summary_cache.start_realtime(supabase)) if supabase else None
+
+    # Load the food macro index and keep it fresh for meal plan generation
+    food_index_task = asyncio.create_task(food_index.run_refresh_loop())
+
+    # Background meal plan workers; first fail jobs a crashed process left queued/running
+    if supabase:
+        await meal_plan_jobs.fail_stale_jobs(settings.meal_plan_job_stale_seconds)
+    meal_plan_jobs.start()
+
+    yield
+
+    # Shutdown
+    await meal_plan_jobs.stop()
+    food_index_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await food_index_task
+    if realtime_task is not None:
+        realtime_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await realtime_task
+        await today_summary_cache.stop_realtime(supabase)
+    await close_supabase_client()
+
+
 app = FastAPI(
     title="Nutrition Coach AI",
     description="AI-powered nutrition coaching backend for macro tracker",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Build allowed origins based on environment
@@ -41,7 +107,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,  # No wildcards, explicit domains only
     allow_credentials=True,
-    allow_methods=["POST"],  # Only POST needed for /api/chat
+    allow_methods=["GET", "POST"],  # POST for chat, GET for meal plan progress streams
     allow_headers=["Content-Type", "Authorization"],  # Include Authorization
     max_age=3600,  # Cache preflight requests for 1 hour
 )
@@ -52,19 +118,292 @@ class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=1000)
     conversation_history: Optional[List[Dict[str, Any]]] = Field(
         default=[],
-        description="Previous messages in conversation"
+        description="Previous messages in conversation (ignored when conversation_id is set)"
+    )
+    conversation_id: Optional[UUID] = Field(
+        default=None,
+        description="Server-side conversation ID. When set, history is kept on the server and "
+                    "only the new message needs to be sent. Unknown IDs start a new conversation."
+    )
+    meal_plan_generation_id: Optional[UUID] = Field(
+        default=None,
+        description="Progress channel for a meal plan generated in this turn "
+                    "(see /api/meal-plan-progress). Generated by the server when omitted."
     )
 
 
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
     response: str
-    conversation_history: List[Dict[str, Any]]
+    conversation_history: List[Dict[str, Any]] = Field(
+        ...,
+        description="Full history, or only this turn's messages when conversation_id is set"
+    )
     usage: Dict[str, Any]
+    conversation_id: Optional[str] = Field(
+        default=None,
+        description="Server-side conversation ID (echoed back in conversation_id mode)"
+    )
     meal_plan: Optional[Dict[str, Any]] = Field(
         default=None,
         description="Optional generated meal plan data"
     )
+    meal_plan_generation_id: Optional[str] = Field(
+        default=None,
+        description="Progress channel id for a meal plan generated in this turn"
+    )
+    meal_plan_job_id: Optional[str] = Field(
+        default=None,
+        description="Background meal plan job queued in this turn (see /api/meal-plan-jobs)"
+    )
+
+
+class MealPlanJobResponse(BaseModel):
+    """Status of a background meal plan job."""
+    job_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    week_start: str
+    meal_plan: Optional[Dict[str, Any]] = Field(default=None, description="Saved plan once succeeded")
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+def _parse_conversation_history(
+    conversation_history: Optional[List[Dict[str, Any]]]
+) -> Optional[List[ModelMessage]]:
+    """
+    Deserialize client-supplied conversation history into pydantic-ai messages.
+
+    Args:
+        conversation_history: Raw history as sent by the frontend
+
+    Returns:
+        Parsed message history, or None if empty or unparseable
+    """
+    if not conversation_history:
+        return None
+
+    try:
+        # First, filter the incoming history to remove any tool blocks
+        # This prevents validation errors from malformed tool_use/tool_result pairs
+        filtered_input = []
+        for msg in conversation_history:
+            if msg.get('role') in ['user', 'assistant']:
+                # Simplify message to just role and text content
+                content = msg.get('content', '')
+
+                # Handle different content formats
+                if isinstance(content, list):
+                    # Extract text from content blocks, skip tool blocks
+                    text_blocks = [
+                        block.get('text', '') if isinstance(block, dict) and block.get('type') == 'text'
+                        else str(block) if not isinstance(block, dict)
+                        else ''
+                        for block in content
+                    ]
+                    content = ' '.join(filter(None, text_blocks))
+
+                if content:  # Only add if there's actual content
+                    filtered_input.append({
+                        'role': msg['role'],
+                        'content': content
+                    })
+
+        logger.debug(f"Filtered input history: {len(conversation_history)} -> {len(filtered_input)} messages")
+
+        # Now validate the filtered history
+        if not filtered_input:
+            return None
+
+        message_history = ModelMessagesTypeAdapter.validate_python(filtered_input)
+        logger.debug(f"Parsed conversation history with {len(message_history)} messages")
+        return message_history
+
+    except Exception as e:
+        logger.error(f"Failed to parse conversation history: {e}", exc_info=True)
+        # Continue without history rather than failing the request
+        return None
+
+
+def _serialize_conversation_history(messages: List[ModelMessage]) -> List[Dict[str, Any]]:
+    """
+    Serialize agent messages for the frontend, keeping only user/assistant text.
+
+    Args:
+        messages: Messages from an agent run (e.g. result.all_messages())
+
+    Returns:
+        Simplified list of {'role', 'content'} dicts
+    """
+    # ModelMessagesTypeAdapter is already an instance, use it directly
+    all_messages = ModelMessagesTypeAdapter.dump_python(messages)
+
+    # Filter to only user and assistant text messages (exclude tool_use/tool_result blocks)
+    # This prevents serialization issues when sending history back to frontend
+    filtered_history = []
+    for msg in all_messages:
+        logger.debug(f"Processing message with role: {msg.get('role')}, content type: {type(msg.get('content'))}")
+
+        if msg.get('role') in ['user', 'assistant']:
+            # For assistant messages, only keep text content, strip tool blocks
+            if msg.get('role') == 'assistant':
+                content = msg.get('content', [])
+                if isinstance(content, str):
+                    # Content is already a string, wrap it
+                    filtered_history.append({
+                        'role': 'assistant',
+                        'content': content
+                    })
+                elif isinstance(content, list):
+                    # Filter content to only text blocks
+                    text_content = [
+                        block for block in content
+                        if isinstance(block, dict) and block.get('type') == 'text'
+                    ]
+                    if text_content:
+                        # Extract just the text from text blocks
+                        text_only = ' '.join([
+                            block.get('text', '') for block in text_content
+                        ])
+                        filtered_history.append({
+                            'role': 'assistant',
+                            'content': text_only
+                        })
+            else:
+                # User messages - convert content to simple string
+                content = msg.get('content', '')
+                if isinstance(content, list):
+                    # Extract text from content blocks
+                    text = ' '.join([
+                        block.get('text', block) if isinstance(block, dict) else str(block)
+                        for block in content
+                    ])
+                    filtered_history.append({
+                        'role': 'user',
+                        'content': text
+                    })
+                else:
+                    filtered_history.append({
+                        'role': 'user',
+                        'content': str(content)
+                    })
+
+    logger.debug(f"Filtered conversation history: {len(all_messages)} -> {len(filtered_history)} messages")
+    logger.debug(f"Sample filtered message: {filtered_history[0] if filtered_history else 'none'}")
+
+    return filtered_history
+
+
+async def _load_message_history(
+    request: ChatRequest,
+    supabase,
+    user_id: str
+) -> Optional[List[ModelMessage]]:
+    """
+    Resolve the message history for a chat turn.
+
+    Uses the server-side conversation store when conversation_id is set,
+    otherwise parses the client-supplied history.
+
+    Raises:
+        HTTPException 404: Conversation belongs to another user
+    """
+    if request.conversation_id is None:
+        return _parse_conversation_history(request.conversation_history)
+
+    try:
+        history = await conversation_store.load(supabase, str(request.conversation_id), user_id)
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    return history or None
+
+
+async def _compact_history(
+    request: ChatRequest,
+    user_id: str,
+    message_history: Optional[List[ModelMessage]]
+) -> CompactionResult:
+    """Fold older turns into a rolling summary when history exceeds the token budget."""
+    conversation_id = str(request.conversation_id) if request.conversation_id else None
+    key = history_compactor.conversation_key(user_id, message_history or [], conversation_id)
+    return await history_compactor.compact(message_history, key)
+
+
+async def _finish_turn(
+    request: ChatRequest,
+    supabase,
+    user_id: str,
+    message_history: Optional[List[ModelMessage]],
+    result
+) -> List[Dict[str, Any]]:
+    """
+    Record a completed agent run and build the history returned to the client.
+
+    In conversation_id mode only this turn's new messages are stored and
+    returned, so request/response size stays constant as the chat grows.
+    The full (uncompacted) history is used either way; compaction only
+    affects what is sent to the model.
+    """
+    if request.conversation_id is None:
+        return _serialize_conversation_history((message_history or []) + result.new_messages())
+
+    new_messages = result.new_messages()
+    await conversation_store.append(supabase, str(request.conversation_id), user_id, new_messages)
+    return _serialize_conversation_history(new_messages)
+
+
+# Chat turns still running after their client went away; held so they aren't garbage collected
+_detached_turns: Set[asyncio.Task] = set()
+
+
+def _run_detached(coro) -> asyncio.Task:
+    """
+    Run a chat turn in its own task so it finishes, and is recorded by
+    _finish_turn, even if the client disconnects and the request is cancelled.
+    """
+    task = asyncio.create_task(coro)
+    _detached_turns.add(task)
+    task.add_done_callback(_detached_turns.discard)
+    return task
+
+
+def _usage_to_dict(usage_data, history_tokens_saved: int = 0) -> Dict[str, Any]:
+    """Convert pydantic-ai usage stats into the response usage block."""
+    return {
+        'input_tokens': usage_data.input_tokens if usage_data else 0,
+        'output_tokens': usage_data.output_tokens if usage_data else 0,
+        'total_tokens': usage_data.total_tokens if usage_data else 0,
+        'history_tokens_saved': history_tokens_saved  # Estimated prompt tokens removed by compaction
+    }
+
+
+def _meal_plan_generation_id(request: ChatRequest, user_id: str) -> str:
+    """
+    Resolve and claim this turn's meal plan progress channel.
+
+    Raises:
+        HTTPException: 404 if the client-supplied id belongs to another user
+    """
+    generation_id = str(request.meal_plan_generation_id or uuid4())
+    try:
+        meal_plan_progress.claim(generation_id, user_id)
+    except GenerationNotFoundError:
+        raise HTTPException(status_code=404, detail="Meal plan generation not found")
+    return generation_id
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"  # Disable proxy buffering so frames flush immediately
+}
+
+
+def _sse_event(payload: Dict[str, Any]) -> str:
+    """Format a payload as a Server-Sent Events data frame."""
+    return f"data: {json.dumps(payload)}\n\n"
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -77,149 +416,273 @@ async def chat(
 
     Args:
         request: Chat request with message and optional conversation history
+                 (or a conversation_id for server-side history)
         user_id: Validated user ID extracted from JWT token (via dependency)
 
     Returns:
         Chat response with agent reply, updated conversation history, and usage stats
     """
     try:
-        # Create Supabase client
+        # Shared Supabase client (persistent connections across requests)
         supabase = await get_supabase_client()
 
         # Create agent dependencies with VALIDATED user_id from JWT
         deps = CoachAgentDependencies(
             supabase=supabase,
-            user_id=user_id  # Guaranteed valid - came from JWT
+            user_id=user_id,  # Guaranteed valid - came from JWT
+            meal_plan_generation_id=_meal_plan_generation_id(request, user_id)
         )
 
-        # Deserialize conversation history if provided
-        message_history = None
-        if request.conversation_history:
-            try:
-                # First, filter the incoming history to remove any tool blocks
-                # This prevents validation errors from malformed tool_use/tool_result pairs
-                filtered_input = []
-                for msg in request.conversation_history:
-                    if msg.get('role') in ['user', 'assistant']:
-                        # Simplify message to just role and text content
-                        content = msg.get('content', '')
-
-                        # Handle different content formats
-                        if isinstance(content, list):
-                            # Extract text from content blocks, skip tool blocks
-                            text_blocks = [
-                                block.get('text', '') if isinstance(block, dict) and block.get('type') == 'text'
-                                else str(block) if not isinstance(block, dict)
-                                else ''
-                                for block in content
-                            ]
-                            content = ' '.join(filter(None, text_blocks))
-
-                        if content:  # Only add if there's actual content
-                            filtered_input.append({
-                                'role': msg['role'],
-                                'content': content
-                            })
-
-                logger.debug(f"Filtered input history: {len(request.conversation_history)} -> {len(filtered_input)} messages")
-
-                # Now validate the filtered history
-                if filtered_input:
-                    message_history = ModelMessagesTypeAdapter.validate_python(filtered_input)
-                    logger.debug(f"Parsed conversation history with {len(message_history)} messages")
-                else:
-                    message_history = None
-            except Exception as e:
-                logger.error(f"Failed to parse conversation history: {e}", exc_info=True)
-                # Continue without history rather than failing the request
-                message_history = None
-
-        # Run agent with conversation history
-        result = await nutrition_coach.run(
-            request.message,
-            message_history=message_history,
-            deps=deps
+        # Load server-side history or deserialize the client-supplied one
+        message_history = await _load_message_history(request, supabase, user_id)
+        compaction = await _compact_history(request, user_id, message_history)
+
+        async def run_turn():
+            # Run agent with (compacted) conversation history
+            result = await nutrition_coach.run(
+                request.message,
+                message_history=compaction.messages or None,
+                deps=deps
+            )
+            return result, await _finish_turn(request, supabase, user_id, message_history, result)
+
+        # Shielded so a disconnecting client doesn't cancel the turn before it is stored
+        result, conversation_history = await asyncio.shield(_run_detached(run_turn()))
+
+        return ChatResponse(
+            response=result.output,
+            conversation_history=conversation_history,
+            usage=_usage_to_dict(result.usage(), compaction.tokens_saved),
+            conversation_id=str(request.conversation_id) if request.conversation_id else None,
+            meal_plan=deps.generated_meal_plan,  # Include meal plan if generated by agent
+            meal_plan_generation_id=deps.meal_plan_generation_id,
+            meal_plan_job_id=deps.meal_plan_job_id
         )
 
-        # Serialize updated conversation history, filtering out tool internals
-        # ModelMessagesTypeAdapter is already an instance, use it directly
-        all_messages = ModelMessagesTypeAdapter.dump_python(result.all_messages())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chat endpoint error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to process chat request"
+        )
 
-        # Filter to only user and assistant text messages (exclude tool_use/tool_result blocks)
-        # This prevents serialization issues when sending history back to frontend
-        filtered_history = []
-        for msg in all_messages:
-            logger.debug(f"Processing message with role: {msg.get('role')}, content type: {type(msg.get('content'))}")
 
-            if msg.get('role') in ['user', 'assistant']:
-                # For assistant messages, only keep text content, strip tool blocks
-                if msg.get('role') == 'assistant':
-                    content = msg.get('content', [])
-                    if isinstance(content, str):
-                        # Content is already a string, wrap it
-                        filtered_history.append({
-                            'role': 'assistant',
-                            'content': content
-                        })
-                    elif isinstance(content, list):
-                        # Filter content to only text blocks
-                        text_content = [
-                            block for block in content
-                            if isinstance(block, dict) and block.get('type') == 'text'
-                        ]
-                        if text_content:
-                            # Extract just the text from text blocks
-                            text_only = ' '.join([
-                                block.get('text', '') for block in text_content
-                            ])
-                            filtered_history.append({
-                                'role': 'assistant',
-                                'content': text_only
-                            })
-                else:
-                    # User messages - convert content to simple string
-                    content = msg.get('content', '')
-                    if isinstance(content, list):
-                        # Extract text from content blocks
-                        text = ' '.join([
-                            block.get('text', block) if isinstance(block, dict) else str(block)
-                            for block in content
-                        ])
-                        filtered_history.append({
-                            'role': 'user',
-                            'content': text
-                        })
-                    else:
-                        filtered_history.append({
-                            'role': 'user',
-                            'content': str(content)
-                        })
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Streaming variant of /api/chat using Server-Sent Events.
+
+    Drives the agent with nutrition_coach.iter() so the client receives text as
+    soon as the model produces it instead of waiting for the whole run
+    (including tool calls and meal plan generation) to finish. The run happens
+    in a detached task, so a turn whose client disconnects mid-stream still
+    finishes and is stored in conversation_id mode.
+
+    Event types (each sent as a `data: {json}` frame):
+        - text: {'type': 'text', 'content': str} - incremental assistant text
+        - tool_start: {'type': 'tool_start', 'tool_name': str, 'tool_call_id': str}
+          (generate_meal_plan also carries 'generation_id' for /api/meal-plan-progress)
+        - tool_end: {'type': 'tool_end', 'tool_name': str, 'tool_call_id': str}
+        - done: final payload with the same fields as ChatResponse
+        - error: {'type': 'error', 'content': str}
 
-        logger.debug(f"Filtered conversation history: {len(all_messages)} -> {len(filtered_history)} messages")
-        logger.debug(f"Sample filtered message: {filtered_history[0] if filtered_history else 'none'}")
+    Args:
+        request: Chat request with message and optional conversation history
+        user_id: Validated user ID extracted from JWT token (via dependency)
 
-        # Get usage stats
-        usage_data = result.usage()
-        usage = {
-            'input_tokens': usage_data.input_tokens if usage_data else 0,
-            'output_tokens': usage_data.output_tokens if usage_data else 0,
-            'total_tokens': usage_data.total_tokens if usage_data else 0
-        }
+    Returns:
+        StreamingResponse emitting text/event-stream frames
+    """
+    try:
+        supabase = await get_supabase_client()
 
-        return ChatResponse(
-            response=result.output,
-            conversation_history=filtered_history,
-            usage=usage,
-            meal_plan=deps.generated_meal_plan  # Include meal plan if generated by agent
+        deps = CoachAgentDependencies(
+            supabase=supabase,
+            user_id=user_id,
+            meal_plan_generation_id=_meal_plan_generation_id(request, user_id)
         )
 
+        message_history = await _load_message_history(request, supabase, user_id)
+        compaction = await _compact_history(request, user_id, message_history)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Chat endpoint error: {e}", exc_info=True)
+        logger.error(f"Chat stream setup error: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Failed to process chat request"
         )
 
+    async def run_turn(events: asyncio.Queue):
+        """Drive the agent with iter(), queueing SSE frames and recording the finished turn."""
+        try:
+            async with nutrition_coach.iter(
+                request.message,
+                message_history=compaction.messages or None,
+                deps=deps
+            ) as run:
+                async for node in run:
+                    if nutrition_coach.is_model_request_node(node):
+                        # Stream tokens from the model as they arrive
+                        async with node.stream(run.ctx) as request_stream:
+                            async for event in request_stream:
+                                if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+                                    if event.part.content:
+                                        events.put_nowait(_sse_event({'type': 'text', 'content': event.part.content}))
+                                elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+                                    if event.delta.content_delta:
+                                        events.put_nowait(_sse_event({'type': 'text', 'content': event.delta.content_delta}))
+
+                    elif nutrition_coach.is_call_tools_node(node):
+                        # Surface tool activity so the UI can show progress
+                        async with node.stream(run.ctx) as tool_stream:
+                            async for event in tool_stream:
+                                if isinstance(event, FunctionToolCallEvent):
+                                    payload = {
+                                        'type': 'tool_start',
+                                        'tool_name': event.part.tool_name,
+                                        'tool_call_id': event.tool_call_id
+                                    }
+                                    if event.part.tool_name == 'generate_meal_plan':
+                                        # Client can open /api/meal-plan-progress now to receive days early
+                                        payload['generation_id'] = deps.meal_plan_generation_id
+                                    events.put_nowait(_sse_event(payload))
+                                elif isinstance(event, FunctionToolResultEvent):
+                                    events.put_nowait(_sse_event({
+                                        'type': 'tool_end',
+                                        'tool_name': event.result.tool_name,
+                                        'tool_call_id': event.tool_call_id
+                                    }))
+
+            result = run.result
+
+            events.put_nowait(_sse_event({
+                'type': 'done',
+                'response': result.output,
+                'conversation_history': await _finish_turn(request, supabase, user_id, message_history, result),
+                'usage': _usage_to_dict(result.usage(), compaction.tokens_saved),
+                'conversation_id': str(request.conversation_id) if request.conversation_id else None,
+                'meal_plan': deps.generated_meal_plan,
+                'meal_plan_generation_id': deps.meal_plan_generation_id,
+                'meal_plan_job_id': deps.meal_plan_job_id
+            }))
+
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}", exc_info=True)
+            events.put_nowait(_sse_event({
+                'type': 'error',
+                'content': 'Failed to process chat request'
+            }))
+        finally:
+            events.put_nowait(None)
+
+    async def generate_stream():
+        """Relay the turn's SSE frames; the turn keeps running if the client goes away."""
+        events: asyncio.Queue = asyncio.Queue()
+        _run_detached(run_turn(events))
+        while (frame := await events.get()) is not None:
+            yield frame
+
+    return StreamingResponse(generate_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/api/meal-plan-progress/{generation_id}")
+async def meal_plan_progress_stream(
+    generation_id: UUID,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Stream meal plan generation progress using Server-Sent Events.
+
+    Can be opened before or during generation; events already sent are
+    replayed. The stream ends after 'complete' or 'error'.
+
+    Event types (each sent as a `data: {json}` frame):
+        - day: {'type': 'day', 'day': MealPlanDay} - a validated day, as soon as it is ready
+        - complete: {'type': 'complete', 'meal_plan': MealPlan} - the saved plan
+        - error: {'type': 'error', 'content': str}
+
+    Args:
+        generation_id: meal_plan_generation_id from the chat request/response
+        user_id: Validated user ID extracted from JWT token (via dependency)
+
+    Returns:
+        StreamingResponse emitting text/event-stream frames
+    """
+    try:
+        meal_plan_progress.claim(str(generation_id), user_id)
+    except GenerationNotFoundError:
+        raise HTTPException(status_code=404, detail="Meal plan generation not found")
+
+    async def generate_stream():
+        async for event in meal_plan_progress.subscribe(str(generation_id), user_id):
+            yield _sse_event(event)
+
+    return StreamingResponse(generate_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _get_meal_plan_job(job_id: UUID, user_id: str) -> Dict[str, Any]:
+    """Fetch a job's status for its owner or raise 404."""
+    job = await meal_plan_jobs.get(str(job_id), user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Meal plan job not found")
+    return job
+
+
+@app.get("/api/meal-plan-jobs/{job_id}", response_model=MealPlanJobResponse)
+async def get_meal_plan_job(
+    job_id: UUID,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Poll a background meal plan job.
+
+    Args:
+        job_id: meal_plan_job_id from the chat response
+        user_id: Validated user ID extracted from JWT token (via dependency)
+
+    Returns:
+        Job status, including the saved meal plan once it succeeded
+    """
+    return await _get_meal_plan_job(job_id, user_id)
+
+
+@app.get("/api/meal-plan-jobs/{job_id}/events")
+async def meal_plan_job_events(
+    job_id: UUID,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Subscribe to a background meal plan job using Server-Sent Events.
+
+    Starts with a 'status' snapshot, then streams the job's progress events
+    (status changes, day, complete, error) until it finishes. Finished jobs
+    only send the snapshot.
+
+    Args:
+        job_id: meal_plan_job_id from the chat response
+        user_id: Validated user ID extracted from JWT token (via dependency)
+
+    Returns:
+        StreamingResponse emitting text/event-stream frames
+    """
+    job = await _get_meal_plan_job(job_id, user_id)
+
+    async def generate_stream():
+        yield _sse_event({'type': 'status', **job})
+        if job['status'] in TERMINAL_STATUSES or str(job_id) not in meal_plan_jobs:
+            return
+        async for event in meal_plan_progress.subscribe(str(job_id), user_id):
+            yield _sse_event(event)
+
+    return StreamingResponse(generate_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 
 @app.get("/health")
 async def health():
@@ -227,6 +690,17 @@ async def health():
     return {"status": "healthy", "service": "nutrition-coach-ai"}
 
 
+@app.get("/api/metrics/meal-plan-output")
+async def meal_plan_output_metrics():
+    """
+    Meal plan output validation counts since startup.
+
+    Per generator: outputs validated, totals repaired locally, and model
+    retries requested for structural problems, with repair and retry rates.
+    """
+    return output_metrics.snapshot()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API info."""
@@ -235,6 +709,7 @@ async def root():
         "version": "1.0.1-FIXED",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "health": "/health"
         },
         "status": "CODE UPDATED - Cache cleared"
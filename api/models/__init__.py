@@ -10,6 +10,9 @@ from .meal_plan import (
     Meal,
     MealPlanDay,
     DayChunk,
+    MealOutline,
+    DayOutline,
+    WeekOutline,
     MealPlan
 )
 
@@ -21,5 +24,8 @@ __all__ = [
     'Meal',
     'MealPlanDay',
     'DayChunk',
+    'MealOutline',
+    'DayOutline',
+    'WeekOutline',
     'MealPlan'
 ]
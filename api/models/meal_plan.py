@@ -9,6 +9,9 @@ from pydantic import BaseModel, Field
 from typing import List
 from enum import Enum
 
+# Macro fields shared by Food, Meal totals and MacroTotals
+MACROS = ('calories', 'protein', 'carbs', 'fat')
+
 
 class MealType(str, Enum):
     """Allowed meal types."""
@@ -70,6 +73,14 @@ class MacroTotals(BaseModel):
     carbs: float = Field(..., ge=0, description="Total carbs in grams")
     fat: float = Field(..., ge=0, description="Total fat in grams")
 
+    @classmethod
+    def sum_of(cls, items: List) -> "MacroTotals":
+        """Sum the macros of foods or totals, rounded to one decimal."""
+        return cls(**{
+            macro: round(sum(getattr(item, macro) for item in items), 1)
+            for macro in MACROS
+        })
+
 
 class Meal(BaseModel):
     """Single meal with foods and calculated totals."""
@@ -132,6 +143,43 @@ class DayChunk(BaseModel):
     )
 
 
+class MealOutline(BaseModel):
+    """Compact meal description produced by the outline pass."""
+    meal_type: MealType = Field(
+        ...,
+        description="Meal type: breakfast, lunch, dinner, or snack"
+    )
+    name: str = Field(
+        ...,
+        description="Descriptive meal name (e.g., 'Greek Yogurt Protein Bowl')",
+        min_length=1
+    )
+
+
+class DayOutline(BaseModel):
+    """Meal names and types for one day, expanded into full meals later."""
+    day_name: DayName = Field(
+        ...,
+        description="Day name (Monday, Tuesday, Wednesday, Thursday, Friday, Saturday, or Sunday)"
+    )
+    meals: List[MealOutline] = Field(
+        ...,
+        min_length=3,
+        max_length=4,
+        description="3-4 meals for the day"
+    )
+
+
+class WeekOutline(BaseModel):
+    """Compact 7-day outline (meal names only) for two-phase generation."""
+    days: List[DayOutline] = Field(
+        ...,
+        min_length=7,
+        max_length=7,
+        description="Exactly 7 days (Monday through Sunday)"
+    )
+
+
 class MealPlan(BaseModel):
     """Complete 7-day meal plan with validation."""
     week_start: str = Field(
@@ -165,7 +213,7 @@ class MealPlan(BaseModel):
         """
         for day in self.days:
             # Check each macro
-            for macro in ['calories', 'protein', 'carbs', 'fat']:
+            for macro in MACROS:
                 target = getattr(self.daily_target, macro)
                 actual = getattr(day.daily_totals, macro)
 
@@ -0,0 +1,234 @@
+"""
+Benchmark: meal plan generation against a simulated model.
+
+Replaces day_chunk_generator's model with a pydantic-ai FunctionModel that
+answers every chunk prompt with realistic DayChunk JSON (built by the
+fallback planner) after a latency of base + output tokens / throughput. The
+fake can also answer 529 overloaded or with truncated JSON at configurable
+rates, so the retry, split and fallback paths are exercised without
+spending tokens.
+
+Every scenario (days per chunk x MEAL_PLAN_MAX_CONCURRENCY) generates
+--plans meal plans concurrently through generate_meal_plan_structured and
+reports wall-clock time, model calls and retries per plan, and prompt and
+output tokens. All sleeps (simulated latency and retry backoff) are
+multiplied by --time-scale; reported times are converted back to
+simulated seconds.
+
+Usage (from the api/ directory):
+    python -m tests.benchmarks.bench_meal_plan_generator
+    python -m tests.benchmarks.bench_meal_plan_generator --plans 10 --overload-rate 0.1
+    python -m tests.benchmarks.bench_meal_plan_generator --truncation-rate 0.2 --latency 8 --tokens-per-second 80
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import time
+from dataclasses import dataclass
+from typing import List
+from unittest.mock import patch
+
+# Settings are loaded at import time; the benchmark needs no real credentials
+os.environ.setdefault("SUPABASE_URL", "https://benchmark.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark-key")
+os.environ.setdefault("LLM_API_KEY", "benchmark-key")
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import RequestUsage
+from agent import meal_plan_generator
+from agent.fallback_planner import plan_day
+from agent.meal_plan_generator import day_chunk_generator, generate_meal_plan_structured, plan_chunks
+from models.meal_plan import DayName
+from utils.tokens import estimate_tokens
+
+
+TARGETS = {"calories": 2000, "protein": 150, "carbs": 200, "fat": 67}
+WEEK_START = "2025-01-13"
+
+# Per-100g favorites in the shape of the favorite_foods rows
+FAVORITES = [
+    {"name": "Chicken Breast", "calories_per_100g": 165, "protein_per_100g": 31, "carbs_per_100g": 0, "fat_per_100g": 3.6},
+    {"name": "White Rice", "calories_per_100g": 130, "protein_per_100g": 2.7, "carbs_per_100g": 28, "fat_per_100g": 0.3},
+    {"name": "Greek Yogurt", "calories_per_100g": 59, "protein_per_100g": 10, "carbs_per_100g": 3.6, "fat_per_100g": 0.4},
+    {"name": "Banana", "calories_per_100g": 89, "protein_per_100g": 1.1, "carbs_per_100g": 23, "fat_per_100g": 0.3},
+    {"name": "Olive Oil", "calories_per_100g": 884, "protein_per_100g": 0, "carbs_per_100g": 0, "fat_per_100g": 100},
+]
+
+# Requested days in a chunk prompt, e.g. "- Monday (2025-01-13): <theme>"
+PROMPT_DAY = re.compile(r"^- (\w+day) \((\d{4}-\d{2}-\d{2})\)", re.MULTILINE)
+
+
+@dataclass
+class ModelStats:
+    """What the simulated model saw during one scenario."""
+    calls: int = 0
+    overloads: int = 0
+    truncations: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class SimulatedModel:
+    """
+    FunctionModel behaviour for the day chunk generator.
+
+    Args:
+        latency: Seconds before the first token
+        tokens_per_second: Output token throughput
+        overload_rate: Fraction of calls answered with HTTP 529
+        truncation_rate: Fraction of calls answered with truncated JSON
+        seed: Random seed for failures and food rotation
+    """
+
+    def __init__(self, latency: float, tokens_per_second: float, overload_rate: float,
+                 truncation_rate: float, seed: int):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.overload_rate = overload_rate
+        self.truncation_rate = truncation_rate
+        self.random = random.Random(seed)
+        self.stats = ModelStats()
+
+    def model(self) -> FunctionModel:
+        return FunctionModel(self._generate)
+
+    async def _generate(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = "\n".join(
+            str(part.content) for message in messages for part in message.parts if hasattr(part, "content")
+        )
+        prompt_tokens = estimate_tokens(prompt)
+        self.stats.calls += 1
+        self.stats.prompt_tokens += prompt_tokens
+
+        if self.random.random() < self.overload_rate:
+            self.stats.overloads += 1
+            await asyncio.sleep(self.latency)
+            raise ModelHTTPError(status_code=529, model_name="simulated", body={"type": "overloaded_error"})
+
+        days = []
+        for day_name, date in PROMPT_DAY.findall(prompt):
+            day_index = list(DayName).index(DayName(day_name))
+            day = plan_day(TARGETS, day_index, date, [], variant=self.random.randrange(4))
+            days.append(day.model_dump(mode="json"))
+        payload = json.dumps({"daily_target": TARGETS, "days": days})
+
+        if self.random.random() < self.truncation_rate:
+            # Cut off as if max_tokens was hit halfway through
+            self.stats.truncations += 1
+            payload = payload[:len(payload) // 2]
+
+        output_tokens = estimate_tokens(payload)
+        self.stats.output_tokens += output_tokens
+        await asyncio.sleep(self.latency + output_tokens / self.tokens_per_second)
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, payload)],
+            usage=RequestUsage(input_tokens=prompt_tokens, output_tokens=output_tokens)
+        )
+
+
+@dataclass
+class ScenarioResult:
+    label: str
+    chunks: int
+    plan_seconds: List[float]
+    failed: int
+    stats: ModelStats
+
+
+async def run_scenario(args: argparse.Namespace, days_per_chunk: int, concurrency: int) -> ScenarioResult:
+    """Generate args.plans plans concurrently with one chunking/concurrency setting."""
+    simulated = SimulatedModel(args.latency, args.tokens_per_second, args.overload_rate,
+                               args.truncation_rate, args.seed)
+    scale = args.time_scale
+    real_sleep = asyncio.sleep
+
+    async def scaled_sleep(delay: float, *rest):
+        return await real_sleep(delay * scale, *rest)
+
+    async def one_plan(idx: int) -> float:
+        start = time.perf_counter()
+        await generate_meal_plan_structured(
+            user_targets=TARGETS,
+            favorite_foods=FAVORITES if args.favorites else [],
+            week_start=WEEK_START,
+            mode="chunked",
+            user_id=f"benchmark-user-{idx}"
+        )
+        return (time.perf_counter() - start) / scale
+
+    meal_plan_generator.day_cache.clear()
+    meal_plan_generator._recent_plans.clear()
+    settings = meal_plan_generator.settings
+    with patch.object(asyncio, "sleep", scaled_sleep), \
+            patch.object(meal_plan_generator, "MAX_DAYS_PER_CHUNK", days_per_chunk), \
+            patch.object(settings, "meal_plan_max_concurrency", concurrency), \
+            patch.object(settings, "meal_plan_overload_fallback", args.fallback), \
+            patch.object(meal_plan_generator.chunk_latency, "default_seconds",
+                         meal_plan_generator.chunk_latency.default_seconds * scale), \
+            day_chunk_generator.override(model=simulated.model()):
+        chunks = len(plan_chunks(TARGETS, FAVORITES if args.favorites else []))
+        outcomes = await asyncio.gather(*(one_plan(idx) for idx in range(args.plans)), return_exceptions=True)
+
+    return ScenarioResult(
+        label=f"{days_per_chunk} day(s)/chunk, concurrency {concurrency}",
+        chunks=chunks,
+        plan_seconds=[outcome for outcome in outcomes if isinstance(outcome, float)],
+        failed=sum(isinstance(outcome, BaseException) for outcome in outcomes),
+        stats=simulated.stats
+    )
+
+
+def _report(result: ScenarioResult, plans: int) -> None:
+    stats = result.stats
+    # Calls beyond one per planned chunk are retries and splits (plans served from the cache make no calls)
+    retries = max(stats.calls / plans - result.chunks, 0)
+    timing = (
+        f"mean {statistics.mean(result.plan_seconds):6.1f} s | max {max(result.plan_seconds):6.1f} s"
+        if result.plan_seconds else "no plan succeeded"
+    )
+    print(
+        f"{result.label:<30} {timing} | calls/plan {stats.calls / plans:5.1f} | "
+        f"retries/plan {retries:4.1f} | prompt tok/plan {stats.prompt_tokens // plans:6d} | "
+        f"output tok/plan {stats.output_tokens // plans:6d} | "
+        f"529s {stats.overloads} | truncated {stats.truncations} | failed {result.failed}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Retry and failure logs would drown the table; --verbose shows them
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+    print(
+        f"Meal plan generation benchmark ({args.plans} concurrent plans, latency {args.latency}s "
+        f"+ {args.tokens_per_second} tok/s, 529 rate {args.overload_rate}, "
+        f"truncation rate {args.truncation_rate}, simulated seconds)"
+    )
+    for days_per_chunk in args.days_per_chunk:
+        for concurrency in args.concurrency:
+            _report(await run_scenario(args, days_per_chunk, concurrency), args.plans)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", type=int, default=5, help="Plans generated concurrently per scenario")
+    parser.add_argument("--days-per-chunk", type=int, nargs="+", default=[1, 2], help="Days per chunk to compare")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 7], help="MEAL_PLAN_MAX_CONCURRENCY values")
+    parser.add_argument("--latency", type=float, default=2.0, help="Simulated seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0, help="Simulated output throughput")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="Fraction of calls failing with 529")
+    parser.add_argument("--truncation-rate", type=float, default=0.0, help="Fraction of calls returning truncated JSON")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Real seconds per simulated second")
+    parser.add_argument("--no-favorites", dest="favorites", action="store_false",
+                        help="Generate without favorites (plans may then come from the day cache)")
+    parser.add_argument("--no-fallback", dest="fallback", action="store_false",
+                        help="Fail instead of using the fallback planner when overloads exhaust the retries")
+    parser.add_argument("--verbose", action="store_true", help="Show generator logs")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    asyncio.run(main(parser.parse_args()))
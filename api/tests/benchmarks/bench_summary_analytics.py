@@ -0,0 +1,160 @@
+"""
+Benchmark: per-row Python aggregation vs the vectorized analytics module.
+
+Compares the old fetch_weekly_summary / fetch_pattern_summary aggregation
+(one generator pass per metric, weekday/weekend split by re-parsing every
+date) against utils/analytics.py, which loads the rows into NumPy columns
+once. Timings include building the series from the row dicts; the "all
+three" line builds it once and computes every stat from it. weekly_trend
+is compared with re-summing every 7-day window per row (O(days * 7)).
+
+Usage (from the api/ directory):
+    python -m tests.benchmarks.bench_summary_analytics
+    python -m tests.benchmarks.bench_summary_analytics --days 90 365 1000 --repeat 500
+"""
+
+import argparse
+import statistics
+import timeit
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+from utils.analytics import (
+    SummarySeries,
+    macro_consistency_stats,
+    weekday_weekend_stats,
+    weekly_stats,
+    weekly_trend_stats
+)
+
+
+def make_rows(days: int) -> List[Dict]:
+    """Synthetic daily_summary rows, newest first, with some unlogged days."""
+    today = date(2025, 1, 19)
+    rows = []
+    for i in range(days):
+        logged = i % 5 != 4
+        rows.append({
+            'date': (today - timedelta(days=i)).isoformat(),
+            'total_calories': 1700 + (i * 37) % 700 if logged else 0,
+            'total_protein': 110 + (i * 13) % 70 if logged else 0,
+            'total_carbs': 160 + (i * 7) % 90 if logged else 0,
+            'total_fat': 50 + (i * 3) % 30 if logged else 0,
+            'calories_target': 2000,
+            'protein_target': 150,
+            'carbs_target': 200,
+            'fat_target': 65,
+            'has_logged': logged
+        })
+    return rows
+
+
+def legacy_weekly(rows: List[Dict]) -> Dict:
+    """Previous fetch_weekly_summary aggregation."""
+    return {
+        'days_analyzed': len(rows),
+        'avg_calories': sum(r['total_calories'] for r in rows) / len(rows),
+        'avg_protein': sum(r['total_protein'] for r in rows) / len(rows),
+        'avg_carbs': sum(r['total_carbs'] for r in rows) / len(rows),
+        'avg_fat': sum(r['total_fat'] for r in rows) / len(rows),
+        'days_logged': sum(1 for r in rows if r['has_logged']),
+        'consistency_rate': sum(1 for r in rows if r['has_logged']) / len(rows),
+        'protein_target_hit_rate': sum(1 for r in rows if r['total_protein'] >= r['protein_target']) / len(rows),
+        'carbs_target_hit_rate': sum(1 for r in rows if r['total_carbs'] <= r['carbs_target'] * 1.1) / len(rows),
+        'calories_target_hit_rate': sum(1 for r in rows if abs(r['total_calories'] - r['calories_target']) <= 100) / len(rows),
+        'best_protein_day': max(rows, key=lambda r: r['total_protein'])['date'],
+        'worst_protein_day': min(rows, key=lambda r: r['total_protein'])['date']
+    }
+
+
+def legacy_weekday_weekend(rows: List[Dict]) -> Dict:
+    """Previous fetch_pattern_summary weekday_weekend aggregation."""
+    weekdays, weekends = [], []
+    for row in rows:
+        (weekdays if datetime.fromisoformat(row['date']).weekday() < 5 else weekends).append(row)
+    return {
+        'weekday_count': len(weekdays),
+        'weekend_count': len(weekends),
+        'weekday_avg_calories': sum(r['total_calories'] for r in weekdays) / len(weekdays),
+        'weekend_avg_calories': sum(r['total_calories'] for r in weekends) / len(weekends),
+        'weekday_avg_protein': sum(r['total_protein'] for r in weekdays) / len(weekdays),
+        'weekend_avg_protein': sum(r['total_protein'] for r in weekends) / len(weekends),
+        'weekday_avg_carbs': sum(r['total_carbs'] for r in weekdays) / len(weekdays),
+        'weekend_avg_carbs': sum(r['total_carbs'] for r in weekends) / len(weekends),
+        'weekday_logged': sum(1 for r in weekdays if r['has_logged']) / len(weekdays),
+        'weekend_logged': sum(1 for r in weekends if r['has_logged']) / len(weekends)
+    }
+
+
+def legacy_macro_consistency(rows: List[Dict]) -> Dict:
+    """Previous fetch_pattern_summary macro_consistency aggregation."""
+    protein = [r['total_protein'] for r in rows if r['has_logged']]
+    carbs = [r['total_carbs'] for r in rows if r['has_logged']]
+    fat = [r['total_fat'] for r in rows if r['has_logged']]
+    return {
+        'protein_std': statistics.stdev(protein),
+        'carbs_std': statistics.stdev(carbs),
+        'fat_std': statistics.stdev(fat),
+        'protein_avg': statistics.mean(protein),
+        'carbs_avg': statistics.mean(carbs),
+        'fat_avg': statistics.mean(fat)
+    }
+
+
+def resummed_weekly_trend(rows: List[Dict]) -> Dict:
+    """Rolling 7-day means by re-summing each window (reference for weekly_trend_stats)."""
+    logged = {r['date']: r for r in rows if r['has_logged']}
+    days = sorted(r['date'] for r in rows)
+    first, last = date.fromisoformat(days[0]), date.fromisoformat(days[-1])
+    means = {}
+    for macro in ('calories', 'protein', 'carbs', 'fat'):
+        series = []
+        for end in range(6, (last - first).days + 1):
+            window = [(first + timedelta(days=end - i)).isoformat() for i in range(7)]
+            values = [logged[d][f'total_{macro}'] for d in window if d in logged]
+            series.append(sum(values) / len(values) if values else None)
+        means[macro] = series
+    return means
+
+
+def vectorized_all(rows: List[Dict]) -> None:
+    series = SummarySeries.from_rows(rows)
+    weekly_stats(series)
+    weekday_weekend_stats(series)
+    macro_consistency_stats(series)
+
+
+def _time_us(func: Callable[[], object], repeat: int) -> float:
+    """Best-of-5 mean time per call in microseconds."""
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"daily_summary analytics benchmark (best of 5 x {args.repeat} calls)")
+    for days in args.days:
+        rows = make_rows(days)
+        cases = [
+            ("weekly", lambda: legacy_weekly(rows), lambda: weekly_stats(SummarySeries.from_rows(rows))),
+            ("weekday_weekend", lambda: legacy_weekday_weekend(rows),
+             lambda: weekday_weekend_stats(SummarySeries.from_rows(rows))),
+            ("macro_consistency", lambda: legacy_macro_consistency(rows),
+             lambda: macro_consistency_stats(SummarySeries.from_rows(rows))),
+            ("all three", lambda: (legacy_weekly(rows), legacy_weekday_weekend(rows), legacy_macro_consistency(rows)),
+             lambda: vectorized_all(rows)),
+            ("weekly_trend", lambda: resummed_weekly_trend(rows),
+             lambda: weekly_trend_stats(SummarySeries.from_rows(rows))),
+        ]
+        print(f"\n{days} days")
+        for label, legacy, vectorized in cases:
+            legacy_us = _time_us(legacy, args.repeat)
+            vectorized_us = _time_us(vectorized, args.repeat)
+            print(
+                f"  {label:<18} per-row {legacy_us:8.1f} us | vectorized {vectorized_us:8.1f} us | "
+                f"speedup {legacy_us / vectorized_us:4.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[90, 365], help="Series lengths to compare")
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing run")
+    main(parser.parse_args())
@@ -0,0 +1,145 @@
+"""
+Benchmark: per-request Supabase client creation vs the shared client.
+
+Compares the old pattern (acreate_client() on every call, as auth and chat
+each did per request) against the process-wide client from
+database.supabase.get_supabase_client().
+
+By default the benchmark runs against a local keep-alive HTTP stub that
+counts TCP connections, so it needs no network or credentials. Pass --url
+and --key to measure against a real Supabase project (TLS included).
+
+Usage (from the api/ directory):
+    python -m tests.benchmarks.bench_supabase_client
+    python -m tests.benchmarks.bench_supabase_client --requests 200
+    python -m tests.benchmarks.bench_supabase_client --url https://xyz.supabase.co --key <service-key>
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+from supabase import acreate_client, AsyncClient
+
+
+STUB_BODY = b'[{"id": "00000000-0000-0000-0000-000000000000"}]'
+
+
+class KeepAliveStub:
+    """Minimal HTTP/1.1 server returning a PostgREST-like JSON body."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(STUB_BODY)).encode() + b"\r\n"
+                    b"Connection: keep-alive\r\n\r\n" + STUB_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _query(client: AsyncClient) -> None:
+    """One representative round trip (same shape as the auth users lookup)."""
+    await client.table("users").select("id").limit(1).execute()
+
+
+async def bench_per_call(url: str, key: str, n: int) -> list[float]:
+    """Old pattern: build a fresh client (and connection) for every call."""
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client = await acreate_client(url, key)
+        await _query(client)
+        timings.append(time.perf_counter() - start)
+        await client.postgrest.aclose()
+    return timings
+
+
+async def bench_shared(url: str, key: str, n: int) -> list[float]:
+    """New pattern: one shared client whose connections stay alive."""
+    client = await acreate_client(url, key)
+    timings = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            await _query(client)
+            timings.append(time.perf_counter() - start)
+    finally:
+        await client.postgrest.aclose()
+    return timings
+
+
+def _report(label: str, timings: list[float], connections: Optional[int]) -> None:
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[int(len(timings_ms) * 0.95) - 1]
+    conn_note = f" | TCP connections: {connections}" if connections is not None else ""
+    print(
+        f"{label:<10} mean {statistics.mean(timings_ms):7.2f} ms | "
+        f"median {statistics.median(timings_ms):7.2f} ms | p95 {p95:7.2f} ms{conn_note}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = None
+    url, key = args.url, args.key
+    if not url:
+        stub = KeepAliveStub()
+        url, key = await stub.start(), "benchmark-key"
+
+    try:
+        before = stub.connections if stub else None
+        per_call = await bench_per_call(url, key, args.requests)
+        per_call_conns = stub.connections - before if stub else None
+
+        before = stub.connections if stub else None
+        shared = await bench_shared(url, key, args.requests)
+        shared_conns = stub.connections - before if stub else None
+    finally:
+        if stub:
+            await stub.stop()
+
+    print(f"Supabase client benchmark ({args.requests} requests against {url})")
+    _report("per-call", per_call, per_call_conns)
+    _report("shared", shared, shared_conns)
+    saved = statistics.mean(per_call) - statistics.mean(shared)
+    print(f"Per-request setup cost removed: {saved * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--url", default=None, help="Supabase URL (default: local stub)")
+    parser.add_argument("--key", default=None, help="Supabase service key (with --url)")
+    asyncio.run(main(parser.parse_args()))
@@ -6,8 +6,12 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from pydantic_ai.models.test import TestModel
 from api.agent.dependencies import CoachAgentDependencies
+from api.models.meal_plan import MACROS
 from datetime import datetime, timedelta
 
+OATS = {"name": "Oats", "quantity_g": 100, "calories": 380, "protein": 13, "carbs": 67, "fat": 7}
+WRONG_TOTALS = {"calories": 1, "protein": 1, "carbs": 1, "fat": 1}
+
 
 @pytest.fixture
 def test_model():
@@ -41,6 +45,76 @@ def mock_supabase():
     return mock
 
 
+@pytest.fixture
+def make_day():
+    """
+    Factory for raw meal plan day dicts.
+
+    Returns dicts rather than MealPlanDay so each test validates them with the
+    model its module under test imports (api.models and models are separate imports).
+    """
+    def make(
+        meals: list[list[dict]] | None = None,
+        day_name: str = "Monday",
+        date: str = "2025-01-13",
+        wrong_totals: bool = False
+    ) -> dict:
+        """
+        Args:
+            meals: Foods of each meal (default: three meals of 100 g oats)
+            day_name: Day name
+            date: Date (YYYY-MM-DD)
+            wrong_totals: Give meals and the day deliberately wrong totals, to check they are recomputed
+        """
+        meals = meals if meals is not None else [[dict(OATS)] for _ in range(3)]
+        meal_totals = [
+            WRONG_TOTALS if wrong_totals else {macro: round(sum(food[macro] for food in foods), 1) for macro in MACROS}
+            for foods in meals
+        ]
+        return {
+            "date": date,
+            "day_name": day_name,
+            "meals": [
+                {"id": f"meal_{i:03d}", "name": f"Meal {i}", "meal_type": "lunch", "foods": foods, "totals": totals}
+                for i, (foods, totals) in enumerate(zip(meals, meal_totals))
+            ],
+            "daily_totals": {macro: round(sum(totals[macro] for totals in meal_totals), 1) for macro in MACROS}
+        }
+
+    return make
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fake clock for caches that take a `clock` callable."""
+    return FakeClock()
+
+
+@pytest.fixture
+def summary_change():
+    """Factory for realtime daily_summary change payloads (what handle_change receives)."""
+    def make(user_id: str, day: str | None = None) -> dict:
+        """
+        Args:
+            user_id: User whose daily_summary row changed
+            day: The row's date (omitted from the record when None)
+        """
+        record = {'user_id': user_id} if day is None else {'user_id': user_id, 'date': day}
+        return {'data': {'table': 'daily_summary', 'type': 'UPDATE', 'record': record}, 'ids': [1]}
+
+    return make
+
+
 @pytest.fixture
 def test_user_id():
     """Standard test user ID."""
@@ -0,0 +1,111 @@
+"""
+Test the vectorized daily_summary analytics.
+
+Validates:
+- Weekly stats match a plain per-row computation
+- Best/worst protein day ties go to the most recent day
+- Weekday/weekend split uses the calendar day of week
+- Macro consistency uses the sample standard deviation over logged days
+- Weekly trend windows match re-summing each window, with missing days
+"""
+
+import statistics
+from datetime import date, timedelta
+import numpy as np
+from api.utils.analytics import (
+    SummarySeries,
+    macro_consistency_stats,
+    weekday_weekend_stats,
+    weekly_stats,
+    weekly_trend_stats
+)
+
+
+def make_rows(days: int) -> list[dict]:
+    """Newest-first rows starting Sunday 2025-01-19, with every 4th day unlogged."""
+    rows = []
+    for i in range(days):
+        day = date(2025, 1, 19) - timedelta(days=i)
+        logged = i % 4 != 3
+        rows.append({
+            'date': day.isoformat(),
+            'total_calories': 1800 + (i * 37) % 500 if logged else 0,
+            'total_protein': 120 + (i * 13) % 50 if logged else 0,
+            'total_carbs': 180 + (i * 7) % 60 if logged else 0,
+            'total_fat': 55 + (i * 3) % 20 if logged else 0,
+            'calories_target': 2000,
+            'protein_target': 150,
+            'carbs_target': 200,
+            'fat_target': 65,
+            'has_logged': logged
+        })
+    return rows
+
+
+def test_weekly_stats_match_per_row_computation():
+    rows = make_rows(30)
+    stats = weekly_stats(SummarySeries.from_rows(rows))
+
+    assert stats['days_analyzed'] == 30
+    assert stats['avg_protein'] == sum(r['total_protein'] for r in rows) / 30
+    assert stats['days_logged'] == sum(r['has_logged'] for r in rows)
+    assert stats['protein_target_hit_rate'] == sum(r['total_protein'] >= 150 for r in rows) / 30
+    assert stats['carbs_target_hit_rate'] == sum(r['total_carbs'] <= 220 for r in rows) / 30
+    assert stats['calories_target_hit_rate'] == sum(abs(r['total_calories'] - 2000) <= 100 for r in rows) / 30
+    assert weekly_stats(SummarySeries.from_rows([])) == {'days_analyzed': 0}
+
+
+def test_protein_day_ties_go_to_most_recent_day():
+    rows = make_rows(8)
+    for row in rows:
+        row['total_protein'] = 100
+    rows[2]['total_protein'] = rows[6]['total_protein'] = 160
+
+    stats = weekly_stats(SummarySeries.from_rows(rows[::-1]))  # Order of rows doesn't matter
+
+    assert stats['best_protein_day'] == rows[2]['date']
+    assert stats['worst_protein_day'] == rows[0]['date']
+
+
+def test_weekday_weekend_split():
+    rows = make_rows(14)
+    stats = weekday_weekend_stats(SummarySeries.from_rows(rows))
+    weekend = [r for r in rows if date.fromisoformat(r['date']).weekday() >= 5]
+
+    assert (stats['weekday_count'], stats['weekend_count']) == (10, 4)
+    assert stats['weekend_avg_calories'] == sum(r['total_calories'] for r in weekend) / 4
+    assert stats['weekend_logged'] == sum(r['has_logged'] for r in weekend) / 4
+
+
+def test_macro_consistency_over_logged_days():
+    rows = make_rows(20)
+    stats = macro_consistency_stats(SummarySeries.from_rows(rows))
+    protein = [r['total_protein'] for r in rows if r['has_logged']]
+
+    assert stats['logged_count'] == len(protein)
+    assert abs(stats['protein_std'] - statistics.stdev(protein)) < 1e-9
+    assert abs(stats['protein_avg'] - statistics.mean(protein)) < 1e-9
+
+
+def test_weekly_trend_matches_resummed_windows():
+    rows = [row for i, row in enumerate(make_rows(40)) if i not in (5, 6, 17)]  # Days without a row
+    stats = weekly_trend_stats(SummarySeries.from_rows(rows))
+    by_date = {row['date']: row for row in rows if row['has_logged']}
+
+    def window_mean(end: date, macro: str):
+        days = [(end - timedelta(days=i)).isoformat() for i in range(7)]
+        values = [by_date[day][f'total_{macro}'] for day in days if day in by_date]
+        return sum(values) / len(values) if values else None
+
+    last_day = date(2025, 1, 19)
+    assert [week['end_date'] for week in stats['weeks']][-2:] == ['2025-01-12', '2025-01-19']
+    assert len(stats['weeks']) == 5
+    for macro in ('calories', 'protein', 'carbs', 'fat'):
+        assert abs(stats[f'{macro}_7d_avg'] - window_mean(last_day, macro)) < 1e-9
+        delta = window_mean(last_day, macro) - window_mean(last_day - timedelta(days=7), macro)
+        assert abs(stats[f'{macro}_wow_delta'] - delta) < 1e-9
+
+    rolling = [window_mean(last_day - timedelta(days=i), 'protein') for i in range(33, -1, -1)]
+    expected_slope = np.polyfit(np.arange(len(rolling)), rolling, 1)[0] * 7
+    assert abs(stats['protein_slope_per_week'] - expected_slope) < 1e-9
+    assert weekly_trend_stats(SummarySeries.from_rows(rows[:4]))['weeks'] == []  # Under a week
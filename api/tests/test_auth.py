@@ -0,0 +1,124 @@
+"""
+Test JWT authentication dependency.
+
+Validates:
+- Local HS256 verification (signature, expiry, audience)
+- auth_id -> user_id TTL cache (warm requests make no Supabase calls)
+- Fallback to Supabase auth when no local key is configured
+"""
+
+import time
+import jwt
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from api.dependencies import auth as auth_module
+from api.utils.ttl_cache import TTLCache
+
+
+TEST_SECRET = "test-jwt-secret-with-enough-length-for-hs256"
+
+
+def make_token(sub="auth-abc", exp_offset=3600, secret=TEST_SECRET, audience="authenticated"):
+    """Create a Supabase-style HS256 access token."""
+    return jwt.encode(
+        {"sub": sub, "aud": audience, "exp": int(time.time()) + exp_offset, "role": "authenticated"},
+        secret,
+        algorithm="HS256"
+    )
+
+
+@pytest.fixture
+def auth_supabase():
+    """Mock Supabase client returning a users row for the auth_id lookup."""
+    client = MagicMock()
+    query = client.from_.return_value.select.return_value.eq.return_value.single.return_value
+    query.execute = AsyncMock(return_value=MagicMock(data={"id": "user-123"}))
+    client.auth.get_user = AsyncMock(
+        return_value=MagicMock(user=MagicMock(id="auth-abc"))
+    )
+    return client
+
+
+@pytest.fixture(autouse=True)
+def isolated_auth_state(monkeypatch):
+    """Give each test a fresh user cache and a configured JWT secret."""
+    monkeypatch.setattr(auth_module, "_user_id_cache", TTLCache(maxsize=100, ttl_seconds=300))
+    monkeypatch.setattr(auth_module.settings, "supabase_jwt_secret", TEST_SECRET)
+
+
+@pytest.mark.asyncio
+async def test_warm_request_makes_no_round_trips(auth_supabase):
+    """Test second request is served from local verification + cache."""
+    token = make_token()
+
+    with patch.object(auth_module, "get_supabase_client", AsyncMock(return_value=auth_supabase)) as get_client:
+        first = await auth_module.get_current_user_id(f"Bearer {token}")
+        second = await auth_module.get_current_user_id(f"Bearer {token}")
+
+    assert first == second == "user-123"
+    # Only the cold request touched Supabase, and never the auth API
+    assert get_client.await_count == 1
+    auth_supabase.auth.get_user.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_rejected_locally(auth_supabase):
+    """Test expired tokens are rejected without calling Supabase."""
+    token = make_token(exp_offset=-60)
+
+    with patch.object(auth_module, "get_supabase_client", AsyncMock(return_value=auth_supabase)) as get_client:
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_module.get_current_user_id(f"Bearer {token}")
+
+    assert exc_info.value.status_code == 401
+    get_client.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_rejected(auth_supabase):
+    """Test tokens signed with another secret are rejected."""
+    token = make_token(secret="some-other-secret-that-is-also-long-enough")
+
+    with patch.object(auth_module, "get_supabase_client", AsyncMock(return_value=auth_supabase)):
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_module.get_current_user_id(f"Bearer {token}")
+
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_expires_after_ttl(auth_supabase, monkeypatch):
+    """Test cached mappings are re-resolved once the TTL passes (bounded revocation)."""
+    now = [1000.0]
+    monkeypatch.setattr(auth_module, "_user_id_cache", TTLCache(maxsize=100, ttl_seconds=60, clock=lambda: now[0]))
+    token = make_token()
+
+    with patch.object(auth_module, "get_supabase_client", AsyncMock(return_value=auth_supabase)) as get_client:
+        await auth_module.get_current_user_id(f"Bearer {token}")
+        now[0] += 61
+        await auth_module.get_current_user_id(f"Bearer {token}")
+
+    assert get_client.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_supabase_auth_without_secret(auth_supabase, monkeypatch):
+    """Test HS256 tokens are validated remotely when no secret is configured."""
+    monkeypatch.setattr(auth_module.settings, "supabase_jwt_secret", None)
+    token = make_token()
+
+    with patch.object(auth_module, "get_supabase_client", AsyncMock(return_value=auth_supabase)):
+        user_id = await auth_module.get_current_user_id(f"Bearer {token}")
+
+    assert user_id == "user-123"
+    auth_supabase.auth.get_user.assert_awaited_once_with(token)
+
+
+@pytest.mark.asyncio
+async def test_invalid_header_format():
+    """Test non-Bearer headers are rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        await auth_module.get_current_user_id("Token abc")
+
+    assert exc_info.value.status_code == 401
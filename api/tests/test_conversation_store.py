@@ -0,0 +1,146 @@
+"""
+Test server-side conversation store.
+
+Validates:
+- History is parsed from Supabase once, then served from memory
+- Appends persist only new messages with continuing sequence numbers
+- Conversations are isolated per user
+- Failed writes are retried on the next append
+- Concurrent appends get distinct sequence numbers; evicting unsaved messages is logged
+"""
+
+import asyncio
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pydantic_ai.messages import (
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    UserPromptPart
+)
+from api.database.conversation_store import ConversationStore, ConversationNotFoundError
+
+
+CONVERSATION_ID = "7b0c3c1e-1111-4a8e-9d52-2f3a4b5c6d7e"
+
+
+def make_turn(question: str, answer: str):
+    """Build one user/assistant exchange."""
+    return [
+        ModelRequest(parts=[UserPromptPart(content=question)]),
+        ModelResponse(parts=[TextPart(content=answer)])
+    ]
+
+
+def make_supabase(rows=None, insert_error=None):
+    """Mock Supabase client for the coach_conversation_messages table."""
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.eq.return_value.order.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=rows or [])
+    )
+    table.insert.return_value.execute = AsyncMock(side_effect=insert_error)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_new_conversation_starts_empty_and_persists_turn():
+    """Test an unknown conversation ID starts empty and appends with seq from 0."""
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    supabase = make_supabase()
+
+    history = await store.load(supabase, CONVERSATION_ID, "user-1")
+    assert history == []
+
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Hi", "Hello!"))
+
+    inserted = supabase.table.return_value.insert.call_args[0][0]
+    assert [row['seq'] for row in inserted] == [0, 1]
+    assert all(row['user_id'] == "user-1" for row in inserted)
+
+
+@pytest.mark.asyncio
+async def test_history_loaded_once_then_only_new_messages_written():
+    """Test per-turn work: no re-fetch on cache hit, only new messages inserted."""
+    stored = ModelMessagesTypeAdapter.dump_python(make_turn("Q1", "A1"), mode='json')
+    rows = [{'user_id': "user-1", 'seq': i, 'message': m} for i, m in enumerate(stored)]
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    supabase = make_supabase(rows)
+    fetch = supabase.table.return_value.select.return_value.eq.return_value.order.return_value.execute
+
+    history = await store.load(supabase, CONVERSATION_ID, "user-1")
+    assert len(history) == 2
+    assert isinstance(history[0], ModelRequest)
+
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q2", "A2"))
+    history = await store.load(supabase, CONVERSATION_ID, "user-1")
+
+    assert len(history) == 4
+    assert fetch.await_count == 1
+    inserted = supabase.table.return_value.insert.call_args[0][0]
+    assert [row['seq'] for row in inserted] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_conversation_of_other_user_is_rejected():
+    """Test users cannot read another user's conversation."""
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    supabase = make_supabase()
+
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Hi", "Hello!"))
+
+    with pytest.raises(ConversationNotFoundError):
+        await store.load(supabase, CONVERSATION_ID, "user-2")
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_on_next_append():
+    """Test messages that failed to persist are included in the next insert."""
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    supabase = make_supabase(insert_error=[RuntimeError("network down"), None])
+
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q1", "A1"))
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q2", "A2"))
+
+    inserted = supabase.table.return_value.insert.call_args[0][0]
+    assert [row['seq'] for row in inserted] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_get_distinct_seqs():
+    """Test two turns finishing together write consecutive, non-overlapping seq ranges."""
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    supabase = make_supabase()
+    inserts = []
+
+    async def slow_insert():
+        await asyncio.sleep(0.01)
+
+    def insert(rows):
+        inserts.append([row['seq'] for row in rows])
+        return MagicMock(execute=slow_insert)
+
+    supabase.table.return_value.insert.side_effect = insert
+
+    await asyncio.gather(
+        store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q1", "A1")),
+        store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q2", "A2"))
+    )
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q3", "A3"))
+
+    assert inserts == [[0, 1], [2, 3], [4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_evicting_unsaved_messages_is_logged(caplog):
+    """Test the LRU reports a conversation dropped before its messages were saved."""
+    store = ConversationStore(maxsize=1, ttl_seconds=60)
+    supabase = make_supabase(insert_error=RuntimeError("network down"))
+
+    await store.append(supabase, CONVERSATION_ID, "user-1", make_turn("Q1", "A1"))
+    with caplog.at_level(logging.ERROR):
+        await store.load(make_supabase(), "other-conversation", "user-1")
+
+    assert f"Evicted conversation {CONVERSATION_ID} with 2 unsaved messages" in caplog.text
@@ -0,0 +1,127 @@
+"""
+Test the shared meal plan day cache.
+
+Validates:
+- Similar targets and equivalent preferences share a key
+- Cached weeks are re-dated for the requested week
+- Users are only served weeks they haven't received; extra variants are kept per key
+- Persistence falls back to Supabase on a memory miss
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+# MealPlanDay as seen by the module under test (api.models and models are separate imports)
+from api.agent.day_cache import DayCache, MealPlanDay
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def make_week(start_day: int = 13, lunch: str = "lunch") -> list[MealPlanDay]:
+    totals = {"calories": 500, "protein": 30, "carbs": 50, "fat": 15}
+    return [
+        MealPlanDay.model_validate({
+            "date": f"2025-01-{start_day + i}",
+            "day_name": name,
+            "meals": [{
+                "id": f"meal_{name.lower()}_001_lunch",
+                "name": f"{name} {lunch}",
+                "meal_type": "lunch",
+                "foods": [{"name": "Rice", "quantity_g": 100, **totals}],
+                "totals": totals
+            }],
+            "daily_totals": totals
+        })
+        for i, name in enumerate(WEEKDAYS)
+    ]
+
+
+def test_key_buckets_similar_targets():
+    """Test targets within a bucket and reformatted preferences share a key."""
+    a = DayCache.key({'calories': 2000, 'protein': 150, 'carbs': 200, 'fat': 67}, "Lots of fruit")
+    b = DayCache.key({'calories': 2030, 'protein': 148, 'carbs': 204, 'fat': 66}, "  lots of FRUIT! ")
+    c = DayCache.key({'calories': 2500, 'protein': 150, 'carbs': 200, 'fat': 67}, "Lots of fruit")
+    d = DayCache.key({'calories': 2000, 'protein': 150, 'carbs': 200, 'fat': 67}, "vegetarian")
+
+    assert a == b
+    assert len({a, c, d}) == 3
+
+
+@pytest.mark.asyncio
+async def test_week_redated_on_hit():
+    """Test a cached week is returned with the requested dates and matching meal ids."""
+    cache = DayCache(maxsize=10, ttl_seconds=60)
+    await cache.put_week("k", make_week())
+
+    days = await cache.get_week("k", "2025-02-03")
+
+    assert [day.date for day in days] == [f"2025-02-0{d}" for d in range(3, 10)]
+    assert [day.day_name.value for day in days] == WEEKDAYS
+    assert days[2].meals[0].id == "meal_wednesday_001_lunch"
+
+
+@pytest.mark.asyncio
+async def test_hit_returns_independent_copies():
+    """Test callers can't mutate the cached week."""
+    cache = DayCache(maxsize=10, ttl_seconds=60)
+    await cache.put_week("k", make_week())
+
+    first = await cache.get_week("k", "2025-02-03")
+    first[0].meals[0].name = "changed"
+    second = await cache.get_week("k", "2025-02-03")
+
+    assert second[0].meals[0].name == "Monday lunch"
+
+
+@pytest.mark.asyncio
+async def test_miss_and_incomplete_weeks():
+    """Test unknown keys and partial weeks are misses."""
+    cache = DayCache(maxsize=10, ttl_seconds=60)
+    await cache.put_week("partial", make_week()[:3])
+
+    assert await cache.get_week("unknown", "2025-02-03") is None
+    assert await cache.get_week("partial", "2025-02-03") is None
+
+
+@pytest.mark.asyncio
+async def test_persisted_week_loaded_on_memory_miss():
+    """Test a week stored in Supabase is served (and cached) after a restart."""
+    rows = [{'variant': 'v1', 'days': [day.model_dump(mode='json') for day in make_week()]}]
+    fetch = AsyncMock(return_value=rows)
+    cache = DayCache(maxsize=10, ttl_seconds=60, persist=True)
+
+    with patch('api.agent.day_cache.get_supabase_client', AsyncMock()), \
+            patch('api.agent.day_cache.fetch_cached_meal_plan_week', fetch):
+        first = await cache.get_week("k", "2025-02-03")
+        await cache.get_week("k", "2025-02-03")
+
+    assert len(first) == 7
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_user_not_served_same_week_twice():
+    """Test a user gets each cached variant once, then a miss; other users still hit."""
+    cache = DayCache(maxsize=10, ttl_seconds=60)
+    await cache.put_week("k", make_week(), user_id="author")
+    await cache.put_week("k", make_week(lunch="bowl"))
+
+    assert (await cache.get_week("k", "2025-02-03", "author"))[0].meals[0].name == "Monday bowl"
+    assert await cache.get_week("k", "2025-02-10", "author") is None
+
+    first = await cache.get_week("k", "2025-02-03", "other")
+    second = await cache.get_week("k", "2025-02-03", "other")
+    assert first[0].meals[0].name != second[0].meals[0].name
+    assert await cache.get_week("k", "2025-02-03", "other") is None
+
+
+@pytest.mark.asyncio
+async def test_oldest_variant_replaced():
+    """Test a key keeps at most `variants` weeks, dropping the oldest."""
+    cache = DayCache(maxsize=10, ttl_seconds=60, variants=2)
+    for lunch in ("a", "b", "c"):
+        await cache.put_week("k", make_week(lunch=lunch))
+
+    names = [(await cache.get_week("k", "2025-02-03", "user-1"))[0].meals[0].name for _ in range(2)]
+
+    assert names == ["Monday b", "Monday c"]
+    assert await cache.get_week("k", "2025-02-03", "user-1") is None
@@ -0,0 +1,54 @@
+"""
+Test the LLM-free fallback meal planner.
+
+Validates:
+- Foods are classified by where their calories come from
+- The user's own foods fill slots before staples
+- A full week scales to the targets within the portion solver's tolerance
+"""
+
+import time
+from api.agent.fallback_planner import classify_food, plan_week, user_planner_foods
+from api.agent.portion_solver import scale_day_to_target
+from api.models.meal_plan import MacroTotals
+
+TARGETS = {"calories": 2000, "protein": 150, "carbs": 200, "fat": 67}
+
+FAVORITES = [
+    {"name": "Salmon", "calories_per_100g": 208, "protein_per_100g": 20, "carbs_per_100g": 0, "fat_per_100g": 13},
+    {"name": "White Rice", "calories_per_100g": 130, "protein_per_100g": 2.7, "carbs_per_100g": 28, "fat_per_100g": 0.3},
+    {"name": "Peanut Butter", "calories_per_100g": 588, "protein_per_100g": 25, "carbs_per_100g": 20, "fat_per_100g": 50},
+]
+
+
+def test_classify_food():
+    assert classify_food(165, 31, 0, 3.6) == "protein"
+    assert classify_food(884, 0, 0, 100) == "fat"
+    assert classify_food(130, 2.7, 28, 0.3) == "carb"
+    assert classify_food(35, 2.4, 7.2, 0.4) == "vegetable"
+
+
+def test_user_foods_fill_slots_first():
+    roles = {food.name: food.role for food in user_planner_foods(FAVORITES)}
+    assert roles == {"Salmon": "protein", "White Rice": "carb", "Peanut Butter": "fat"}
+
+    days = plan_week(TARGETS, FAVORITES, "2025-01-13")
+    for day in days:
+        day_foods = {food.name for meal in day.meals for food in meal.foods}
+        assert {"Salmon", "White Rice", "Peanut Butter"} <= day_foods
+
+
+def test_week_scales_to_targets():
+    start = time.perf_counter()
+    days = plan_week(TARGETS, [], "2025-01-13")
+    elapsed = time.perf_counter() - start
+
+    assert [day.date for day in days] == [f"2025-01-{13 + idx}" for idx in range(7)]
+    assert all(len(day.meals) == 4 for day in days)
+    assert elapsed < 1.0
+
+    target = MacroTotals(**TARGETS)
+    for day in days:
+        totals = scale_day_to_target(day, target).daily_totals
+        for macro, value in TARGETS.items():
+            assert 0.95 * value <= getattr(totals, macro) <= value
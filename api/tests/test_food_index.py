@@ -0,0 +1,130 @@
+"""
+Test the in-memory food macro index.
+
+Validates:
+- Name matching ignores case, punctuation and word order, and uses aliases
+- Curated foods take precedence over cached USDA food_items
+- Matched foods get macros recomputed from per-100g values
+- Meal and daily totals are re-summed even when nothing matches
+- A failed refresh keeps the previous index
+- Later refreshes only fetch food_items synced since the last load
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+# MealPlanDay as seen by the module under test (api.models and models are separate imports)
+from api.database.food_index import FoodIndex, MealPlanDay
+
+CATALOG = {
+    'curated_foods': [
+        {
+            'name': 'chicken breast', 'display_name': 'Chicken Breast (Grilled)', 'aliases': ['grilled chicken'],
+            'calories_per_100g': 165, 'protein_per_100g': 31, 'carbs_per_100g': 0, 'fat_per_100g': 3.6
+        }
+    ],
+    'food_items': [
+        {
+            'id': 'fi-1', 'last_synced': '2025-01-01T00:00:00+00:00',
+            'name': 'Chicken Breast', 'calories_per_100g': 120, 'protein_per_100g': 22.5,
+            'carbs_per_100g': 0, 'fat_per_100g': 2.6
+        },
+        {
+            'id': 'fi-2', 'last_synced': '2025-01-02T00:00:00+00:00',
+            'name': 'Rice, white, cooked', 'calories_per_100g': 130, 'protein_per_100g': 2.7,
+            'carbs_per_100g': 28.2, 'fat_per_100g': 0.3
+        }
+    ]
+}
+
+
+@pytest.fixture
+def index():
+    index = FoodIndex(refresh_seconds=3600)
+    index.load(CATALOG)
+    return index
+
+
+def test_lookup_normalizes_names(index):
+    """Test case, punctuation, word order and aliases all match."""
+    assert index.lookup("CHICKEN BREAST").source == 'curated_foods'
+    assert index.lookup("Chicken Breast, Grilled").calories == 165
+    assert index.lookup("Grilled Chicken").calories == 165
+    assert index.lookup("white rice cooked").carbs == 28.2
+    assert index.lookup("Dragon Fruit") is None
+
+
+def test_curated_foods_win_over_food_items(index):
+    """Test reviewed curated macros override cached USDA rows with the same name."""
+    assert index.lookup("chicken breast").protein == 31
+
+
+def test_correct_day_recomputes_matched_foods(index, make_day):
+    """Test matched foods use per-100g values and totals are rebuilt."""
+    day = index.correct_day(MealPlanDay.model_validate(make_day([[
+        {"name": "Chicken Breast", "quantity_g": 200, "calories": 500, "protein": 10, "carbs": 5, "fat": 20},
+        {"name": "Mystery Sauce", "quantity_g": 30, "calories": 45, "protein": 0, "carbs": 9, "fat": 1}
+    ]], wrong_totals=True)))
+
+    chicken, sauce = day.meals[0].foods
+    assert (chicken.calories, chicken.protein, chicken.fat) == (330, 62, 7.2)
+    assert sauce.calories == 45  # Unmatched foods keep the model's numbers
+    assert day.meals[0].totals.calories == 375
+    assert day.daily_totals.model_dump() == day.meals[0].totals.model_dump()
+
+
+def test_correct_day_fixes_totals_without_matches(make_day):
+    """Test an empty index still re-sums wrong totals."""
+    day = FoodIndex(refresh_seconds=3600).correct_day(MealPlanDay.model_validate(make_day([[
+        {"name": "Mystery Sauce", "quantity_g": 30, "calories": 45, "protein": 0, "carbs": 9, "fat": 1}
+    ]], wrong_totals=True)))
+
+    assert day.daily_totals.calories == 45
+    assert day.daily_totals.carbs == 9
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_previous_index(index):
+    """Test a Supabase error leaves the loaded index in place."""
+    with patch('api.database.food_index.get_supabase_client', AsyncMock()), \
+            patch('api.database.food_index.fetch_food_macro_catalog', AsyncMock(side_effect=RuntimeError("down"))):
+        await index.refresh()
+
+    assert index.lookup("chicken breast") is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_catalog():
+    """Test refresh replaces the index with the fetched catalog."""
+    index = FoodIndex(refresh_seconds=3600)
+
+    with patch('api.database.food_index.get_supabase_client', AsyncMock()), \
+            patch('api.database.food_index.fetch_food_macro_catalog', AsyncMock(return_value=CATALOG)):
+        await index.refresh()
+
+    assert index.loaded_at is not None
+    assert index.lookup("grilled chicken").calories == 165
+
+
+@pytest.mark.asyncio
+async def test_refresh_merges_newly_synced_food_items():
+    """Test a later refresh only fetches food_items synced since the last load and keeps the rest."""
+    index = FoodIndex(refresh_seconds=3600, full_refresh_seconds=86400)
+    update = {
+        'curated_foods': CATALOG['curated_foods'],
+        'food_items': [{
+            'id': 'fi-3', 'last_synced': '2025-01-03T00:00:00+00:00',
+            'name': 'Oats, rolled', 'calories_per_100g': 379, 'protein_per_100g': 13.2,
+            'carbs_per_100g': 67.7, 'fat_per_100g': 6.5
+        }]
+    }
+    fetch = AsyncMock(side_effect=[CATALOG, update])
+
+    with patch('api.database.food_index.get_supabase_client', AsyncMock(return_value="client")), \
+            patch('api.database.food_index.fetch_food_macro_catalog', fetch):
+        await index.refresh()
+        await index.refresh()
+
+    assert fetch.await_args_list[0].args == ("client", None)
+    assert fetch.await_args_list[1].args == ("client", '2025-01-02T00:00:00+00:00')
+    assert index.lookup("rolled oats").calories == 379
+    assert index.lookup("white rice cooked").carbs == 28.2
@@ -0,0 +1,98 @@
+"""
+Test hedged requests and the shared retry budget.
+
+Validates:
+- The hedge delay is a default until enough latencies are recorded, then the p90
+- A slow request is hedged, the faster copy wins and the other is cancelled
+- The hedge budget caps duplicate requests
+- One failed copy doesn't fail the call while the other can still succeed
+- A retry budget allows exactly its number of retries
+"""
+
+import asyncio
+import pytest
+from api.agent.hedging import LatencyTracker, HedgeBudget, RetryBudget, run_hedged
+
+
+def test_latency_tracker_uses_p90_after_warmup():
+    """Test the default delay is used until min_samples latencies exist."""
+    latency = LatencyTracker(default_seconds=30, min_samples=10)
+    for seconds in range(1, 10):
+        latency.record(seconds)
+    assert latency.p90() == 30
+
+    latency.record(10)
+    assert latency.p90() == 10
+
+
+def test_hedge_budget_caps_hedge_rate():
+    """Test hedges are limited to the burst plus ratio per call."""
+    budget = HedgeBudget(ratio=0.5, burst=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.record_call()
+    assert not budget.try_spend()
+    budget.record_call()
+    assert budget.try_spend()
+
+
+@pytest.mark.asyncio
+async def test_slow_request_hedged_and_loser_cancelled():
+    """Test a call slower than the p90 gets a duplicate whose result wins."""
+    delays = [1.0, 0.0]
+    cancelled = []
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    result = await run_hedged(call, LatencyTracker(default_seconds=0.01), HedgeBudget(ratio=0), "chunk")
+
+    assert result == 0.0
+    await asyncio.sleep(0)
+    assert cancelled == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    """Test an exhausted hedge budget waits for the original request."""
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    budget = HedgeBudget(ratio=0, burst=0)
+    assert await run_hedged(call, LatencyTracker(default_seconds=0.01), budget, "chunk") == "done"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_survives_failed_copy():
+    """Test a fast failure of one copy still returns the other's result."""
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("overloaded")
+        await asyncio.sleep(0.1)
+        return "hedged"
+
+    result = await run_hedged(call, LatencyTracker(default_seconds=0.01), HedgeBudget(ratio=0), "chunk")
+    assert result == "hedged"
+
+
+def test_retry_budget_exhausts():
+    """Test a budget allows exactly its number of retries."""
+    budget = RetryBudget(2)
+    assert budget.try_spend("a") and budget.try_spend("b")
+    assert not budget.try_spend("c")
@@ -0,0 +1,126 @@
+"""
+Test token-budgeted history compaction.
+
+Validates:
+- Short histories pass through untouched
+- Older turns fold into a summary while the last N turns stay verbatim
+- Summaries are incremental (only newly aged-out turns are summarized)
+- A cached summary isn't reused for a history with a different prefix
+- Tokens saved are reported
+"""
+
+import pytest
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    UserPromptPart
+)
+from pydantic_ai.models.function import FunctionModel, AgentInfo
+from api.agent.history_compactor import HistoryCompactor, history_summarizer, SUMMARY_PREFIX
+
+
+def make_history(turns: int, words_per_message: int = 60) -> list:
+    """Build a history of user/coach turns, system prompt in the first request."""
+    filler = " ".join(["protein"] * words_per_message)
+    messages = []
+    for i in range(turns):
+        parts = [UserPromptPart(content=f"Question {i}: {filler}")]
+        if i == 0:
+            parts.insert(0, SystemPromptPart(content="You are a nutrition coach."))
+        messages.append(ModelRequest(parts=parts))
+        messages.append(ModelResponse(parts=[TextPart(content=f"Answer {i}: {filler}")]))
+    return messages
+
+
+@pytest.fixture
+def summarizer_calls():
+    """Replace the summarizer model with a FunctionModel that records prompts."""
+    prompts = []
+
+    def summarize(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = messages[-1].parts[-1].content
+        prompts.append(prompt)
+        return ModelResponse(parts=[TextPart(content=f"summary #{len(prompts)}")])
+
+    with history_summarizer.override(model=FunctionModel(summarize)):
+        yield prompts
+
+
+@pytest.mark.asyncio
+async def test_history_under_budget_is_unchanged(summarizer_calls):
+    """Test no compaction happens below the token budget."""
+    compactor = HistoryCompactor(keep_turns=2, token_budget=100000, cache_size=10)
+    history = make_history(6)
+
+    result = await compactor.compact(history, "user:conv")
+
+    assert result.messages is history
+    assert result.tokens_saved == 0
+    assert summarizer_calls == []
+
+
+@pytest.mark.asyncio
+async def test_older_turns_folded_into_summary(summarizer_calls):
+    """Test last N turns stay verbatim and older ones become a summary."""
+    compactor = HistoryCompactor(keep_turns=2, token_budget=200, cache_size=10)
+    history = make_history(6)
+
+    result = await compactor.compact(history, "user:conv")
+
+    # Summary request + 2 kept turns (request/response each, first request merged)
+    assert len(result.messages) == 4
+    first_parts = result.messages[0].parts
+    assert first_parts[0].content == "You are a nutrition coach."
+    assert first_parts[1].content == SUMMARY_PREFIX + "summary #1"
+    assert first_parts[2].content.startswith("Question 4")
+    assert result.messages[-1].parts[0].content.startswith("Answer 5")
+    assert result.tokens_saved > 0
+    assert len(summarizer_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_is_computed_incrementally(summarizer_calls):
+    """Test a later call only summarizes turns that newly aged out."""
+    compactor = HistoryCompactor(keep_turns=2, token_budget=200, cache_size=10)
+
+    await compactor.compact(make_history(6), "user:conv")
+    await compactor.compact(make_history(7), "user:conv")
+
+    assert len(summarizer_calls) == 2
+    second_prompt = summarizer_calls[1]
+    assert "Previous summary:\nsummary #1" in second_prompt
+    # Only turn 4 aged out; earlier turns are already in the summary
+    assert "Question 4" in second_prompt
+    assert "Question 3" not in second_prompt
+
+
+@pytest.mark.asyncio
+async def test_cached_summary_reused_without_new_turns(summarizer_calls):
+    """Test repeating the same history doesn't call the summarizer again."""
+    compactor = HistoryCompactor(keep_turns=2, token_budget=200, cache_size=10)
+    history = make_history(6)
+
+    await compactor.compact(history, "user:conv")
+    result = await compactor.compact(history, "user:conv")
+
+    assert len(summarizer_calls) == 1
+    assert result.messages[0].parts[1].content == SUMMARY_PREFIX + "summary #1"
+
+
+@pytest.mark.asyncio
+async def test_summary_not_reused_for_different_prefix(summarizer_calls):
+    """Test two histories sharing a key (same opening message) don't share a summary."""
+    compactor = HistoryCompactor(keep_turns=2, token_budget=200, cache_size=10)
+    other = make_history(7)
+    # Last message folded by the first call (turns 0-3 are folded)
+    other[7] = ModelResponse(parts=[TextPart(content="A different answer " + "carbs " * 60)])
+
+    await compactor.compact(make_history(6), "user:hi")
+    await compactor.compact(other, "user:hi")
+
+    assert len(summarizer_calls) == 2
+    assert "Previous summary" not in summarizer_calls[1]
+    assert "A different answer" in summarizer_calls[1]
@@ -426,3 +426,272 @@ async def test_malformed_conversation_history():
 
             # Should still process (logs warning and continues with None history)
             assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_emits_text_tool_and_done_events(mock_supabase):
+    """Test streaming endpoint emits SSE text deltas, tool events and a final done frame."""
+    import json
+    from httpx import ASGITransport
+    from api.main import nutrition_coach, get_current_user_id
+
+    app.dependency_overrides[get_current_user_id] = lambda: "test-user-123"
+    test_model = TestModel(
+        call_tools=['fetch_favorite_foods'],
+        custom_output_text="Here are your favorites."
+    )
+
+    try:
+        with patch('api.main.get_supabase_client', AsyncMock(return_value=mock_supabase)), \
+             nutrition_coach.override(model=test_model):
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/chat/stream",
+                    json={"message": "What are my favorite foods?", "conversation_history": []},
+                    headers={"Authorization": "Bearer test-token"}
+                )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [
+            json.loads(line[len("data: "):])
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        event_types = [event['type'] for event in events]
+
+        assert 'tool_start' in event_types
+        assert 'tool_end' in event_types
+        assert event_types.index('tool_start') < event_types.index('tool_end')
+        assert event_types[-1] == 'done'
+
+        streamed_text = ''.join(e['content'] for e in events if e['type'] == 'text')
+        assert streamed_text == "Here are your favorites."
+
+        done = events[-1]
+        assert done['response'] == "Here are your favorites."
+        assert done['usage']['total_tokens'] > 0
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_supabase_client_is_shared_across_calls():
+    """Test get_supabase_client reuses one client instead of creating one per call."""
+    from api.database import supabase as supabase_module
+
+    def fake_client(*args):
+        client = MagicMock()
+        client.auth.close = AsyncMock()
+        client.realtime.remove_all_channels = AsyncMock()
+        client._postgrest.aclose = AsyncMock()
+        client._storage = None  # Never used, so never created
+        client._functions._client.aclose = AsyncMock()
+        return client
+
+    created = AsyncMock(side_effect=fake_client)
+    supabase_module._client = None
+
+    with patch.object(supabase_module, 'acreate_client', created):
+        first = await supabase_module.get_supabase_client()
+        second = await supabase_module.get_supabase_client()
+
+        assert first is second
+        assert created.await_count == 1
+
+        await supabase_module.close_supabase_client()
+        first.auth.close.assert_awaited_once()
+        first.realtime.remove_all_channels.assert_awaited_once()
+        first._postgrest.aclose.assert_awaited_once()
+        first._functions._client.aclose.assert_awaited_once()
+
+        # A fresh client is created lazily after shutdown
+        third = await supabase_module.get_supabase_client()
+        assert third is not first
+        assert created.await_count == 2
+
+    supabase_module._client = None
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_conversation_id_mode_keeps_history_server_side():
+    """Test conversation_id mode: client sends only the new message, server supplies history."""
+    from httpx import ASGITransport
+    from api.main import nutrition_coach, get_current_user_id
+    from database.conversation_store import ConversationStore
+
+    supabase = MagicMock()
+    table = supabase.table.return_value
+    table.select.return_value.eq.return_value.order.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=[])
+    )
+    table.insert.return_value.execute = AsyncMock()
+
+    app.dependency_overrides[get_current_user_id] = lambda: "test-user-123"
+    conversation_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    seen_history_lengths = []
+    original_run = nutrition_coach.run
+
+    async def recording_run(*args, **kwargs):
+        seen_history_lengths.append(len(kwargs.get('message_history') or []))
+        return await original_run(*args, **kwargs)
+
+    try:
+        with patch('api.main.get_supabase_client', AsyncMock(return_value=supabase)), \
+             patch('api.main.conversation_store', ConversationStore(maxsize=10, ttl_seconds=60)), \
+             patch.object(nutrition_coach, 'run', recording_run), \
+             nutrition_coach.override(model=TestModel(call_tools=[], custom_output_text="Noted.")):
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                for message in ["How is my protein?", "And carbs?"]:
+                    response = await client.post(
+                        "/api/chat",
+                        json={"message": message, "conversation_id": conversation_id},
+                        headers={"Authorization": "Bearer test-token"}
+                    )
+                    assert response.status_code == 200
+                    data = response.json()
+                    assert data["conversation_id"] == conversation_id
+                    # Only this turn's messages come back, never the accumulated history
+                    assert len(data["conversation_history"]) <= 2
+
+        # Second turn ran with the first turn's messages supplied by the server
+        assert seen_history_lengths == [0, 2]
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_stores_turn_when_client_disconnects():
+    """Test a stream closed mid-run still finishes the turn and appends it to the conversation."""
+    import asyncio
+    from api import main
+    from api.main import ChatRequest, chat_stream, nutrition_coach
+    from database.conversation_store import ConversationStore
+    from pydantic_ai.models.function import FunctionModel
+
+    supabase = MagicMock()
+    table = supabase.table.return_value
+    table.select.return_value.eq.return_value.order.return_value.execute = AsyncMock(
+        return_value=MagicMock(data=[])
+    )
+    table.insert.return_value.execute = AsyncMock()
+
+    store = ConversationStore(maxsize=10, ttl_seconds=60)
+    conversation_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    resume = asyncio.Event()
+
+    async def stream_reply(messages, info):
+        yield "Protein "
+        await resume.wait()  # Client disconnects while the model is still streaming
+        yield "looks good."
+
+    with patch('api.main.get_supabase_client', AsyncMock(return_value=supabase)), \
+         patch('api.main.conversation_store', store), \
+         nutrition_coach.override(model=FunctionModel(stream_function=stream_reply)):
+
+        response = await chat_stream(
+            ChatRequest(message="How is my protein?", conversation_id=conversation_id),
+            user_id="test-user-123"
+        )
+        frames = response.body_iterator
+        first = await frames.__anext__()
+        assert '"type": "text"' in first
+        await frames.aclose()
+
+        resume.set()
+        await asyncio.gather(*main._detached_turns)
+
+        history = await store.load(supabase, conversation_id, "test-user-123")
+
+    assert len(history) == 2
+    assert history[-1].parts[0].content == "Protein looks good."
+
+
+@pytest.mark.asyncio
+async def test_meal_plan_progress_endpoint_streams_published_events():
+    """Test the progress SSE endpoint replays days and the final plan, and is owner-scoped."""
+    import json
+    from httpx import ASGITransport
+    from api.main import get_current_user_id
+    from agent.meal_plan_progress import MealPlanProgressBroker
+
+    broker = MealPlanProgressBroker(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    generation_id = "6f1c2b1e-8a4b-4a43-9c55-0b5f3d0b8e11"
+    broker.publish(generation_id, "test-user-123", {'type': 'day', 'day': {'day_name': 'Monday'}})
+    broker.publish(generation_id, "test-user-123", {'type': 'complete', 'meal_plan': {'days': []}})
+    broker.close(generation_id, "test-user-123")
+
+    try:
+        with patch('api.main.meal_plan_progress', broker):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                app.dependency_overrides[get_current_user_id] = lambda: "test-user-123"
+                response = await client.get(f"/api/meal-plan-progress/{generation_id}")
+
+                app.dependency_overrides[get_current_user_id] = lambda: "someone-else"
+                forbidden = await client.get(f"/api/meal-plan-progress/{generation_id}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+        assert [event['type'] for event in events] == ['day', 'complete']
+        assert forbidden.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_meal_plan_job_endpoint_returns_owner_status():
+    """Test GET /api/meal-plan-jobs/{id} returns the job for its owner and 404 otherwise."""
+    from httpx import ASGITransport
+    from api.main import get_current_user_id
+
+    job_id = "9b2d8a6e-3c1f-4f6a-8e2b-7d5c4b3a2f10"
+    status = {
+        'job_id': job_id, 'status': 'running', 'week_start': '2025-01-13',
+        'meal_plan': None, 'error': None, 'created_at': None, 'updated_at': None
+    }
+
+    async def get_job(requested_id, user_id):
+        return status if (requested_id, user_id) == (job_id, "test-user-123") else None
+
+    try:
+        with patch('api.main.meal_plan_jobs.get', get_job):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                app.dependency_overrides[get_current_user_id] = lambda: "test-user-123"
+                response = await client.get(f"/api/meal-plan-jobs/{job_id}")
+
+                app.dependency_overrides[get_current_user_id] = lambda: "someone-else"
+                forbidden = await client.get(f"/api/meal-plan-jobs/{job_id}")
+
+        assert response.status_code == 200
+        assert response.json()['status'] == 'running'
+        assert forbidden.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_meal_plan_output_metrics_endpoint():
+    """Test GET /api/metrics/meal-plan-output reports validation counts and rates."""
+    from httpx import ASGITransport
+    from api.main import output_metrics
+
+    output_metrics.reset()
+    output_metrics.record("day_chunk", repaired=True)
+    output_metrics.record("day_chunk", retried=True)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/metrics/meal-plan-output")
+
+    output_metrics.reset()
+    assert response.status_code == 200
+    assert response.json()["day_chunk"]["retry_rate"] == 0.5
+    assert response.json()["total"]["validated"] == 2
@@ -0,0 +1,596 @@
+"""
+Test meal plan generation with a simulated model (no API calls).
+
+Validates:
+- Chunks are generated concurrently and merged in day order
+- The concurrency cap is respected
+- Each chunk receives its own pre-assigned day themes
+- Chunk sizes follow the estimated output size; invalid chunks are re-asked once, then split
+- Retries of all chunks draw from one per-generation budget
+- Wrong totals in model output are repaired without a retry
+- Fast mode and the overload fallback build plans without the model
+- Outline mode expands days in parallel and retries a failed day alone
+- Plans without favorites are served from the shared day cache
+- Each finished day is reported as soon as its chunk completes
+- Identical concurrent requests share one generation; retries reuse the result
+- Single days and meals are regenerated without touching the rest of the plan
+"""
+
+import asyncio
+import json
+import re
+import pytest
+from unittest.mock import AsyncMock
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse, RetryPromptPart, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import FunctionModel, AgentInfo
+from api.agent import meal_plan_generator
+from api.agent.meal_plan_generator import (
+    day_chunk_generator,
+    day_detail_generator,
+    outline_generator,
+    meal_generator,
+    regenerate_day,
+    regenerate_meal,
+    generate_meal_plan_structured,
+    assign_day_themes,
+    plan_chunks
+)
+
+
+TARGETS = {'calories': 2000, 'protein': 150, 'carbs': 200, 'fat': 67}
+WEEK_START = "2025-01-13"
+DAY_PATTERN = re.compile(r"- (Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday) \((\d{4}-\d{2}-\d{2})\)")
+
+
+FAVORITES = [{'name': 'Salmon', 'calories_per_100g': 208, 'protein_per_100g': 20,
+              'carbs_per_100g': 0, 'fat_per_100g': 13}]
+
+
+@pytest.fixture(autouse=True)
+def empty_day_cache():
+    """Start every test with empty caches so generation actually runs."""
+    meal_plan_generator.day_cache.clear()
+    meal_plan_generator._recent_plans.clear()
+    yield
+    meal_plan_generator.day_cache.clear()
+    meal_plan_generator._recent_plans.clear()
+
+
+def fake_day(day_name: str, date: str, targets: dict) -> dict:
+    """Build a valid day with four meals landing ~1% under target."""
+    share = {macro: round(value * 0.99 / 4, 1) for macro, value in targets.items()}
+    meals = []
+    for i, meal_type in enumerate(["breakfast", "lunch", "dinner", "snack"]):
+        meals.append({
+            "id": f"meal_{day_name.lower()}_{i:03d}_{meal_type}",
+            "name": f"{day_name} {meal_type}",
+            "meal_type": meal_type,
+            "foods": [{"name": "Test Food", "quantity_g": 100, **share}],
+            "totals": share
+        })
+    return {
+        "date": date,
+        "day_name": day_name,
+        "meals": meals,
+        "daily_totals": {macro: round(value * 4, 1) for macro, value in share.items()}
+    }
+
+
+def chunk_prompt(messages: list[ModelMessage]) -> str:
+    """Extract the user prompt of the current run (output retries repeat it only in history)."""
+    return next(
+        part.content
+        for message in reversed(messages)
+        for part in message.parts
+        if isinstance(part, UserPromptPart)
+    )
+
+
+def fake_chunk_model(delay: float = 0.0, prompts: list | None = None, stats: dict | None = None) -> FunctionModel:
+    """FunctionModel that answers each chunk prompt with valid DayChunk JSON."""
+    stats = stats if stats is not None else {}
+    stats.setdefault('active', 0)
+    stats.setdefault('max_active', 0)
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        if prompts is not None:
+            prompts.append(prompt)
+
+        stats['active'] += 1
+        stats['max_active'] = max(stats['max_active'], stats['active'])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            stats['active'] -= 1
+
+        days = [fake_day(name, date, TARGETS) for name, date in DAY_PATTERN.findall(prompt)]
+        payload = {"daily_target": TARGETS, "days": days}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    return FunctionModel(generate)
+
+
+@pytest.mark.asyncio
+async def test_chunks_generated_concurrently_and_merged_in_order():
+    """Test all chunks run at once and the plan comes back Monday..Sunday."""
+    stats = {}
+
+    with day_chunk_generator.override(model=fake_chunk_model(delay=0.05, stats=stats)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert [day.day_name.value for day in plan.days] == [
+        "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+    ]
+    assert [day.date for day in plan.days] == sorted(day.date for day in plan.days)
+    assert stats['max_active'] == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_respected(monkeypatch):
+    """Test MEAL_PLAN_MAX_CONCURRENCY bounds in-flight chunk requests."""
+    monkeypatch.setattr(meal_plan_generator.settings, "meal_plan_max_concurrency", 2)
+    stats = {}
+
+    with day_chunk_generator.override(model=fake_chunk_model(delay=0.02, stats=stats)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert len(plan.days) == 7
+    assert stats['max_active'] == 2
+
+
+@pytest.mark.asyncio
+async def test_each_chunk_gets_distinct_day_themes():
+    """Test themes are pre-assigned per day so parallel chunks stay varied."""
+    prompts = []
+    themes = assign_day_themes(WEEK_START)
+
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert len(set(themes.values())) == 7
+    monday_prompt = next(p for p in prompts if "Monday (" in p)
+    sunday_prompt = next(p for p in prompts if "Sunday (" in p)
+    assert themes[0] in monday_prompt and themes[0] not in sunday_prompt
+    assert themes[6] in sunday_prompt
+
+
+def test_chunk_plan_adapts_to_output_size():
+    """Test typical targets use 2-day chunks and large, food-heavy plans use 1-day chunks."""
+    favorites = FAVORITES * 10
+
+    assert plan_chunks(TARGETS, []) == [[0, 1], [2, 3], [4, 5], [6]]
+    assert plan_chunks({**TARGETS, 'calories': 4000}, favorites) == [[i] for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_truncated_chunk_split_in_two():
+    """Test a 2-day response still invalid after one output retry is split into single days."""
+    prompts = []
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        prompts.append(prompt)
+        days = DAY_PATTERN.findall(prompt)
+        if len(days) == 2 and days[0][0] == "Wednesday":
+            # Cut off mid-JSON, as when max_tokens is hit
+            return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, '{"daily_target": {"calories": 2')])
+        payload = {"daily_target": TARGETS, "days": [fake_day(name, date, TARGETS) for name, date in days]}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert [day.day_name.value for day in plan.days][2:4] == ["Wednesday", "Thursday"]
+    assert len(prompts) == 7  # 4 chunks, 1 output retry, 2 halves
+    assert sum(1 for prompt in prompts if len(DAY_PATTERN.findall(prompt)) == 1) == 3
+
+
+@pytest.mark.asyncio
+async def test_chunk_with_wrong_dates_rejected():
+    """Test a chunk is checked against the requested days and dates passed as run deps."""
+    prompts = []
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        prompts.append(prompt)
+        days = DAY_PATTERN.findall(prompt)
+        if len(days) == 2 and days[0][0] == "Monday":
+            days = [(name, "2030-01-01") for name, _ in days]
+        payload = {"daily_target": TARGETS, "days": [fake_day(name, date, TARGETS) for name, date in days]}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert [day.date for day in plan.days][:2] == ["2025-01-13", "2025-01-14"]
+    assert len(prompts) == 7  # 4 chunks, 1 output retry, 2 halves
+
+
+@pytest.mark.asyncio
+async def test_structural_problem_gets_one_output_retry():
+    """Test the validator's feedback reaches the model as a retry request instead of forcing a split."""
+    retries = []
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        days = DAY_PATTERN.findall(chunk_prompt(messages))
+        retry_parts = [part for part in messages[-1].parts if isinstance(part, RetryPromptPart)]
+        retries.extend(retry_parts)
+        payload = {"daily_target": TARGETS, "days": [fake_day(name, date, TARGETS) for name, date in days]}
+        if days[0][0] == "Monday" and not retry_parts:
+            del payload["days"][0]["meals"][1:]  # One meal: structurally invalid
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert len(retries) == 1
+    assert "Monday: has 1 meals" in retries[0].model_response()
+    assert len(plan.days[0].meals) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("budget,succeeds", [(4, True), (3, False)])
+async def test_generation_retries_share_one_budget(monkeypatch, budget, succeeds):
+    """Test overload retries of different chunks draw from one per-generation budget."""
+    failures = {"Monday": 2, "Sunday": 2}  # 4 retries needed in total, at most 2 per chunk
+
+    async def flaky(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        first_day = DAY_PATTERN.findall(prompt)[0][0]
+        if failures.get(first_day):
+            failures[first_day] -= 1
+            raise ModelHTTPError(status_code=529, model_name="test", body="overloaded")
+        payload = {"daily_target": TARGETS, "days": [fake_day(name, date, TARGETS) for name, date in DAY_PATTERN.findall(prompt)]}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    # The generator imports hedging as agent.hedging, a separate module object from api.agent.hedging
+    hedging_settings = meal_plan_generator.current_retry_budget.__globals__['settings']
+    monkeypatch.setattr(hedging_settings, 'meal_plan_retry_budget', budget)
+    monkeypatch.setattr(meal_plan_generator.settings, 'meal_plan_overload_fallback', False)
+    monkeypatch.setattr(meal_plan_generator.asyncio, 'sleep', AsyncMock())
+
+    with day_chunk_generator.override(model=FunctionModel(flaky)):
+        if succeeds:
+            plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+            assert len(plan.days) == 7
+        else:
+            with pytest.raises(ModelHTTPError):
+                await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+
+def fake_outline_model() -> FunctionModel:
+    """FunctionModel that answers the outline prompt with a valid WeekOutline."""
+    def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        days = [
+            {
+                "day_name": day_name,
+                "meals": [{"meal_type": t, "name": f"{day_name} {t}"} for t in ("breakfast", "lunch", "dinner")]
+            }
+            for day_name in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+        ]
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps({"days": days}))])
+
+    return FunctionModel(generate)
+
+
+def fake_detail_model(calls: list, fail_once: str | None = None) -> FunctionModel:
+    """FunctionModel that expands a day prompt, optionally failing one day's first attempt."""
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        day_name, date = re.search(r"for (\w+) \((\d{4}-\d{2}-\d{2})\)", prompt).groups()
+        calls.append(day_name)
+        if day_name == fail_once and calls.count(day_name) == 1:
+            raise RuntimeError("simulated failure")
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(fake_day(day_name, date, TARGETS)))])
+
+    return FunctionModel(generate)
+
+
+@pytest.mark.asyncio
+async def test_outline_mode_builds_week_from_outline():
+    """Test outline mode keeps outlined meal names and calendar dates."""
+    calls = []
+
+    with outline_generator.override(model=fake_outline_model()), \
+            day_detail_generator.override(model=fake_detail_model(calls)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START, mode="outline")
+
+    assert [day.date for day in plan.days] == [f"2025-01-{d}" for d in range(13, 20)]
+    assert plan.days[0].day_name.value == "Monday"
+    assert sorted(calls) == sorted(set(calls)) and len(calls) == 7
+
+
+@pytest.mark.asyncio
+async def test_outline_mode_retries_failed_day_alone():
+    """Test a failed day is regenerated without re-running its neighbours."""
+    calls = []
+
+    with outline_generator.override(model=fake_outline_model()), \
+            day_detail_generator.override(model=fake_detail_model(calls, fail_once="Wednesday")):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START, mode="outline")
+
+    assert len(plan.days) == 7
+    assert calls.count("Wednesday") == 2
+    assert all(calls.count(day) == 1 for day in set(calls) - {"Wednesday"})
+
+
+@pytest.mark.asyncio
+async def test_unknown_mode_rejected():
+    """Test an unsupported mode fails fast."""
+    with pytest.raises(ValueError):
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START, mode="bogus")
+
+
+@pytest.mark.asyncio
+async def test_similar_targets_served_from_day_cache():
+    """Test a second user with near-identical targets gets a cached, rescaled week."""
+    prompts = []
+    similar = {'calories': 2030, 'protein': 148, 'carbs': 204, 'fat': 66}
+
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START, "lots of fruit")
+        calls_after_first = len(prompts)
+        plan = await generate_meal_plan_structured(similar, [], "2025-01-20", "Lots of fruit!")
+
+    assert calls_after_first == 4
+    assert len(prompts) == 4
+    assert plan.days[0].date == "2025-01-20"
+    # Rescaled to the new targets: nothing over, the binding macro within 2%
+    ratios = [getattr(plan.days[0].daily_totals, macro) / target for macro, target in similar.items()]
+    assert max(ratios) <= 1.0
+    assert max(ratios) >= 0.98
+
+
+@pytest.mark.asyncio
+async def test_favorites_bypass_day_cache():
+    """Test plans built around favorite foods are neither cached nor served from cache."""
+    prompts = []
+
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+        await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START)
+
+    assert len(prompts) == 8
+
+
+@pytest.mark.asyncio
+async def test_on_day_reports_days_before_plan_completes():
+    """Test days from a fast chunk are reported while slower chunks are still running."""
+    reported = []
+    finished = asyncio.Event()
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        days = DAY_PATTERN.findall(prompt)
+        # The Sunday chunk is fast; the others wait until it has been reported
+        if days[0][0] != "Sunday":
+            await asyncio.wait_for(finished.wait(), timeout=1)
+        payload = {"daily_target": TARGETS, "days": [fake_day(name, date, TARGETS) for name, date in days]}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    def on_day(day):
+        reported.append(day.day_name.value)
+        finished.set()
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START, on_day=on_day)
+
+    assert reported[0] == "Sunday"
+    assert sorted(reported) == sorted(day.day_name.value for day in plan.days)
+    # Reported days are the final validated (rescaled) days
+    assert all(day.daily_totals.calories <= TARGETS['calories'] for day in plan.days)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_cancels_other_chunks():
+    """Test a chunk failure raises its own error and cancels the chunks still running."""
+    cancelled = []
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        days = DAY_PATTERN.findall(chunk_prompt(messages))
+        if days[0][0] == "Sunday":
+            raise RuntimeError("chunk failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(days[0][0])
+            raise
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        with pytest.raises(RuntimeError, match="chunk failed"):
+            await asyncio.wait_for(generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START), timeout=1)
+
+    assert len(cancelled) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_generation():
+    """Test a double-click generates once and both callers get the plan and its days."""
+    prompts = []
+    reported = []
+
+    with day_chunk_generator.override(model=fake_chunk_model(delay=0.02, prompts=prompts)):
+        first, second = await asyncio.gather(
+            generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1"),
+            generate_meal_plan_structured(
+                TARGETS, FAVORITES, WEEK_START, user_id="user-1", on_day=lambda day: reported.append(day)
+            )
+        )
+
+    assert len(prompts) == 4
+    assert first.model_dump() == second.model_dump()
+    assert len(reported) == 7
+    assert not meal_plan_generator._in_flight
+
+
+@pytest.mark.asyncio
+async def test_retry_after_completion_reuses_plan():
+    """Test a repeat just after completion is memoized, but other users and weeks are not."""
+    prompts = []
+
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1")
+        await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1")
+        assert len(prompts) == 4
+
+        await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-2")
+        await generate_meal_plan_structured(TARGETS, FAVORITES, "2025-01-20", user_id="user-1")
+
+    assert len(prompts) == 12
+
+
+@pytest.mark.asyncio
+async def test_fresh_request_and_next_week_get_new_plans():
+    """Test an explicit regenerate skips the memo and a user is never re-served their cached week."""
+    prompts = []
+
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START, user_id="user-1")
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START, user_id="user-1", fresh=True)
+        assert len(prompts) == 8
+
+        await generate_meal_plan_structured(TARGETS, [], "2025-01-20", user_id="user-1")
+        assert len(prompts) == 12
+
+        # Another user with the same targets is served a cached week
+        await generate_meal_plan_structured(TARGETS, [], WEEK_START, user_id="user-2")
+
+    assert len(prompts) == 12
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_not_memoized():
+    """Test every joined caller sees the failure and a retry generates again."""
+    async def overloaded(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model down")
+
+    with day_chunk_generator.override(model=FunctionModel(overloaded)):
+        results = await asyncio.gather(
+            generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1"),
+            generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1"),
+            return_exceptions=True
+        )
+
+    assert all(isinstance(result, Exception) for result in results)
+
+    prompts = []
+    with day_chunk_generator.override(model=fake_chunk_model(prompts=prompts)):
+        plan = await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, user_id="user-1")
+
+    assert len(plan.days) == 7
+    assert len(prompts) == 4
+
+
+@pytest.mark.asyncio
+async def test_regenerate_day_replaces_only_that_day():
+    """Test one small call rebuilds a day, with the other days' meals as context."""
+    prompts = []
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompts.append(chunk_prompt(messages))
+        day = fake_day("Monday", "2099-01-01", TARGETS)  # Wrong calendar is corrected
+        day["meals"][0]["name"] = "Vegetarian Chili"
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(day))])
+
+    with day_chunk_generator.override(model=fake_chunk_model()):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    with day_detail_generator.override(model=FunctionModel(generate)):
+        day = await regenerate_day(plan, 2, "make it vegetarian")
+
+    assert len(prompts) == 1
+    assert "make it vegetarian" in prompts[0]
+    assert "Tuesday breakfast" in prompts[0]  # Other days listed to avoid repeats
+    assert (day.date, day.day_name.value) == (plan.days[2].date, "Wednesday")
+    assert day.meals[0].name == "Vegetarian Chili"
+    assert day.daily_totals.calories <= TARGETS['calories']
+
+
+@pytest.mark.asyncio
+async def test_regenerate_meal_fits_remaining_target():
+    """Test a swapped meal is sized to what the day's other meals leave free."""
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        meal = {
+            "id": "whatever", "name": "Tofu Stir Fry", "meal_type": "snack",
+            "foods": [{"name": "Tofu", "quantity_g": 300, "calories": 900, "protein": 60, "carbs": 90, "fat": 30}],
+            "totals": {"calories": 900, "protein": 60, "carbs": 90, "fat": 30}
+        }
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(meal))])
+
+    with day_chunk_generator.override(model=fake_chunk_model()):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    day = plan.days[2]
+    with meal_generator.override(model=FunctionModel(generate)):
+        new_day = await regenerate_meal(plan, 2, 2, "something vegetarian")
+
+    new_meal = new_day.meals[2]
+    assert (new_meal.id, new_meal.meal_type.value, new_meal.name) == (day.meals[2].id, "dinner", "Tofu Stir Fry")
+    assert [meal.model_dump() for idx, meal in enumerate(new_day.meals) if idx != 2] == \
+        [meal.model_dump() for idx, meal in enumerate(day.meals) if idx != 2]
+    assert new_day.daily_totals.calories <= TARGETS['calories']
+    assert new_day.daily_totals.calories >= day.daily_totals.calories - day.meals[2].totals.calories
+
+
+@pytest.mark.asyncio
+async def test_chunk_totals_repaired_without_output_retry():
+    """Test chunks whose totals disagree with their foods are repaired in-process."""
+    prompts = []
+    output_metrics = meal_plan_generator.output_metrics
+    output_metrics.reset()
+
+    async def generate(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = chunk_prompt(messages)
+        prompts.append(prompt)
+        days = [fake_day(name, date, TARGETS) for name, date in DAY_PATTERN.findall(prompt)]
+        for day in days:
+            day["daily_totals"]["calories"] += 500  # Model arithmetic is off
+        payload = {"daily_target": TARGETS, "days": days}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, json.dumps(payload))])
+
+    with day_chunk_generator.override(model=FunctionModel(generate)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert len(prompts) == 4
+    assert len(plan.days) == 7
+    counts = output_metrics.snapshot()["day_chunk"]
+    assert (counts["validated"], counts["repaired"], counts["retried"]) == (4, 4, 0)
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_builds_plan_without_model():
+    """Test mode="fast" uses the user's foods, never calls the model and hits targets."""
+    async def no_model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        raise AssertionError("fast mode must not call the model")
+
+    with day_chunk_generator.override(model=FunctionModel(no_model)):
+        plan = await generate_meal_plan_structured(TARGETS, FAVORITES, WEEK_START, mode="fast")
+
+    assert [day.date for day in plan.days][0] == WEEK_START
+    foods = {food.name for day in plan.days for meal in day.meals for food in meal.foods}
+    assert "Salmon" in foods
+    assert all(day.daily_totals.calories <= TARGETS['calories'] for day in plan.days)
+    assert all(day.daily_totals.calories >= TARGETS['calories'] * 0.95 for day in plan.days)
+    # Rotation varies the week
+    assert len({day.meals[2].name for day in plan.days}) > 1
+
+
+@pytest.mark.asyncio
+async def test_overload_falls_back_to_fast_planner(monkeypatch):
+    """Test a persistently overloaded model still yields a plan."""
+    async def overloaded(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        raise ModelHTTPError(status_code=529, model_name="test", body="overloaded")
+
+    monkeypatch.setattr(meal_plan_generator.asyncio, 'sleep', AsyncMock())
+
+    with day_chunk_generator.override(model=FunctionModel(overloaded)):
+        plan = await generate_meal_plan_structured(TARGETS, [], WEEK_START)
+
+    assert len(plan.days) == 7
+    # Fallback weeks aren't shared through the day cache
+    assert await meal_plan_generator.day_cache.get_week(
+        meal_plan_generator.day_cache.key(TARGETS), WEEK_START
+    ) is None
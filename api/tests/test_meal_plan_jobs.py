@@ -0,0 +1,173 @@
+"""
+Test the background meal plan job queue.
+
+Validates:
+- Jobs run in the background and move queued -> running -> succeeded
+- The worker pool bounds concurrent generations
+- Failures are recorded and reported to progress subscribers
+- A full queue rejects new jobs
+- Job status is only visible to its owner
+- Stopping the queue fails running and queued jobs
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from api.agent import meal_plan_jobs as jobs_module
+from api.agent.meal_plan_jobs import MealPlanJobQueue, MealPlanJob, QueueFullError
+
+TARGETS = {'calories': 2000, 'protein': 150, 'carbs': 200, 'fat': 67}
+
+
+def make_job(job_id: str, user_id: str = "user-1") -> MealPlanJob:
+    return MealPlanJob(job_id=job_id, user_id=user_id, week_start="2025-01-13", user_targets=TARGETS)
+
+
+@pytest.fixture
+def persisted():
+    """Record every persisted job row instead of writing to Supabase."""
+    rows = []
+
+    async def upsert(supabase, row):
+        rows.append(dict(row))
+        return True
+
+    with patch.object(jobs_module, 'get_supabase_client', AsyncMock()), \
+            patch.object(jobs_module, 'upsert_meal_plan_job', upsert):
+        yield rows
+
+
+async def wait_for_status(queue: MealPlanJobQueue, job_id: str, status: str) -> dict:
+    for _ in range(200):
+        job = await queue.get(job_id, "user-1")
+        if job['status'] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background_and_succeeds(persisted):
+    """Test submit returns immediately and the worker saves the plan."""
+    queue = MealPlanJobQueue(workers=1, max_queued=10, cache_size=10, ttl_seconds=60)
+    release = asyncio.Event()
+
+    async def generate(*args, **kwargs):
+        await release.wait()
+        return {'week_start': '2025-01-13', 'days': []}
+
+    try:
+        with patch.object(jobs_module, 'generate_and_save_meal_plan', generate):
+            job = await queue.submit(make_job("job-1"))
+            assert job.status in ("queued", "running")
+
+            release.set()
+            done = await wait_for_status(queue, "job-1", "succeeded")
+
+        assert done['meal_plan'] == {'week_start': '2025-01-13', 'days': []}
+        assert [row['status'] for row in persisted] == ["queued", "running", "succeeded"]
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_bounds_concurrency(persisted):
+    """Test no more jobs run at once than there are workers."""
+    queue = MealPlanJobQueue(workers=2, max_queued=10, cache_size=10, ttl_seconds=60)
+    stats = {'active': 0, 'max_active': 0}
+
+    async def generate(*args, **kwargs):
+        stats['active'] += 1
+        stats['max_active'] = max(stats['max_active'], stats['active'])
+        await asyncio.sleep(0.02)
+        stats['active'] -= 1
+        return {'days': []}
+
+    try:
+        with patch.object(jobs_module, 'generate_and_save_meal_plan', generate):
+            for i in range(5):
+                await queue.submit(make_job(f"job-{i}"))
+            for i in range(5):
+                await wait_for_status(queue, f"job-{i}", "succeeded")
+
+        assert stats['max_active'] == 2
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_recorded_and_reported(persisted):
+    """Test a generation error marks the job failed and ends the progress stream."""
+    queue = MealPlanJobQueue(workers=1, max_queued=10, cache_size=10, ttl_seconds=60)
+
+    try:
+        with patch.object(jobs_module, 'generate_and_save_meal_plan', AsyncMock(side_effect=RuntimeError("overloaded"))):
+            await queue.submit(make_job("job-fail"))
+            failed = await wait_for_status(queue, "job-fail", "failed")
+
+        assert failed['error'] == "Meal plan generation failed"
+        events = [event async for event in jobs_module.meal_plan_progress.subscribe("job-fail", "user-1")]
+        assert 'error' in [event['type'] for event in events]
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_jobs(persisted):
+    """Test submissions beyond the queue bound fail fast."""
+    queue = MealPlanJobQueue(workers=1, max_queued=1, cache_size=10, ttl_seconds=60)
+    release = asyncio.Event()
+
+    async def generate(*args, **kwargs):
+        await release.wait()
+        return {'days': []}
+
+    try:
+        with patch.object(jobs_module, 'generate_and_save_meal_plan', generate):
+            await queue.submit(make_job("job-a"))
+            await wait_for_status(queue, "job-a", "running")
+            await queue.submit(make_job("job-b"))
+
+            with pytest.raises(QueueFullError):
+                await queue.submit(make_job("job-c"))
+            release.set()
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_status_scoped_to_owner(persisted):
+    """Test other users can't see a job, in memory or in Supabase."""
+    queue = MealPlanJobQueue(workers=1, max_queued=10, cache_size=10, ttl_seconds=60)
+    row = {'id': 'job-db', 'user_id': 'user-1', 'status': 'succeeded', 'week_start_date': '2025-01-13'}
+
+    try:
+        with patch.object(jobs_module, 'generate_and_save_meal_plan', AsyncMock(return_value={'days': []})), \
+                patch.object(jobs_module, 'fetch_meal_plan_job', AsyncMock(return_value=row)):
+            await queue.submit(make_job("job-mem"))
+
+            assert await queue.get("job-mem", "user-2") is None
+            assert (await queue.get("job-db", "user-1"))['status'] == 'succeeded'
+            assert await queue.get("job-db", "user-2") is None
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_unfinished_jobs(persisted):
+    """Test shutdown marks running and queued jobs failed instead of leaving them pending."""
+    queue = MealPlanJobQueue(workers=1, max_queued=10, cache_size=10, ttl_seconds=60)
+
+    async def generate(*args, **kwargs):
+        await asyncio.Event().wait()  # Never finishes
+
+    with patch.object(jobs_module, 'generate_and_save_meal_plan', generate):
+        await queue.submit(make_job("job-running"))
+        await wait_for_status(queue, "job-running", "running")
+        await queue.submit(make_job("job-queued"))
+        await queue.stop()
+
+    for job_id in ("job-running", "job-queued"):
+        job = await queue.get(job_id, "user-1")
+        assert job['status'] == 'failed' and 'restart' in job['error']
+    assert {row['id'] for row in persisted if row['status'] == 'failed'} == {"job-running", "job-queued"}
@@ -0,0 +1,77 @@
+"""
+Test the meal plan progress broker.
+
+Validates:
+- Live subscribers receive events in order and stop when the generation closes
+- Late subscribers get buffered events replayed
+- Generation ids are scoped to their owner
+- Subscribers give up after the wait timeout
+"""
+
+import asyncio
+import pytest
+from api.agent.meal_plan_progress import MealPlanProgressBroker, GenerationNotFoundError, ProgressReporter
+
+
+def make_broker(wait_seconds: float = 5) -> MealPlanProgressBroker:
+    return MealPlanProgressBroker(maxsize=10, ttl_seconds=60, wait_seconds=wait_seconds)
+
+
+async def collect(broker: MealPlanProgressBroker, generation_id: str, user_id: str) -> list:
+    return [event async for event in broker.subscribe(generation_id, user_id)]
+
+
+@pytest.mark.asyncio
+async def test_live_subscriber_receives_events_until_close():
+    """Test events published after subscribing are delivered, then the stream ends."""
+    broker = make_broker()
+    subscriber = asyncio.create_task(collect(broker, "gen-1", "user-1"))
+    await asyncio.sleep(0)
+
+    broker.publish("gen-1", "user-1", {'type': 'day', 'n': 1})
+    broker.publish("gen-1", "user-1", {'type': 'day', 'n': 2})
+    broker.close("gen-1", "user-1")
+
+    events = await asyncio.wait_for(subscriber, timeout=1)
+    assert [event.get('n') for event in events] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_gets_replay():
+    """Test a subscriber joining mid-generation sees earlier days first."""
+    broker = make_broker()
+    broker.publish("gen-1", "user-1", {'type': 'day', 'n': 1})
+
+    subscriber = asyncio.create_task(collect(broker, "gen-1", "user-1"))
+    await asyncio.sleep(0)
+    broker.publish("gen-1", "user-1", {'type': 'complete'})
+    broker.close("gen-1", "user-1")
+
+    events = await asyncio.wait_for(subscriber, timeout=1)
+    assert [event['type'] for event in events] == ['day', 'complete']
+
+    # After completion the full history is still replayable
+    assert await collect(broker, "gen-1", "user-1") == events
+
+
+@pytest.mark.asyncio
+async def test_generation_scoped_to_owner():
+    """Test another user can't publish to or follow a generation."""
+    broker = make_broker()
+    broker.claim("gen-1", "user-1")
+
+    with pytest.raises(GenerationNotFoundError):
+        broker.claim("gen-1", "user-2")
+    with pytest.raises(GenerationNotFoundError):
+        await collect(broker, "gen-1", "user-2")
+
+    # The reporter swallows the error so generation itself is unaffected
+    ProgressReporter(broker, "gen-1", "user-2").publish('day')
+
+
+@pytest.mark.asyncio
+async def test_subscriber_times_out_without_generation():
+    """Test a subscription to a generation that never runs ends after the wait timeout."""
+    broker = make_broker(wait_seconds=0.05)
+
+    assert await asyncio.wait_for(collect(broker, "gen-1", "user-1"), timeout=1) == []
@@ -0,0 +1,89 @@
+"""
+Test in-process validation of generated meal plan output.
+
+Validates:
+- Wrong meal and daily totals are repaired from the foods without a retry
+- Duplicate meal ids are made unique
+- Structural problems (missing meals, wrong days, empty meals) raise ModelRetry
+- Repairs and retries are counted with their rates
+"""
+
+import pytest
+from pydantic_ai import ModelRetry
+# Models as seen by the module under test (api.models and models are separate imports)
+from api.agent.output_validation import (
+    DayChunk,
+    MealPlanDay,
+    OutputValidationMetrics,
+    validate_chunk,
+    validate_day
+)
+
+TARGETS = {"calories": 2000, "protein": 150, "carbs": 200, "fat": 67}
+
+
+def test_wrong_totals_repaired_locally(make_day):
+    """Test meal and daily totals are re-summed from foods instead of retried."""
+    metrics = OutputValidationMetrics()
+    day = validate_day(MealPlanDay.model_validate(make_day(wrong_totals=True)), "day_detail", metrics)
+
+    assert day.meals[0].totals.calories == 380
+    assert day.daily_totals.calories == 1140
+    assert day.daily_totals.protein == 39
+    assert metrics.snapshot()["day_detail"]["repaired"] == 1
+    assert metrics.snapshot()["day_detail"]["retried"] == 0
+
+
+def test_duplicate_meal_ids_made_unique(make_day):
+    """Test repeated meal ids are renamed rather than retried."""
+    raw = make_day()
+    for meal in raw["meals"]:
+        meal["id"] = "meal_001"
+    day = validate_day(MealPlanDay.model_validate(raw), "day_detail", OutputValidationMetrics())
+
+    assert len({meal.id for meal in day.meals}) == 3
+
+
+def test_missing_meals_request_retry(make_day):
+    """Test a day with too few meals asks the model to regenerate it."""
+    metrics = OutputValidationMetrics()
+    raw = make_day()
+    del raw["meals"][1:]
+    with pytest.raises(ModelRetry, match="has 1 meals"):
+        validate_day(MealPlanDay.model_validate(raw), "day_detail", metrics)
+
+    assert metrics.snapshot()["day_detail"]["retry_rate"] == 1.0
+
+
+def test_chunk_with_wrong_days_requests_retry(make_day):
+    """Test a chunk must contain exactly the requested days."""
+    chunk = DayChunk.model_validate({"daily_target": TARGETS, "days": [make_day(), make_day()]})
+
+    with pytest.raises(ModelRetry, match="expected days"):
+        validate_chunk(chunk, [("Monday", "2025-01-13"), ("Tuesday", "2025-01-14")], "day_chunk", OutputValidationMetrics())
+
+
+def test_chunk_with_wrong_dates_requests_retry(make_day):
+    """Test the requested days must come back with their requested dates."""
+    chunk = DayChunk.model_validate({
+        "daily_target": TARGETS,
+        "days": [make_day(), make_day(day_name="Tuesday", date="2025-01-21")]
+    })
+
+    with pytest.raises(ModelRetry, match="expected days"):
+        validate_chunk(chunk, [("Monday", "2025-01-13"), ("Tuesday", "2025-01-14")], "day_chunk", OutputValidationMetrics())
+
+
+def test_metrics_snapshot_rates():
+    """Test per-generator and total rates."""
+    metrics = OutputValidationMetrics()
+    metrics.record("day_chunk", repaired=True)
+    metrics.record("day_chunk")
+    metrics.record("day_chunk", retried=True)
+    metrics.record("meal")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["day_chunk"]["validated"] == 3
+    assert snapshot["day_chunk"]["retry_rate"] == round(1 / 3, 4)
+    assert snapshot["total"]["validated"] == 4
+    assert snapshot["total"]["repair_rate"] == 0.25
@@ -0,0 +1,107 @@
+"""
+Test the deterministic portion solver.
+
+Validates:
+- Over-target days are scaled down to 0-2% under every target
+- Under-target days are scaled up without exceeding targets
+- Meal and daily totals are recomputed from the scaled foods
+- Days that can't reach a macro stay under target
+"""
+
+import time
+import pytest
+from api.agent.portion_solver import scale_day_to_target, MIN_SCALE
+from api.models.meal_plan import MacroTotals, MealPlanDay
+
+TARGET = MacroTotals(calories=2000, protein=150, carbs=200, fat=67)
+
+# Per-100g macros: (calories, protein, carbs, fat)
+FOODS = {
+    "Chicken Breast": (165, 31, 0, 3.6),
+    "White Rice": (130, 2.7, 28, 0.3),
+    "Olive Oil": (884, 0, 0, 100),
+    "Oats": (389, 16.9, 66, 6.9),
+    "Greek Yogurt": (59, 10, 3.6, 0.4),
+    "Banana": (89, 1.1, 23, 0.3),
+    "Salmon": (208, 20, 0, 13),
+}
+
+
+def food(name: str, grams: float) -> dict:
+    calories, protein, carbs, fat = (value * grams / 100 for value in FOODS[name])
+    return {"name": name, "quantity_g": grams, "calories": calories, "protein": protein, "carbs": carbs, "fat": fat}
+
+
+@pytest.fixture
+def balanced_day(make_day):
+    """Factory for a three-meal day at a portion scale, with wrong totals (the solver must recompute them)."""
+    def build(scale: float) -> MealPlanDay:
+        return MealPlanDay.model_validate(make_day([
+            [food("Oats", 80 * scale), food("Greek Yogurt", 200 * scale), food("Banana", 120 * scale)],
+            [food("Chicken Breast", 180 * scale), food("White Rice", 200 * scale), food("Olive Oil", 10 * scale)],
+            [food("Salmon", 150 * scale), food("White Rice", 150 * scale), food("Olive Oil", 8 * scale)],
+        ], wrong_totals=True))
+
+    return build
+
+
+def assert_within_band(day: MealPlanDay, band: float = 0.02):
+    for macro in ("calories", "protein", "carbs", "fat"):
+        actual, target = getattr(day.daily_totals, macro), getattr(TARGET, macro)
+        assert actual <= target, f"{macro} over target: {actual} > {target}"
+        assert actual >= target * (1 - band), f"{macro} too far under: {actual} < {target}"
+
+
+def assert_totals_consistent(day: MealPlanDay):
+    for macro in ("calories", "protein", "carbs", "fat"):
+        for meal in day.meals:
+            assert abs(getattr(meal.totals, macro) - sum(getattr(f, macro) for f in meal.foods)) < 0.05
+        assert abs(getattr(day.daily_totals, macro) - sum(getattr(m.totals, macro) for m in day.meals)) < 0.05
+
+
+def test_oversized_day_scaled_down_into_band(balanced_day):
+    """Test portions that overshoot every target are brought 0-2% under."""
+    day = scale_day_to_target(balanced_day(1.6), TARGET)
+
+    assert_within_band(day)
+    assert_totals_consistent(day)
+
+
+def test_undersized_day_scaled_up_into_band(balanced_day):
+    """Test small portions are grown towards the targets."""
+    day = scale_day_to_target(balanced_day(0.7), TARGET)
+
+    assert_within_band(day)
+    assert_totals_consistent(day)
+
+
+def test_food_macros_scale_with_quantity(balanced_day):
+    """Test each food keeps its macro density after rescaling."""
+    original = balanced_day(1.3)
+    scaled = scale_day_to_target(original, TARGET)
+
+    for before, after in zip(original.meals[1].foods, scaled.meals[1].foods):
+        ratio = after.quantity_g / before.quantity_g
+        assert ratio >= MIN_SCALE
+        assert abs(after.calories - before.calories * ratio) <= 0.2
+
+
+def test_unreachable_macro_stays_under_target(make_day):
+    """Test a day without fat sources never exceeds any target."""
+    day = scale_day_to_target(MealPlanDay.model_validate(make_day([
+        [food("Chicken Breast", 200), food("White Rice", 300)],
+        [food("Greek Yogurt", 300), food("Banana", 200)],
+    ], wrong_totals=True)), TARGET)
+
+    for macro in ("calories", "protein", "carbs", "fat"):
+        assert getattr(day.daily_totals, macro) <= getattr(TARGET, macro)
+    assert_totals_consistent(day)
+
+
+def test_solver_is_fast(balanced_day):
+    """Test a day is solved in milliseconds."""
+    day = balanced_day(1.4)
+    started = time.perf_counter()
+    for _ in range(50):
+        scale_day_to_target(day, TARGET)
+    assert (time.perf_counter() - started) / 50 < 0.01
@@ -0,0 +1,60 @@
+"""
+Test the compact meal plan prompt builder.
+
+Validates:
+- Targets are stated once, on one line
+- Favorites are deduplicated, capped and tabulated per 100g
+- Requested days keep the format the chunk output validator parses
+- A week of chunk prompts stays within the input token budget
+"""
+
+from api.agent.meal_plan_generator import DAY_CHUNK_SYSTEM_PROMPT, assign_day_themes, plan_chunks
+from api.agent.prompt_builder import (
+    MAX_PROMPT_FAVORITES,
+    build_chunk_prompt,
+    estimate_request_tokens,
+    format_favorites
+)
+
+TARGETS = {'calories': 2000, 'protein': 150, 'carbs': 200, 'fat': 67.0}
+FAVORITES = [
+    {'name': f"Food {i}", 'calories_per_100g': 150 + i, 'protein_per_100g': 20.5,
+     'carbs_per_100g': 3.0, 'fat_per_100g': 7.25}
+    for i in range(15)
+]
+PREFERENCES = "Eggs every breakfast, no pork, spicy food welcome"
+
+# Estimated input tokens (system + user prompt) for a whole week of chunks
+WEEK_PROMPT_TOKEN_BUDGET = 1800
+
+
+def test_targets_and_days_stated_once():
+    days = [("Monday", "2025-01-13", "Mediterranean"), ("Tuesday", "2025-01-14", None)]
+    prompt = build_chunk_prompt(TARGETS, [], days)
+
+    assert prompt.count("2000 kcal") == 1
+    assert "P 150g, C 200g, F 67g" in prompt
+    assert "- Monday (2025-01-13): Mediterranean\n" in prompt
+    assert "- Tuesday (2025-01-14)\n" in prompt
+    assert "Favorite foods" not in prompt
+
+
+def test_favorites_table_deduplicated_and_capped():
+    section = format_favorites([FAVORITES[0], {**FAVORITES[0], 'name': "food 0 "}] + FAVORITES[1:])
+
+    rows = section.strip().splitlines()[1:]
+    assert rows[0] == "Food 0|150|20.5|3|7.25"
+    assert len(rows) == MAX_PROMPT_FAVORITES
+    assert format_favorites([]) == ""
+
+
+def test_week_of_chunk_prompts_within_token_budget():
+    themes = assign_day_themes("2025-01-13")
+    total = 0
+    for chunk in plan_chunks(TARGETS, FAVORITES):
+        days = [(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"][idx],
+                 f"2025-01-{13 + idx}", themes[idx]) for idx in chunk]
+        prompt = build_chunk_prompt(TARGETS, FAVORITES, days, PREFERENCES)
+        total += estimate_request_tokens(DAY_CHUNK_SYSTEM_PROMPT, prompt)
+
+    assert total <= WEEK_PROMPT_TOKEN_BUDGET
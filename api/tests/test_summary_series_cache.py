@@ -0,0 +1,137 @@
+"""
+Test the per-user daily_summary series cache.
+
+Validates:
+- 7/30/90-day windows are served from one fetch
+- Refreshes fetch only the days from the last sync on and append them
+- Change events for the current day refresh; older days force a full reload
+- Events racing a load aren't cached; longer windows extend the entry
+"""
+
+import pytest
+from datetime import date, timedelta
+from api.database import summary_series_cache as cache_module
+from api.database.queries import fetch_pattern_summary, fetch_weekly_summary
+from api.database.summary_series_cache import SummarySeriesCache
+from api.utils.analytics import SummarySeries, weekly_stats
+from api.utils.date_helpers import get_date_n_days_ago, get_today_utc
+
+
+class FakeLoader:
+    """Stand-in for fetch_summary_rows over an in-memory daily_summary table."""
+
+    def __init__(self, today: str, days: int = 120):
+        self.rows = {}
+        self.calls = []
+        for i in range(days + 1):
+            self.write((date.fromisoformat(today) - timedelta(days=i)).isoformat(), 100 + i % 60)
+
+    def write(self, day: str, protein: float) -> None:
+        self.rows[day] = {
+            'date': day,
+            'total_calories': 1900,
+            'total_protein': protein,
+            'total_carbs': 190,
+            'total_fat': 60,
+            'calories_target': 2000,
+            'protein_target': 150,
+            'carbs_target': 200,
+            'fat_target': 65,
+            'has_logged': True
+        }
+
+    async def __call__(self, start_date: str) -> list[dict]:
+        self.calls.append(start_date)
+        return [dict(row) for day, row in sorted(self.rows.items(), reverse=True) if day >= start_date]
+
+
+def make_cache(clock) -> SummarySeriesCache:
+    return SummarySeriesCache(maxsize=10, days=90, ttl_seconds=3600, refresh_seconds=10, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_windows_served_from_one_fetch(clock):
+    cache = make_cache(clock)
+    load = FakeLoader(get_today_utc())
+
+    weekly = await fetch_weekly_summary(None, "user-1", 7, await cache.get("user-1", 7, load))
+    pattern = await fetch_pattern_summary(None, "user-1", 90, "macro_consistency", await cache.get("user-1", 90, load))
+    monthly = await fetch_weekly_summary(None, "user-1", 30, await cache.get("user-1", 30, load))
+
+    assert load.calls == [get_date_n_days_ago(90)]
+    expected = [row for day, row in sorted(load.rows.items()) if day >= get_date_n_days_ago(7)]
+    assert weekly == {'period': 'Last 7 days', **weekly_stats(SummarySeries.from_rows(expected))}
+    assert monthly['days_analyzed'] == 31
+    assert pattern['pattern_type'] == 'macro_consistency'
+
+
+@pytest.mark.asyncio
+async def test_refresh_appends_newest_days(monkeypatch, clock):
+    cache = make_cache(clock)
+    monkeypatch.setattr(cache_module, 'get_today_utc', lambda: '2025-03-10')
+    load = FakeLoader('2025-03-10')
+
+    await cache.get("user-1", 30, load)
+    clock.now = 5
+    await cache.get("user-1", 30, load)
+    assert load.calls == ['2024-12-10']  # Within the refresh interval
+
+    monkeypatch.setattr(cache_module, 'get_today_utc', lambda: '2025-03-11')
+    load.write('2025-03-10', 175)
+    load.write('2025-03-11', 180)
+    series = await cache.get("user-1", 30, load)
+
+    assert load.calls == ['2024-12-10', '2025-03-10']
+    assert str(series.dates[0]) == '2024-12-11' and str(series.dates[-1]) == '2025-03-11'
+    assert list(series.protein[-2:]) == [175, 180]
+
+
+@pytest.mark.asyncio
+async def test_change_events_refresh_today_and_reload_older_days(clock, summary_change):
+    cache = make_cache(clock)
+    cache.live = True
+    today = get_today_utc()
+    load = FakeLoader(today)
+
+    await cache.get("user-1", 30, load)
+    series = await cache.get("user-1", 30, load)
+    assert len(load.calls) == 1 and len(series) == 91
+
+    cache.handle_change(summary_change("user-1", today))
+    await cache.get("user-1", 30, load)
+    assert load.calls[-1] == today
+
+    cache.handle_change(summary_change("user-1", get_date_n_days_ago(3)))
+    await cache.get("user-1", 30, load)
+    assert load.calls[-1] == get_date_n_days_ago(90)
+    assert len(load.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_event_during_load_is_not_cached(clock, summary_change):
+    cache = make_cache(clock)
+    cache.live = True
+    load = FakeLoader(get_today_utc())
+
+    async def racing_load(start_date):
+        cache.handle_change(summary_change("user-1", get_today_utc()))
+        return await load(start_date)
+
+    await cache.get("user-1", 30, racing_load)
+    await cache.get("user-1", 30, load)
+
+    assert len(load.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_longer_window_extends_entry(clock):
+    cache = make_cache(clock)
+    cache.live = True
+    load = FakeLoader(get_today_utc())
+
+    await cache.get("user-1", 30, load)
+    series = await cache.get("user-1", 100, load)
+    await cache.get("user-1", 100, load)
+
+    assert load.calls == [get_date_n_days_ago(90), get_date_n_days_ago(100)]
+    assert len(series) == 101
@@ -0,0 +1,132 @@
+"""
+Test the realtime-invalidated today summary cache.
+
+Validates:
+- Repeated reads cost one load
+- daily_summary change events drop only the affected user's entry
+- Without a live realtime channel entries expire after the fallback TTL
+- Losing the channel clears entries; events racing a load aren't cached
+- start_realtime subscribes to daily_summary changes (local stand-in client)
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+from api.database.today_summary_cache import TodaySummaryCache
+
+SUMMARY = {'date': '2025-01-15', 'total_calories': 1200, 'calories_target': 2000, 'has_logged': True}
+
+
+class FakeChannel:
+    """Stand-in for a realtime channel: records the callbacks it is given."""
+
+    def __init__(self):
+        self.changes = []
+
+    def on_postgres_changes(self, event, callback, table=None, schema=None):
+        self.changes.append((event, table, schema, callback))
+        return self
+
+    async def subscribe(self, callback):
+        callback("SUBSCRIBED", None)
+        return self
+
+
+class FakeClient:
+    def __init__(self):
+        self.channels = {}
+
+    def channel(self, topic):
+        return self.channels.setdefault(topic, FakeChannel())
+
+    async def remove_channel(self, channel):
+        self.channels = {topic: c for topic, c in self.channels.items() if c is not channel}
+
+
+def make_cache(clock) -> TodaySummaryCache:
+    return TodaySummaryCache(maxsize=10, ttl_seconds=300, fallback_ttl_seconds=10, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_load_once(clock):
+    cache = make_cache(clock)
+    load = AsyncMock(return_value=SUMMARY)
+
+    first = await cache.get("user-1", load)
+    second = await cache.get("user-1", load)
+
+    assert first == second == SUMMARY
+    assert load.await_count == 1
+    first['total_calories'] = 0  # Callers get copies
+    assert (await cache.get("user-1", load))['total_calories'] == 1200
+
+
+@pytest.mark.asyncio
+async def test_change_event_invalidates_only_that_user(clock, summary_change):
+    cache = make_cache(clock)
+    cache.live = True
+    load = AsyncMock(return_value=SUMMARY)
+    await cache.get("user-1", load)
+    await cache.get("user-2", load)
+
+    cache.handle_change(summary_change("user-1"))
+    await cache.get("user-1", load)
+    await cache.get("user-2", load)
+
+    assert load.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fallback_ttl_without_realtime(clock):
+    cache = make_cache(clock)
+    load = AsyncMock(return_value=SUMMARY)
+
+    await cache.get("user-1", load)
+    clock.now = 11
+    await cache.get("user-1", load)
+    assert load.await_count == 2
+
+    cache.handle_status("SUBSCRIBED")
+    clock.now = 200
+    await cache.get("user-1", load)
+    assert load.await_count == 2
+
+    cache.handle_status("CLOSED")
+    await cache.get("user-1", load)
+    assert load.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_event_during_load_is_not_cached(clock, summary_change):
+    cache = make_cache(clock)
+    cache.live = True
+
+    async def racing_load():
+        cache.handle_change(summary_change("user-1"))
+        return SUMMARY
+
+    await cache.get("user-1", racing_load)
+    load = AsyncMock(return_value=SUMMARY)
+    await cache.get("user-1", load)
+
+    assert load.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_start_realtime_subscribes_to_daily_summary(clock, summary_change):
+    cache = make_cache(clock)
+    client = FakeClient()
+
+    await cache.start_realtime(client)
+    (channel,) = client.channels.values()
+    (event, table, schema, callback) = channel.changes[0]
+    assert (event, table, schema) == ("*", "daily_summary", "public")
+    assert cache.live
+
+    load = AsyncMock(return_value=SUMMARY)
+    await cache.get("user-1", load)
+    callback(summary_change("user-1"))
+    await cache.get("user-1", load)
+    assert load.await_count == 2
+
+    await cache.stop_realtime(client)
+    assert not cache.live and not client.channels
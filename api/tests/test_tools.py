@@ -12,10 +12,22 @@ Validates:
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import asyncio
-from api.database.queries import fetch_today_summary, fetch_weekly_summary, fetch_pattern_summary
+from api.database.queries import fetch_today_summary, fetch_weekly_summary, fetch_pattern_summary, update_meal_plan_day
+from api.agent import tools
 from api.agent.coach_agent import nutrition_coach
 from api.agent.dependencies import CoachAgentDependencies
 from pydantic_ai.models.test import TestModel
+from postgrest.exceptions import APIError
+
+
+@pytest.fixture(autouse=True)
+def empty_summary_caches():
+    """Tools read summaries through caches; start each test without cached summaries."""
+    tools.today_summary_cache.clear()
+    tools.summary_series_cache.clear()
+    yield
+    tools.today_summary_cache.clear()
+    tools.summary_series_cache.clear()
 
 
 # ====================
@@ -159,6 +171,129 @@ async def test_fetch_pattern_summary_insufficient_data(mock_supabase, test_user_
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_fetch_weekly_summary_uses_stats_rpc(mock_supabase, test_user_id):
+    """Test weekly stats come pre-aggregated from one RPC call."""
+    stats = {'days_analyzed': 7, 'days_logged': 6, 'avg_protein': 141.5, 'consistency_rate': 6 / 7,
+             'best_protein_day': '2025-01-14', 'worst_protein_day': '2025-01-18'}
+    mock_supabase.rpc = MagicMock()
+    mock_supabase.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=stats))
+
+    result = await fetch_weekly_summary(mock_supabase, test_user_id, 7)
+
+    name, params = mock_supabase.rpc.call_args.args
+    assert name == 'weekly_summary_stats'
+    assert params['p_user_id'] == test_user_id
+    assert result == {'period': 'Last 7 days', **stats}
+    mock_supabase.table.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_pattern_summary_applies_minimum_data_to_rpc_stats(mock_supabase, test_user_id):
+    """Test pattern stats need 7 days, both day groups, and 3 logged days for consistency."""
+    weekday_weekend = {'row_count': 30, 'weekday_count': 22, 'weekend_count': 8,
+                       'weekday_avg_calories': 1900.0, 'weekend_avg_calories': 2200.0}
+    mock_supabase.rpc = MagicMock()
+    execute = mock_supabase.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=weekday_weekend))
+
+    result = await fetch_pattern_summary(mock_supabase, test_user_id, 30, "weekday_weekend")
+    assert result == {'pattern_type': 'weekday_weekend', **{k: v for k, v in weekday_weekend.items() if k != 'row_count'}}
+    assert mock_supabase.rpc.call_args.args[1]['p_kind'] == 'weekday_weekend'
+
+    execute.return_value = MagicMock(data={**weekday_weekend, 'row_count': 6})
+    assert await fetch_pattern_summary(mock_supabase, test_user_id, 30, "weekday_weekend") is None
+
+    execute.return_value = MagicMock(data={**weekday_weekend, 'weekend_count': 0})
+    assert await fetch_pattern_summary(mock_supabase, test_user_id, 30, "weekday_weekend") is None
+
+    execute.return_value = MagicMock(data={'row_count': 10, 'logged_count': 2, 'protein_std': 4.0})
+    assert await fetch_pattern_summary(mock_supabase, test_user_id, 30, "macro_consistency") is None
+
+
+@pytest.mark.asyncio
+async def test_summary_stats_fall_back_to_rows_without_rpc(mock_supabase, test_user_id, sample_weekly_data, sample_pattern_data):
+    """Test the Python aggregation is used when summary_stats.sql isn't applied."""
+    mock_supabase.rpc = MagicMock()
+    mock_supabase.rpc.return_value.execute = AsyncMock(
+        side_effect=APIError({'code': 'PGRST202', 'message': 'Could not find the function'})
+    )
+    mock_supabase.table = MagicMock()
+    query = mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.order.return_value
+    query.execute = AsyncMock(return_value=MagicMock(data=sample_weekly_data))
+
+    weekly = await fetch_weekly_summary(mock_supabase, test_user_id, 7)
+    assert weekly['days_analyzed'] == 7
+    assert weekly['avg_protein'] == 145
+    assert weekly['best_protein_day'] == sample_weekly_data[-1]['date']
+
+    query.execute = AsyncMock(return_value=MagicMock(data=sample_pattern_data))
+    pattern = await fetch_pattern_summary(mock_supabase, test_user_id, 30, "macro_consistency")
+    assert pattern['pattern_type'] == 'macro_consistency'
+    assert pattern['protein_std'] > 0 and 135 < pattern['protein_avg'] < 140
+
+
+@pytest.mark.asyncio
+async def test_fetch_pattern_summary_weekly_trend(mock_supabase, test_user_id, sample_pattern_data):
+    """Test weekly_trend is computed from the rows (the pattern_stats RPC doesn't cover it)."""
+    mock_supabase.rpc = MagicMock()
+    mock_supabase.table = MagicMock()
+    query = mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.order.return_value
+    query.execute = AsyncMock(return_value=MagicMock(data=sample_pattern_data))
+
+    result = await fetch_pattern_summary(mock_supabase, test_user_id, 30, "weekly_trend")
+
+    mock_supabase.rpc.assert_not_called()
+    assert result['pattern_type'] == 'weekly_trend'
+    assert len(result['weeks']) == 4
+    assert all(week['days_logged'] == 7 for week in result['weeks'])
+    assert result['protein_wow_delta'] == 0  # Every week has 5 weekdays and 2 weekend days
+
+    query.execute = AsyncMock(return_value=MagicMock(data=sample_pattern_data[:10]))
+    assert await fetch_pattern_summary(mock_supabase, test_user_id, 30, "weekly_trend") is None
+
+
+@pytest.mark.asyncio
+async def test_update_meal_plan_day_uses_partial_update_rpc(mock_supabase, test_user_id):
+    """Test update_meal_plan_day replaces one day via RPC without reading the plan."""
+    mock_response = MagicMock()
+    mock_response.data = [{'week_start_date': '2025-01-13', 'plan_data': {'days': []}}]
+    mock_supabase.rpc = MagicMock()
+    mock_supabase.rpc.return_value.execute = AsyncMock(return_value=mock_response)
+
+    day = {'date': '2025-01-15', 'day_name': 'Wednesday', 'meals': []}
+    result = await update_meal_plan_day(mock_supabase, test_user_id, '2025-01-13', 2, day)
+
+    assert result == mock_response.data[0]
+    mock_supabase.rpc.assert_called_once_with('update_meal_plan_day', {
+        'p_user_id': test_user_id,
+        'p_week_start_date': '2025-01-13',
+        'p_day_index': 2,
+        'p_day': day
+    })
+    mock_supabase.table.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_meal_plan_day_rewrites_plan_without_rpc(mock_supabase, test_user_id):
+    """Test update_meal_plan_day falls back to read-modify-write when the RPC isn't deployed."""
+    mock_supabase.rpc = MagicMock()
+    mock_supabase.rpc.return_value.execute = AsyncMock(
+        side_effect=APIError({'code': 'PGRST202', 'message': 'Could not find the function'})
+    )
+    existing = {'plan_data': {'days': [{'day_name': name} for name in ('Monday', 'Tuesday', 'Wednesday')]}}
+    save = AsyncMock(return_value={'week_start_date': '2025-01-13'})
+
+    day = {'date': '2025-01-15', 'day_name': 'Wednesday', 'meals': []}
+    with patch('api.database.queries.get_meal_plan', AsyncMock(return_value=existing)), \
+            patch('api.database.queries.save_meal_plan', save):
+        result = await update_meal_plan_day(mock_supabase, test_user_id, '2025-01-13', 2, day)
+
+    assert result == {'week_start_date': '2025-01-13'}
+    saved_plan = save.call_args[0][3]
+    assert saved_plan['days'][2] == day
+    assert saved_plan['days'][0] == {'day_name': 'Monday'}
+
+
 # ====================
 # Tool Integration Tests
 # ====================
@@ -0,0 +1,236 @@
+"""
+Vectorized statistics over daily_summary rows.
+
+Rows are read once into NumPy column arrays (SummarySeries); every metric is
+then an array reduction instead of another pass over the row dicts. The
+results match the weekly_summary_stats and pattern_stats RPCs in
+database/summary_stats.sql and are used when those aren't available.
+"""
+
+from dataclasses import dataclass, fields
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Optional
+import numpy as np
+
+# daily_summary columns loaded from each row (has_logged is stored as 0/1)
+_COLUMNS = (
+    'total_calories',
+    'total_protein',
+    'total_carbs',
+    'total_fat',
+    'calories_target',
+    'protein_target',
+    'carbs_target',
+    'has_logged',
+)
+_get_columns = itemgetter(*_COLUMNS)
+
+# 1970-01-01 was a Thursday (weekday 3 with Monday = 0)
+_EPOCH_WEEKDAY = 3
+
+
+@dataclass(frozen=True)
+class SummarySeries:
+    """daily_summary rows as column arrays (one element per day, in row order)."""
+    dates: np.ndarray  # datetime64[D]
+    calories: np.ndarray
+    protein: np.ndarray
+    carbs: np.ndarray
+    fat: np.ndarray
+    calories_target: np.ndarray
+    protein_target: np.ndarray
+    carbs_target: np.ndarray
+    logged: np.ndarray  # bool
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "SummarySeries":
+        """Load rows into column arrays (missing or null values count as 0 / not logged)."""
+        try:
+            # Fast path: one flat pass straight into a (days, columns) matrix
+            flat = chain.from_iterable(map(_get_columns, rows))
+            matrix = np.fromiter(flat, dtype=np.float64, count=len(rows) * len(_COLUMNS))
+        except (KeyError, TypeError):
+            matrix = np.array([[row.get(name) or 0 for name in _COLUMNS] for row in rows], dtype=np.float64)
+        columns = matrix.reshape(len(rows), len(_COLUMNS)).T
+
+        return cls(
+            dates=np.array([row['date'] for row in rows], dtype='datetime64[D]'),
+            calories=columns[0],
+            protein=columns[1],
+            carbs=columns[2],
+            fat=columns[3],
+            calories_target=columns[4],
+            protein_target=columns[5],
+            carbs_target=columns[6],
+            logged=columns[7] != 0
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def since(self, start_date: str) -> "SummarySeries":
+        """Days on or after start_date (YYYY-MM-DD)."""
+        mask = self.dates >= np.datetime64(start_date)
+        return SummarySeries(**{field.name: getattr(self, field.name)[mask] for field in fields(self)})
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """Day of week per row (Monday = 0 ... Sunday = 6)."""
+        return (self.dates.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+
+
+def _mean(values: np.ndarray) -> Optional[float]:
+    return float(values.mean()) if len(values) else None
+
+
+def _stdev(values: np.ndarray) -> Optional[float]:
+    """Sample standard deviation (as statistics.stdev / STDDEV_SAMP)."""
+    return float(values.std(ddof=1)) if len(values) >= 2 else None
+
+
+def _extreme_day(series: SummarySeries, values: np.ndarray, highest: bool) -> str:
+    """Date of the highest/lowest value; ties go to the most recent day."""
+    target = values.max() if highest else values.min()
+    return str(series.dates[values == target].max())
+
+
+def weekly_stats(series: SummarySeries) -> Dict:
+    """
+    Averages, logging consistency, target hit rates and best/worst protein days.
+
+    Args:
+        series: Days to summarize
+
+    Returns:
+        Stats dict ({'days_analyzed': 0} for an empty series)
+    """
+    days = len(series)
+    if not days:
+        return {'days_analyzed': 0}
+
+    days_logged = int(series.logged.sum())
+    return {
+        'days_analyzed': days,
+        'avg_calories': float(series.calories.mean()),
+        'avg_protein': float(series.protein.mean()),
+        'avg_carbs': float(series.carbs.mean()),
+        'avg_fat': float(series.fat.mean()),
+        'days_logged': days_logged,
+        'consistency_rate': days_logged / days,
+        'protein_target_hit_rate': float((series.protein >= series.protein_target).mean()),
+        'carbs_target_hit_rate': float((series.carbs <= series.carbs_target * 1.1).mean()),
+        'calories_target_hit_rate': float((np.abs(series.calories - series.calories_target) <= 100).mean()),
+        'best_protein_day': _extreme_day(series, series.protein, highest=True),
+        'worst_protein_day': _extreme_day(series, series.protein, highest=False)
+    }
+
+
+def weekday_weekend_stats(series: SummarySeries) -> Dict:
+    """Mon-Fri vs Sat-Sun day counts, averages and logging rates (averages None for an empty group)."""
+    weekday = series.weekdays < 5
+    stats = {
+        'row_count': len(series),
+        'weekday_count': int(weekday.sum()),
+        'weekend_count': int((~weekday).sum())
+    }
+    for group, mask in (('weekday', weekday), ('weekend', ~weekday)):
+        stats[f'{group}_avg_calories'] = _mean(series.calories[mask])
+        stats[f'{group}_avg_protein'] = _mean(series.protein[mask])
+        stats[f'{group}_avg_carbs'] = _mean(series.carbs[mask])
+        stats[f'{group}_logged'] = _mean(series.logged[mask])
+    return stats
+
+
+def macro_consistency_stats(series: SummarySeries) -> Dict:
+    """Sample standard deviation and mean of each macro over logged days."""
+    logged = series.logged
+    stats = {'row_count': len(series), 'logged_count': int(logged.sum())}
+    for macro in ('protein', 'carbs', 'fat'):
+        values = getattr(series, macro)[logged]
+        stats[f'{macro}_std'] = _stdev(values)
+        stats[f'{macro}_avg'] = _mean(values)
+    return stats
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every run of `window` consecutive values, from a single cumulative sum."""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    return cumulative[window:] - cumulative[:-window]
+
+
+def _slope(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Least-squares slope of y against x (None for fewer than 2 points)."""
+    if len(x) < 2:
+        return None
+    x = x - x.mean()
+    return float((x * (y - y.mean())).sum() / (x * x).sum())
+
+
+def weekly_trend_stats(series: SummarySeries, window: int = 7) -> Dict:
+    """
+    Rolling 7-day means per macro, their trend, and week-over-week deltas.
+
+    Days are laid out on a calendar axis (days without a row count as not
+    logged) and averaged over logged days only. Every window sum comes from
+    one cumulative sum, so the cost stays O(days) for any period length.
+
+    Args:
+        series: Days to analyze, in any order
+        window: Days per window (default 7)
+
+    Returns:
+        Stats dict with, per macro, the latest rolling mean ({macro}_7d_avg),
+        the slope of the rolling mean ({macro}_slope_per_week, units per
+        week) and the change between the last two full weeks
+        ({macro}_wow_delta); plus 'weeks', the non-overlapping weeks ending
+        on the last day, oldest first (None where nothing was logged)
+    """
+    stats = {'row_count': len(series), 'logged_count': int(series.logged.sum()), 'weeks': []}
+    first_day = series.dates.min() if len(series) else np.datetime64('1970-01-01')
+    offsets = (series.dates - first_day).astype(np.int64)
+    span = int(offsets.max()) + 1 if len(series) else 0
+
+    logged = np.zeros(span)
+    logged[offsets] = series.logged
+    counts = _window_sums(logged, window)
+    has_data = counts > 0
+    window_days = np.flatnonzero(has_data)
+
+    means = {}
+    for macro in ('calories', 'protein', 'carbs', 'fat'):
+        daily = np.zeros(span)
+        daily[offsets] = np.where(series.logged, getattr(series, macro), 0.0)
+        sums = _window_sums(daily, window)
+        means[macro] = np.divide(sums, counts, out=np.full(len(sums), np.nan), where=has_data)
+
+        slope = _slope(window_days, means[macro][has_data])
+        stats[f'{macro}_7d_avg'] = float(means[macro][-1]) if has_data.size and has_data[-1] else None
+        stats[f'{macro}_slope_per_week'] = slope * 7 if slope is not None else None
+
+    # Non-overlapping weeks: every window-th rolling window, counted back from the last day
+    week_starts = np.arange(len(counts) - 1, -1, -window)[::-1]
+    week_ends = (first_day + week_starts + (window - 1)).astype(str).tolist()
+    week_means = {
+        macro: [None if np.isnan(value) else value for value in values[week_starts].tolist()]
+        for macro, values in means.items()
+    }
+    for i, (end_date, days_logged) in enumerate(zip(week_ends, counts[week_starts].astype(int).tolist())):
+        week = {'end_date': end_date, 'days_logged': days_logged}
+        for macro, values in week_means.items():
+            week[f'avg_{macro}'] = values[i]
+        stats['weeks'].append(week)
+
+    previous, last = stats['weeks'][-2:] if len(stats['weeks']) >= 2 else ({}, {})
+    for macro in means:
+        current, before = last.get(f'avg_{macro}'), previous.get(f'avg_{macro}')
+        stats[f'{macro}_wow_delta'] = current - before if current is not None and before is not None else None
+    return stats
+
+
+# Pattern type -> stats function
+PATTERN_STATS = {
+    'weekday_weekend': weekday_weekend_stats,
+    'weekly_trend': weekly_trend_stats,
+    'macro_consistency': macro_consistency_stats,
+}
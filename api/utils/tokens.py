@@ -0,0 +1,27 @@
+"""
+Local token-count estimates (no tokenizer download or API call).
+"""
+
+import math
+
+# Average characters per token for English text and JSON on Claude/GPT tokenizers
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text.
+
+    Uses a characters-per-token heuristic, which is accurate to roughly
+    +/-15% for English prose and compact JSON and is cheap enough to call on
+    every request.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
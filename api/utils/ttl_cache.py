@@ -0,0 +1,85 @@
+"""
+Bounded in-process cache with per-entry time-to-live and LRU eviction.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Least-recently-used cache whose entries expire after a fixed TTL.
+
+    Not thread-safe; intended for use from a single asyncio event loop.
+
+    Args:
+        maxsize: Maximum number of entries before the least recently used is evicted
+        ttl_seconds: Lifetime of each entry in seconds (None = never expires)
+        clock: Monotonic time source (overridable for tests)
+        on_evict: Called with (key, value) when an entry is dropped for space or expiry
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: Optional[float],
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[K, V], None]] = None
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._on_evict = on_evict
+        self._data: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        expires_at = float("inf") if self.ttl_seconds is None else self._clock() + self.ttl_seconds
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            evicted_key, (_, evicted) = self._data.popitem(last=False)
+            if self._on_evict is not None:
+                self._on_evict(evicted_key, evicted)
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        """Remove key and return its value (expired entries return default)."""
+        entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,82 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { createServerSupabaseClient } from '@/lib/supabase/server';
+
+/**
+ * GET /api/ai/meal-plan-jobs/[id]
+ * Returns the status of a background meal plan job (proxied to the Python backend)
+ */
+export async function GET(
+  request: NextRequest,
+  { params }: { params: Promise<{ id: string }> }
+) {
+  try {
+    const { id } = await params;
+
+    // 1. Authenticate user
+    const supabase = await createServerSupabaseClient();
+    const {
+      data: { user },
+      error: authError,
+    } = await supabase.auth.getUser();
+
+    if (authError || !user) {
+      return NextResponse.json(
+        { error: 'Unauthorized', message: 'You must be logged in to check meal plans' },
+        { status: 401 }
+      );
+    }
+
+    // 2. Get session for access token
+    const { data: { session } } = await supabase.auth.getSession();
+    if (!session) {
+      return NextResponse.json(
+        { error: 'No active session', message: 'Please sign in again' },
+        { status: 401 }
+      );
+    }
+
+    // 3. Call Python backend (it only returns jobs owned by this user)
+    const pythonUrl = process.env.NODE_ENV === 'development'
+      ? 'http://127.0.0.1:8000'
+      : process.env.PYTHON_API_URL;
+
+    if (!pythonUrl) {
+      console.error('Python API URL not configured');
+      return NextResponse.json(
+        { error: 'Configuration error', message: 'Backend service not configured' },
+        { status: 500 }
+      );
+    }
+
+    const pythonResponse = await fetch(
+      `${pythonUrl}/api/meal-plan-jobs/${encodeURIComponent(id)}`,
+      {
+        headers: { 'Authorization': `Bearer ${session.access_token}` },
+        cache: 'no-store',
+      }
+    );
+
+    if (!pythonResponse.ok) {
+      const errorText = await pythonResponse.text();
+      console.error('Python API error:', errorText);
+      return NextResponse.json(
+        {
+          error: 'Backend error',
+          message: pythonResponse.status === 404
+            ? 'Meal plan job not found'
+            : 'Failed to get meal plan status',
+        },
+        { status: pythonResponse.status }
+      );
+    }
+
+    return NextResponse.json(await pythonResponse.json());
+
+  } catch (error) {
+    console.error('Error in meal plan job API route:', error);
+    return NextResponse.json(
+      { error: 'Internal server error', message: 'An unexpected error occurred' },
+      { status: 500 }
+    );
+  }
+}
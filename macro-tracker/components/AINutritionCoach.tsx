@@ -6,7 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { cn } from '@/lib/utils';
 import { useRealtimeMacros } from '@/lib/hooks/useRealtimeMacros';
-import { sendChatMessage } from '@/lib/services/nutritionCoach';
+import { sendChatMessage, waitForMealPlanJob } from '@/lib/services/nutritionCoach';
 import { ChatMessage, QuickAction, MealPlan } from '@/types/chat';
 import {
   Bot,
@@ -134,6 +134,27 @@ export function AINutritionCoach({ open, onOpenChange }: AINutritionCoachProps)
   const hasData = current.calories > 0 || current.protein > 0;
   const quickActions = hasData ? dataQuickActions : educationalQuickActions;
 
+  // Background meal plan jobs finish after the chat turn; report the result when they do
+  const followMealPlanJob = async (jobId: string) => {
+    let content: string;
+    try {
+      const job = await waitForMealPlanJob(jobId);
+      if (job.status === 'succeeded' && job.meal_plan) {
+        setCurrentMealPlan(job.meal_plan);
+        content = `✅ Your meal plan starting ${job.week_start} is ready! View it at: /meal-plans`;
+      } else {
+        content = job.error || 'I encountered an error generating your meal plan. Please try again.';
+      }
+    } catch (err) {
+      content = err instanceof Error ? err.message : 'Failed to check your meal plan status';
+    }
+
+    setMessages((prev) => [
+      ...prev,
+      { id: `${jobId}-done`, role: 'assistant', content, timestamp: Date.now() },
+    ]);
+  };
+
   const handleSend = async (messageText?: string) => {
     const textToSend = messageText || input;
     if (!textToSend.trim() || loading) return;
@@ -164,9 +185,11 @@ export function AINutritionCoach({ open, onOpenChange }: AINutritionCoachProps)
       setMessages((prev) => [...prev, aiMessage]);
       setConversationHistory(response.conversation_history);
 
-      // Store meal plan if generated
+      // Store meal plan if generated inline, or follow the queued job
       if (response.meal_plan) {
         setCurrentMealPlan(response.meal_plan);
+      } else if (response.meal_plan_job_id) {
+        void followMealPlanJob(response.meal_plan_job_id);
       }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to send message');
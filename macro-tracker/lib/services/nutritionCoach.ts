@@ -3,7 +3,7 @@
  * Handles communication with Next.js API route
  */
 
-import { ChatResponse } from '@/types/chat';
+import { ChatResponse, MealPlanJob } from '@/types/chat';
 
 /**
  * Send a chat message to the AI nutrition coach
@@ -34,3 +34,47 @@ export async function sendChatMessage(
 
   return response.json();
 }
+
+/**
+ * Get the status of a background meal plan job
+ *
+ * @param jobId - meal_plan_job_id from a chat response
+ * @returns Promise with the job status (including the meal plan once succeeded)
+ */
+export async function getMealPlanJob(jobId: string): Promise<MealPlanJob> {
+  const response = await fetch(`/api/ai/meal-plan-jobs/${encodeURIComponent(jobId)}`);
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ message: 'Failed to get meal plan status' }));
+    throw new Error(error.message || `HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Poll a background meal plan job until it succeeds or fails
+ *
+ * @param jobId - meal_plan_job_id from a chat response
+ * @param intervalMs - Delay between polls
+ * @param timeoutMs - Give up after this long
+ * @returns Promise with the finished job
+ */
+export async function waitForMealPlanJob(
+  jobId: string,
+  intervalMs = 3000,
+  timeoutMs = 5 * 60 * 1000
+): Promise<MealPlanJob> {
+  const deadline = Date.now() + timeoutMs;
+
+  while (true) {
+    const job = await getMealPlanJob(jobId);
+    if (job.status === 'succeeded' || job.status === 'failed') {
+      return job;
+    }
+    if (Date.now() > deadline) {
+      throw new Error('Meal plan generation is taking longer than expected. Check /meal-plans shortly.');
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
@@ -21,7 +21,18 @@ export interface ChatResponse {
     output_tokens: number;
     total_tokens: number;
   };
-  meal_plan?: MealPlan;  // Optional generated meal plan
+  meal_plan?: MealPlan;  // Optional generated meal plan (inline generation only)
+  meal_plan_job_id?: string;  // Background meal plan job queued this turn (poll with getMealPlanJob)
+}
+
+export interface MealPlanJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  week_start: string;
+  meal_plan?: MealPlan | null;  // Saved plan once succeeded
+  error?: string | null;
+  created_at?: string | null;
+  updated_at?: string | null;
 }
 
 export interface QuickAction {